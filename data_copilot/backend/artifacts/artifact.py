@@ -2,9 +2,11 @@ import os
 
 from sqlalchemy.orm import Session
 
+from data_copilot.backend.celery import send_warm_up_task
 from data_copilot.backend.config import Config
 from data_copilot.backend.crud.artifacts import (
     crud_create_artifact_version,
+    crud_set_artifact_version_progress,
     crud_set_artifact_version_status_to_failed,
     crud_set_artifact_version_status_to_running,
     crud_set_artifact_version_status_to_succeeded,
@@ -20,9 +22,19 @@ CONFIG = Config()
 
 
 class CreateArtifactVersionCM:
-    def __init__(self, artifact_id: int, db: Session):
+    def __init__(self, artifact_id: int, db: Session, complete_on_exit: bool = True):
+        """Create an artifact version, which is running until the context exits.
+
+        Args:
+            artifact_id (int): The id of the artifact.
+            db (Session): Database session.
+            complete_on_exit (bool, optional): Whether the version succeeded when
+                the context exits without an error. False if it is processed
+                further by an ingestion task, which completes it. Defaults to True.
+        """
         self.db = db
         self.artifact_id = artifact_id
+        self.complete_on_exit = complete_on_exit
         self.uuid = None
         self.uri = None
         pass
@@ -49,15 +61,19 @@ class CreateArtifactVersionCM:
     def write(self, file_name: str, file_content: bytes):
         write_file(os.path.join(self.uri, file_name), file_content)
 
+    def set_progress(self, progress: float):
+        crud_set_artifact_version_progress(self.db, self.artifact_version.id, progress)
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         if exc_type is not None:
             crud_set_artifact_version_status_to_failed(
                 self.db, self.artifact_version.id
             )
             # write exec_val to logging
-        else:
+        elif self.complete_on_exit:
             crud_set_artifact_version_status_to_succeeded(
                 self.db, self.artifact_version.id
             )
+            send_warm_up_task(self.artifact_version.id, self.uri)
 
         self.db.close()
@@ -1,3 +1,13 @@
-from data_copilot.backend.celery.app import execution_app
+from data_copilot.backend.celery.app import (
+    execution_app,
+    send_execution_task,
+    send_getting_started_task,
+    send_warm_up_task,
+)
 
-__all__ = ["execution_app"]
+__all__ = [
+    "execution_app",
+    "send_execution_task",
+    "send_getting_started_task",
+    "send_warm_up_task",
+]
@@ -1,6 +1,78 @@
+import logging
+import uuid
+
 from celery import Celery
 
 from data_copilot.backend.config import Config
+from data_copilot.execution_apps.routing import WARM_UP_TASK_PRIORITY, affinity_route
 
 CONFIG = Config()
 execution_app = Celery("main", broker=CONFIG.CELERY_BROKER_URL)
+
+
+def send_execution_task(
+    chat_id: uuid.UUID, message_id: uuid.UUID, artifact_version_id: uuid.UUID
+) -> None:
+    """Enqueue the execution of a user message. The worker loads the prompt and
+    the previous messages it needs itself, so the task only carries ids.
+
+    Args:
+        chat_id (uuid.UUID): The id of the chat.
+        message_id (uuid.UUID): The id of the message.
+        artifact_version_id (uuid.UUID): The id of the artifact version.
+    """
+    execution_app.send_task(
+        (
+            "execute_and_save_user_message"
+            if CONFIG.FUSED_EXECUTION
+            else "execute_user_message"
+        ),
+        args=(chat_id, message_id, artifact_version_id),
+        kwargs={"context_window": CONFIG.CHAT_CONTEXT_WINDOW},
+        **affinity_route(artifact_version_id),
+    )
+
+
+def send_getting_started_task(
+    chat_id: uuid.UUID, artifact_version_id: uuid.UUID, artifact_version_uri: str
+) -> None:
+    """Enqueue the getting started overview of the dataset of an artifact
+    version, which the worker saves as a message of the chat. The profile is
+    cached per artifact version, so repeated overviews do not scan the dataset.
+
+    Args:
+        chat_id (uuid.UUID): The id of the chat.
+        artifact_version_id (uuid.UUID): The id of the artifact version.
+        artifact_version_uri (str): The uri of the artifact version.
+    """
+    execution_app.send_task(
+        "execute_getting_started",
+        args=(chat_id, artifact_version_id, artifact_version_uri),
+    )
+
+
+def send_warm_up_task(
+    artifact_version_id: uuid.UUID, artifact_version_uri: str
+) -> None:
+    """Enqueue the low priority warm-up of the dataset of an artifact version,
+    so the first question about it does not pay for loading it. Failing to
+    enqueue it is not an error.
+
+    Args:
+        artifact_version_id (uuid.UUID): The id of the artifact version.
+        artifact_version_uri (str): The uri of the artifact version.
+    """
+    if not CONFIG.WARM_UP_DATASETS:
+        return
+    try:
+        execution_app.send_task(
+            "warm_up_artifact_version",
+            args=(str(artifact_version_id), artifact_version_uri),
+            priority=WARM_UP_TASK_PRIORITY,
+            **affinity_route(artifact_version_id),
+        )
+    except Exception as e:
+        logging.warning(
+            f"Could not enqueue the warm-up of artifact version "
+            f"{artifact_version_id}: {e}"
+        )
@@ -14,6 +14,11 @@ class Config(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     LONG_POLLING_MAX_WAIT_TIME: int = 20
+    # Seconds between two keep-alive comments of a message stream, so proxies do
+    # not close idle streams.
+    MESSAGE_STREAM_KEEP_ALIVE: int = Field(
+        default=15, validation_alias="MESSAGE_STREAM_KEEP_ALIVE"
+    )
 
     ALLOWED_ARTIFACTS_CONTENT_TYPES: Dict[str, str] = {
         "text/csv": "csv",
@@ -21,6 +26,18 @@ class Config(BaseSettings):
         "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "xlsx",
     }
     COMPUTE_BACKEND: str = Field(..., validation_alias="COMPUTE_BACKEND")
+    # Process uploaded datasets in a celery ingestion task instead of the request.
+    # The upload returns the artifact version while it is still running.
+    ASYNC_INGESTION: bool = Field(default=False, validation_alias="ASYNC_INGESTION")
+    # Load the dataset into a worker with a low priority task when a chat on it is
+    # created or a version succeeded, before the first question arrives.
+    WARM_UP_DATASETS: bool = Field(default=True, validation_alias="WARM_UP_DATASETS")
+    # Execute a message and save its answer in one celery task, instead of a task
+    # chaining the execution and the saving task.
+    FUSED_EXECUTION: bool = Field(default=False, validation_alias="FUSED_EXECUTION")
+    # Number of previous messages of the chat the worker may fetch as context when
+    # executing a message. Only the ids and this number are sent with the task.
+    CHAT_CONTEXT_WINDOW: int = Field(default=10, validation_alias="CHAT_CONTEXT_WINDOW")
 
     if os.getenv("ENVIRONMENT") != "TEST":
         DB_CONNECTION_STRING: str = Field(..., validation_alias="DB_CONNECTION_STRING")
@@ -244,6 +244,17 @@ def crud_set_artifact_version_status_to_succeeded(
 ):
     db_artifact_version = crud_get_artifact_version(db, artifact_version_id)
     db_artifact_version.status = artifacts_schema.ArtifactVersionStatus.succeeded
+    db_artifact_version.progress = 1.0
+    db.commit()
+    db.refresh(db_artifact_version)
+    return db_artifact_version
+
+
+def crud_set_artifact_version_progress(
+    db: Session, artifact_version_id: uuid.UUID, progress: float
+):
+    db_artifact_version = crud_get_artifact_version(db, artifact_version_id)
+    db_artifact_version.progress = progress
     db.commit()
     db.refresh(db_artifact_version)
     return db_artifact_version
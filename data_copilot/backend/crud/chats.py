@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, Optional
 
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
@@ -159,6 +159,36 @@ def crud_get_messages_by_chat_id_sorted_desc(
     ).all()
 
 
+def crud_get_messages_by_chat_id_since(
+    db: Session,
+    chat_id: uuid.UUID,
+    from_date: datetime | None = None,
+    exclude_ids: Iterable[uuid.UUID] = (),
+    limit: int = 100,
+):
+    """Returns the messages of a chat created at or after a date, oldest first.
+
+    Args:
+        db (Session): Database session.
+        chat_id (uuid.UUID): Chat's ID.
+        from_date (datetime, optional): Start date, included. Defaults to None.
+        exclude_ids (Iterable[uuid.UUID], optional): IDs of messages to skip.
+        limit (int, optional): Maximum number of messages. Defaults to 100.
+    """
+    query = (
+        select(chats_model.Message)
+        .filter(chats_model.Message.chat_id == chat_id)
+        .order_by(chats_model.Message.created_at.asc(), chats_model.Message.id.asc())
+        .limit(limit)
+    )
+    if from_date is not None:
+        query = query.filter(chats_model.Message.created_at >= from_date)
+    exclude_ids = list(exclude_ids)
+    if exclude_ids:
+        query = query.filter(chats_model.Message.id.not_in(exclude_ids))
+    return db.scalars(query).all()
+
+
 def crud_get_messages_total_number_by_chat_id_and_filters(
     db: Session,
     chat_id: uuid.UUID,
@@ -13,6 +13,7 @@ from data_copilot.backend.schemas.artifacts import (
     Artifact,
     ArtifactVersion,
     ArtifactStatus,
+    ArtifactVersionStatus,
 )
 from data_copilot.backend.schemas.authentication import User
 
@@ -160,3 +161,26 @@ async def check_if_artifact_is_active(
     if artifact.status != ArtifactStatus.active:
         raise HTTPException(status_code=404, detail="Artifact has been deleted")
     return True
+
+
+async def check_if_artifact_version_is_ready(artifact_version: ArtifactVersion) -> bool:
+    """Checks if the dataset of the artifact version was processed.
+
+    Args:
+        artifact_version (ArtifactVersion): The artifact version.
+
+    Raises:
+        HTTPException: If the artifact version is still processed or failed.
+
+    Returns (bool): True if the artifact version is ready.
+    """
+    if artifact_version.status in (
+        ArtifactVersionStatus.created,
+        ArtifactVersionStatus.running,
+    ):
+        raise HTTPException(
+            status_code=409, detail="Artifact version is still being processed"
+        )
+    if artifact_version.status == ArtifactVersionStatus.failed:
+        raise HTTPException(status_code=409, detail="Artifact version failed")
+    return True
@@ -2,8 +2,10 @@ import os
 from typing import Optional
 
 from fastapi import Depends, HTTPException, UploadFile, routing
+from fastapi.concurrency import run_in_threadpool
 
 from data_copilot.backend.artifacts.artifact import CreateArtifactVersionCM
+from data_copilot.backend.celery import execution_app
 from data_copilot.backend.config import Config
 from data_copilot.backend.crud.artifacts import (
     crud_create_artifact,
@@ -305,7 +307,10 @@ async def post_artifacts_id_artifactid_versions(
     """
     Upload a new artifact version for a given artifact. Only the
     current user can access the artifact.
-    The artifact version is created with status "succeeded".
+    The artifact version is created with status "succeeded". With
+    ASYNC_INGESTION, only the raw file is stored and the artifact version is
+    returned with status "running" while an ingestion task processes it. Its
+    progress can be queried until it "succeeded" or "failed".
 
     Args:
         file (UploadFile): The file to upload
@@ -325,10 +330,28 @@ async def post_artifacts_id_artifactid_versions(
             status_code=415, detail=f"File format '{file.content_type}' not allowed"
         )
 
-    with CreateArtifactVersionCM(artifact.id, db) as cm:
-        files = get_app().process_data_upload([file], artifact, cm)
-        for file in files:
-            cm.write(*file)
+    with CreateArtifactVersionCM(
+        artifact.id, db, complete_on_exit=not CONFIG.ASYNC_INGESTION
+    ) as cm:
+        # The processing is blocking, it must not stall the event loop.
+        if CONFIG.ASYNC_INGESTION:
+            await run_in_threadpool(cm.write, file.filename, file.file)
+            execution_app.send_task(
+                "ingest_artifact_version",
+                args=(
+                    artifact.id,
+                    cm.uuid,
+                    cm.uri,
+                    file.filename,
+                    file.content_type,
+                ),
+            )
+        else:
+            files = await run_in_threadpool(
+                get_app().process_data_upload, [file], artifact, cm
+            )
+            for file in files:
+                await run_in_threadpool(cm.write, *file)
         uuid = cm.uuid
 
     return crud_get_artifact_version(db, uuid)
@@ -1,25 +1,38 @@
 import asyncio
 import time
+import uuid
+from datetime import datetime
 
-from fastapi import Depends, HTTPException, routing
+from fastapi import Depends, Header, HTTPException, routing
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
-from data_copilot.backend.celery import execution_app
+from data_copilot.backend.celery import (
+    send_execution_task,
+    send_getting_started_task,
+    send_warm_up_task,
+)
 from data_copilot.backend.config import Config
+from data_copilot.backend.crud.artifacts import (
+    crud_get_artifact_version_by_artifact_id,
+)
 from data_copilot.backend.crud.chats import (
     crud_create_chat,
     crud_create_chat_membership,
     crud_create_message,
     crud_get_all_chats_with_user_id,
+    crud_get_messages_by_chat_id_since,
     crud_get_messages_by_chat_id_sorted_desc,
     crud_get_messages_total_number_by_chat_id_and_filters,
     crud_set_chat_membership_user_id_inactive,
     crud_set_chat_membershipt_user_id_chat_id_inactive,
     crud_update_chat,
 )
-from data_copilot.backend.database.psql import get_db
+from data_copilot.backend.database.psql import SessionLocal, get_db
 from data_copilot.backend.dependencies.artifacts import (
     check_if_user_has_access_to_artifact,
     check_if_artifact_is_active,
+    check_if_artifact_version_is_ready,
     get_artifact_from_artifact_version_dependency,
     get_artifact_version_dependency,
 )
@@ -28,7 +41,11 @@ from data_copilot.backend.dependencies.chats import (
     get_chat_if_user_has_access_dependency,
     get_message_if_user_has_access_dependency,
 )
-from data_copilot.backend.schemas.artifacts import Artifact, ArtifactVersion
+from data_copilot.backend.schemas.artifacts import (
+    Artifact,
+    ArtifactVersion,
+    ArtifactVersionStatus,
+)
 from data_copilot.backend.schemas.authentication import User
 from data_copilot.backend.schemas.chats import (
     Chat,
@@ -41,9 +58,16 @@ from data_copilot.backend.schemas.chats import (
     MessagesResponse,
     MessagesResponseMetadata,
     RequestOptions,
+    ResultPage,
+    ResultRequestOptions,
     UpdateChat,
     parse_chat_message,
 )
+from data_copilot.execution_apps.notifications import (
+    get_chat_listener,
+    publish_message,
+)
+from data_copilot.execution_apps.results import read_result_page, result_uri
 
 CONFIG = Config()
 
@@ -88,6 +112,19 @@ async def create_chat(
     )
     crud_create_chat_membership(db, create_chat_membership)
 
+    if db_chat.artifact_id is not None:
+        # load the latest version of the dataset while the user types
+        artifact_versions = crud_get_artifact_version_by_artifact_id(
+            db, db_chat.artifact_id
+        )
+        if artifact_versions and artifact_versions[0].status in (
+            ArtifactVersionStatus.succeeded,
+            ArtifactVersionStatus.active,
+        ):
+            send_warm_up_task(
+                artifact_versions[0].id, artifact_versions[0].artifact_uri
+            )
+
     return db_chat
 
 
@@ -199,12 +236,16 @@ async def post_chats_chatid_messages(
         await check_if_user_has_access_to_artifact(artifact, current_user)
 
     create_message = CreateMessageCRUD(**message.__dict__, sender_id=current_user.id)
-    return crud_create_message(db, create_message)
+    db_message = crud_create_message(db, create_message)
+    # push the message to the other streams of the chat
+    await run_in_threadpool(publish_message, db_message.chat_id, db_message.id)
+    return db_message
 
 
 @chats_router.get(
     "/{chat_id}/messages",
     response_model=MessagesResponse,
+    response_class=ORJSONResponse,
 )
 async def get_chats_chatid_messages(
     chat: Chat = Depends(get_chat_if_user_has_access_dependency),
@@ -256,7 +297,166 @@ async def get_chats_chatid_messages(
         await asyncio.sleep(0.5)
 
 
-@chats_router.get("/{chat_id}/messages/{message_id}", response_model=Message)
+class _StreamCursor:
+    """
+    Position of a message stream: the creation date of the last delivered
+    message and the ids of the delivered messages created at that date. A
+    message created at the same date can still be committed after the last
+    delivered one, so the next messages are those created at or after the date
+    which were not delivered yet.
+    """
+
+    def __init__(
+        self,
+        from_date: datetime | None = None,
+        delivered_ids: set[uuid.UUID] | None = None,
+    ) -> None:
+        self.from_date = from_date
+        self.delivered_ids = delivered_ids or set()
+
+    @classmethod
+    def from_event_id(cls, event_id: str) -> "_StreamCursor":
+        """Return the cursor after the event with the given id.
+
+        Raises:
+            ValueError: If the event id is invalid.
+        """
+        created_at, _, message_id = event_id.partition("/")
+        delivered_ids = {uuid.UUID(message_id)} if message_id else set()
+        return cls(datetime.fromisoformat(created_at), delivered_ids)
+
+    def advance(self, created_at: datetime, message_id: uuid.UUID) -> str:
+        """Move the cursor after a delivered message and return its event id."""
+        if self.from_date is None or created_at > self.from_date:
+            self.from_date = created_at
+            self.delivered_ids = set()
+        self.delivered_ids.add(message_id)
+        return f"{created_at.isoformat()}/{message_id}"
+
+
+def _get_latest_message_cursor(chat_id: uuid.UUID) -> _StreamCursor:
+    """Return the cursor after the latest messages of a chat."""
+    db = SessionLocal()
+    try:
+        latest = crud_get_messages_by_chat_id_sorted_desc(db, chat_id=chat_id, limit=1)
+        if not latest:
+            return _StreamCursor()
+        from_date = latest[0].created_at
+        messages = crud_get_messages_by_chat_id_since(db, chat_id, from_date)
+    finally:
+        db.close()
+    return _StreamCursor(
+        from_date,
+        {message.id for message in messages if message.created_at == from_date},
+    )
+
+
+def _get_new_message_events(
+    chat_id: uuid.UUID, cursor: _StreamCursor, limit: int = 100
+) -> list[str]:
+    """Return the server-sent events of the messages of a chat after a cursor,
+    oldest first, and move the cursor after them."""
+    db = SessionLocal()
+    try:
+        result = []
+        while True:
+            page = crud_get_messages_by_chat_id_since(
+                db, chat_id, cursor.from_date, cursor.delivered_ids, limit
+            )
+            for db_message in page:
+                event_id = cursor.advance(db_message.created_at, db_message.id)
+                result.append((event_id, db_message))
+            if len(page) < limit:
+                break
+    finally:
+        db.close()
+
+    events = []
+    for event_id, db_message in result:
+        message = parse_chat_message(
+            Message.model_validate(db_message, from_attributes=True)
+        )
+        events.append(
+            f"id: {event_id}\n"
+            f"event: message\n"
+            f"data: {message.model_dump_json()}\n\n"
+        )
+    return events
+
+
+@chats_router.get("/{chat_id}/messages/stream", response_class=StreamingResponse)
+async def get_chats_chatid_messages_stream(
+    chat: Chat = Depends(get_chat_if_user_has_access_dependency),
+    from_date: datetime | None = None,
+    last_event_id: str | None = Header(None),
+):
+    """
+    Streams the new messages of the given chat as server-sent events, pushed
+    when a worker saved a message instead of polling the messages. Clients
+    without streaming, or backends without notifications, use the messages
+    endpoint with polling instead.
+
+    Args:
+        chat (Chat): The chat of the messages
+        from_date (datetime, optional): Stream the messages created at or after
+            this date. Defaults to the messages created from now on.
+        last_event_id (str, optional): The id of the last event received before
+            reconnecting, which takes precedence over from_date.
+
+    Returns:
+        StreamingResponse: The events, one per message.
+    """
+    listener = get_chat_listener()
+    if listener is None:
+        raise HTTPException(status_code=503, detail="Message streaming unavailable")
+
+    cursor = None
+    if last_event_id:
+        try:
+            cursor = _StreamCursor.from_event_id(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+    elif from_date is not None:
+        cursor = _StreamCursor(from_date)
+
+    async def stream_messages():
+        nonlocal cursor
+
+        # subscribe before loading the messages, so no message is missed
+        with listener.subscribe(chat.id) as new_messages:
+            if cursor is None:
+                cursor = await run_in_threadpool(_get_latest_message_cursor, chat.id)
+            while True:
+                # cleared before the query, so a notification arriving during
+                # the query leads to another one
+                new_messages.clear()
+                events = await run_in_threadpool(
+                    _get_new_message_events, chat.id, cursor
+                )
+                for event in events:
+                    yield event
+                # the DB is only queried again after a notification
+                while True:
+                    try:
+                        await asyncio.wait_for(
+                            new_messages.wait(), CONFIG.MESSAGE_STREAM_KEEP_ALIVE
+                        )
+                        break
+                    except asyncio.TimeoutError:
+                        yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        stream_messages(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@chats_router.get(
+    "/{chat_id}/messages/{message_id}",
+    response_model=Message,
+    response_class=ORJSONResponse,
+)
 async def get_chats_chatid_messages_messageid(
     message: Message = Depends(get_message_if_user_has_access_dependency),
 ):
@@ -273,6 +473,51 @@ async def get_chats_chatid_messages_messageid(
     return parse_chat_message(message)
 
 
+@chats_router.get(
+    "/{chat_id}/messages/{message_id}/results",
+    response_model=ResultPage,
+    response_class=ORJSONResponse,
+)
+async def get_chats_chatid_messages_messageid_results(
+    message: Message = Depends(get_message_if_user_has_access_dependency),
+    request_options: ResultRequestOptions = Depends(),
+    db=Depends(get_db),
+):
+    """
+    Returns a page of the full result of the table in the message with the
+    given id, which only holds a preview of the result.
+
+    Args:
+        message (Message): The message with the result
+        request_options (ResultRequestOptions): The offset and limit of the page
+
+    Raises:
+        HTTPException: If the message has no persisted result.
+
+    Returns:
+        ResultPage: The rows of the page and the total number of rows.
+    """
+    message = parse_chat_message(message)
+    results = [
+        component.result
+        for component in getattr(message.content, "components", [])
+        if component.result is not None
+    ]
+    if not results or message.artifact_version_id is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+
+    artifact_version: ArtifactVersion = await get_artifact_version_dependency(
+        message.artifact_version_id, db=db
+    )
+    uri = result_uri(artifact_version.artifact_uri, results[0].result_id)
+    try:
+        return await run_in_threadpool(
+            read_result_page, uri, request_options.offset, request_options.limit
+        )
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Result not found")
+
+
 @chats_router.post("/{chat_id}/messages/{message_id}/execute", status_code=204)
 async def post_chats_chatid_messages_messageid(
     message: Message = Depends(get_message_if_user_has_access_dependency),
@@ -295,34 +540,36 @@ async def post_chats_chatid_messages_messageid(
         )
         await check_if_user_has_access_to_artifact(artifact, current_user)
         await check_if_artifact_is_active(artifact)
+        await check_if_artifact_version_is_ready(artifact_version)
 
-    artifact_version_uri = artifact_version.artifact_uri if artifact_version else None
+    send_execution_task(message.chat_id, message.id, artifact_version.id)
 
-    previous_messages = crud_get_messages_by_chat_id_sorted_desc(
-        db,
-        chat_id=message.chat_id,
-        limit=10,
-        offset=0,
-    )
+    return True
 
-    # make json from previous messages
-    previous_messages = [
-        parse_chat_message(
-            Message.model_validate(message, from_attributes=True)
-        ).model_dump()
-        for message in previous_messages
-    ]
 
-    execution_app.send_task(
-        "execute_user_message",
-        args=(
-            message.content,
-            message.chat_id,
-            message.id,
-            artifact_version.id,
-            artifact_version_uri,
-            previous_messages,
-        ),
+@chats_router.post("/{chat_id}/getting-started", status_code=204)
+async def post_chats_chatid_getting_started(
+    chat: Chat = Depends(get_chat_if_user_has_access_dependency),
+    artifact_version: ArtifactVersion = Depends(get_artifact_version_dependency),
+    current_user: User = Depends(get_current_active_user),
+    db=Depends(get_db),
+):
+    """
+    Adds the getting started overview of the dataset of the given artifact
+    version to the chat with the given id, as a message saved by the worker
+
+    Args:
+        chat (Chat): The chat of the overview
+        artifact_version (ArtifactVersion): The artifact version of the dataset
+
+    """
+    artifact: Artifact = await get_artifact_from_artifact_version_dependency(
+        artifact_version, db=db
     )
+    await check_if_user_has_access_to_artifact(artifact, current_user)
+    await check_if_artifact_is_active(artifact)
+    await check_if_artifact_version_is_ready(artifact_version)
 
-    return True
+    send_getting_started_task(
+        chat.id, artifact_version.id, artifact_version.artifact_uri
+    )
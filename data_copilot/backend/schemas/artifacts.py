@@ -34,6 +34,7 @@ class ArtifactVersion(BaseModel):
     description: str = ""
     created_at: datetime
     status: ArtifactVersionStatus = ArtifactVersionStatus.active
+    progress: float = 0.0
     model_config = ConfigDict(from_attributes=True)
 
 
@@ -1,11 +1,16 @@
-import json
 import logging
 import uuid
 from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from pydantic import field_validator, ConfigDict, BaseModel, Field, parse_obj_as
+from pydantic import (
+    field_validator,
+    ConfigDict,
+    BaseModel,
+    Field,
+    ValidationError,
+)
 
 
 class CreateChat(BaseModel):
@@ -84,6 +89,18 @@ class RequestOptions(BaseModel):
     polling: bool = False
 
 
+class ResultRequestOptions(BaseModel):
+    limit: int = Field(100, ge=1, le=1000, type=int)
+    offset: int = Field(0, ge=0, type=int)
+
+
+class ResultPage(BaseModel):
+    offset: int
+    limit: int
+    total_rows: int
+    data: dict
+
+
 class MessageComponentsConfigs(BaseModel):
     show_title: bool | None = None
     show_description: bool | None = None
@@ -99,12 +116,19 @@ class ComponentTypes(str, Enum):
     plot_heatmap = "plot_heatmap"
 
 
+class MessageComponentsResult(BaseModel):
+    result_id: str
+    total_rows: int
+    truncated: bool = False
+
+
 class MessageComponents(BaseModel):
     type: ComponentTypes
     name: str | None = None
     description: str | None = None
     config: MessageComponentsConfigs | None = None
     data: dict | None = None
+    result: MessageComponentsResult | None = None
 
 
 class MessageJsonContent(BaseModel):
@@ -131,10 +155,10 @@ class MessagesResponse(BaseModel):
 
 def parse_chat_message(message: Message) -> Message:
     if message.content_type == "json":
+        # parse and validate the JSON in one pass
         try:
-            content_json = json.loads(message.content)
-        except json.JSONDecodeError as e:
+            message.content = MessageJsonContent.model_validate_json(message.content)
+        except ValidationError as e:
             logging.error(f"Could not parse message content: {message.content}")
             raise e
-        message.content = parse_obj_as(MessageJsonContent, content_json)
     return message
@@ -0,0 +1,56 @@
+import os
+import uuid
+from unittest import TestCase
+from unittest.mock import patch
+
+with patch.dict(
+    os.environ,
+    {
+        "ENVIRONMENT": "PROD",
+        "BACKEND_HOST": "http://localhost:8000/api",
+        "COMPUTE_BACKEND": "sql",
+        "DB_CONNECTION_STRING": "sqlite://",
+        "JWT_SECRET_KEY": "secret",
+        "STORAGE_BACKEND": "file://./artifacts/",
+        "CELERY_BROKER_URL": "memory://",
+    },
+):
+    from data_copilot.backend.celery import app
+
+
+@patch.object(app.execution_app, "send_task")
+class SendExecutionTaskTest(TestCase):
+    def send(self):
+        self.ids = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        app.send_execution_task(*self.ids)
+
+    def test_chained_execution(self, send_task):
+        with patch.object(app.CONFIG, "FUSED_EXECUTION", False):
+            self.send()
+
+        send_task.assert_called_once()
+        self.assertEqual(send_task.call_args.args, ("execute_user_message",))
+        self.assertEqual(send_task.call_args.kwargs["args"], self.ids)
+
+    def test_fused_execution(self, send_task):
+        with patch.object(app.CONFIG, "FUSED_EXECUTION", True), patch.object(
+            app.CONFIG, "CHAT_CONTEXT_WINDOW", 3
+        ):
+            self.send()
+
+        self.assertEqual(send_task.call_args.args, ("execute_and_save_user_message",))
+        self.assertEqual(send_task.call_args.kwargs["args"], self.ids)
+        self.assertEqual(send_task.call_args.kwargs["kwargs"], {"context_window": 3})
+
+
+@patch.object(app.execution_app, "send_task")
+class SendGettingStartedTaskTest(TestCase):
+    def test_getting_started(self, send_task):
+        chat_id, artifact_version_id = uuid.uuid4(), uuid.uuid4()
+        app.send_getting_started_task(chat_id, artifact_version_id, "uri")
+
+        send_task.assert_called_once()
+        self.assertEqual(send_task.call_args.args, ("execute_getting_started",))
+        self.assertEqual(
+            send_task.call_args.kwargs["args"], (chat_id, artifact_version_id, "uri")
+        )
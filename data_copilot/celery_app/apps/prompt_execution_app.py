@@ -1,23 +1,164 @@
 import logging
+import threading
 import uuid
-from typing import Tuple, List
+from typing import Tuple
 
 import openai
 from celery import Celery, chain
 from celery.exceptions import SoftTimeLimitExceeded, TimeLimitExceeded
+from celery.signals import (
+    worker_process_init,
+    worker_process_shutdown,
+    worker_ready,
+    worker_shutdown,
+)
 
 from data_copilot.celery_app.config import Config
+from data_copilot.celery_app.crud.artifacts import crud_set_artifact_version_status
 from data_copilot.celery_app.crud.chats import crud_create_message
 from data_copilot.celery_app.database.psql import SessionLocal, engine
+from data_copilot.celery_app.executors import (
+    getting_started_executor,
+    ingestion_executor,
+    message_executor,
+)
 from data_copilot.db_models.base import Base
 from data_copilot.execution_apps import get_app
+from data_copilot.execution_apps.llm_client import (
+    close_openai_client,
+    init_openai_client,
+)
+from data_copilot.execution_apps.notifications import publish_message
+from data_copilot.execution_apps.routing import (
+    AFFINITY_ROUTING,
+    WARM_UP_TASK_PRIORITY,
+    WorkerHeartbeat,
+    affinity_route,
+    get_router,
+)
 
 Base.metadata.create_all(bind=engine)
 
 
 CONFIG = Config()
 
+# Default number of previous messages of the chat available to the interpreter,
+# if the task does not specify its context window.
+CONTEXT_WINDOW = 10
+
 execution_app = Celery("main", broker=CONFIG.CELERY_BROKER_URL)
+if AFFINITY_ROUTING:
+    # Every worker also consumes its direct queue, which the tasks working on
+    # the datasets it holds are routed to.
+    execution_app.conf.worker_direct = True
+
+_worker_heartbeat: WorkerHeartbeat | None = None
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    # One pooled LLM client per worker process, reused by all its tasks.
+    init_openai_client()
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    close_openai_client()
+
+
+@worker_ready.connect
+def start_worker_heartbeat(sender, **kwargs):
+    # Announce the worker to the affinity routing of the senders.
+    global _worker_heartbeat
+
+    if get_router() is not None:
+        _worker_heartbeat = WorkerHeartbeat(
+            sender.hostname, shared_queue=sender.app.conf.task_default_queue
+        )
+        _worker_heartbeat.start()
+
+
+@worker_shutdown.connect
+def stop_worker_heartbeat(**kwargs):
+    if _worker_heartbeat is not None:
+        _worker_heartbeat.stop()
+
+
+class HopStatistics:
+    """Class to count the saved answers and the tasks it took to answer them,
+    from the task sent by the backend to the one saving the answer."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.answers = 0
+        self.hops = 0
+
+    @property
+    def hops_per_answer(self) -> float:
+        """The mean number of tasks per answer."""
+        return self.hops / self.answers if self.answers else 0.0
+
+    def record(self, hops: int) -> None:
+        with self._lock:
+            self.answers += 1
+            self.hops += hops
+
+    def reset(self) -> None:
+        with self._lock:
+            self.answers = 0
+            self.hops = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "answers": self.answers,
+            "hops": self.hops,
+            "hops_per_answer": self.hops_per_answer,
+        }
+
+
+hop_stats = HopStatistics()
+
+
+def _save_result(
+    prompt_result: Tuple[str, str],
+    chat_id: uuid.UUID,
+    artifact_version_id: uuid.UUID | None,
+    message_id: uuid.UUID | None,
+    hops: int,
+) -> dict:
+    try:
+        message_type, message_content = prompt_result
+        db = SessionLocal()
+        try:
+            db_message = crud_create_message(
+                db,
+                chat_id,
+                artifact_version_id,
+                message_content,
+                message_type,
+            )
+        finally:
+            db.close()
+        publish_message(chat_id, db_message.id)
+    except SoftTimeLimitExceeded:
+        logging.error(
+            "Saving the final result exceeded the time limit --"
+            f"message_id: {message_id} --"
+        )
+        raise TimeLimitExceeded()
+    except Exception as e:
+        logging.error(
+            f"An error occured while saving the final result in DB: {e} --"
+            f"message_id: {message_id} --"
+        )
+        raise e
+
+    hop_stats.record(hops)
+    logging.debug(
+        f"Saved the result of message {message_id} after {hops} tasks -- "
+        f"Hop stats: {hop_stats.to_dict()}"
+    )
+    return hop_stats.to_dict()
 
 
 @execution_app.task(
@@ -31,7 +172,8 @@ def save_result(
     chat_id: uuid.UUID,
     artifact_version_id: uuid.UUID | None = None,
     message_id: uuid.UUID | None = None,
-):
+    hops: int = 3,
+) -> dict:
     """Save the final result as message in the DB.
 
     Args:
@@ -40,31 +182,62 @@ def save_result(
         artifact_version_id (uuid.UUID, optional): Artifact version id of the message.
             Defaults to None.
         message_id (uuid.UUID, optional): Message id of the message. Defaults to None.
+        hops (int, optional): The number of tasks it took to answer the message,
+            including this one. Defaults to 3, the tasks of execute_user_message.
 
+    Returns:
+        dict: The hop statistics of the worker process, so they show up in the
+            task events and the result backend.
     """
+    return _save_result(prompt_result, chat_id, artifact_version_id, message_id, hops)
+
+
+def _execute_prompt(
+    chat_id: uuid.UUID,
+    message_id: uuid.UUID,
+    artifact_version_id: uuid.UUID,
+    context_window: int = CONTEXT_WINDOW,
+) -> Tuple[str, str]:
+    user_prompt = None
     try:
-        message_type, message_content = prompt_result
         db = SessionLocal()
-        crud_create_message(
-            db,
-            chat_id,
-            artifact_version_id,
-            message_content,
-            message_type,
+        try:
+            prompt = message_executor.load_prompt(db, message_id, artifact_version_id)
+        finally:
+            db.close()
+        user_prompt = prompt.user_prompt
+
+        result = (
+            get_app()
+            .execute_message(
+                user_prompt=user_prompt,
+                chat_id=chat_id,
+                message_id=message_id,
+                artifact_version_id=artifact_version_id,
+                artifact_version_uri=prompt.artifact_version_uri,
+                previous_messages=message_executor.PreviousMessages(
+                    SessionLocal, chat_id, message_id, prompt.created_at, context_window
+                ),
+            )
+            .to_dict()
         )
-        db.close()
+        return result["message_type"], result["text_content"]
+
     except SoftTimeLimitExceeded:
         logging.error(
-            "The task save_result exceeded the time limit --"
-            f"message_id: {message_id} --"
+            "The translation of the user prompt timed out --"
+            f"Prompt: {user_prompt} --"
+            f"message_id: {message_id}"
         )
         raise TimeLimitExceeded()
     except Exception as e:
         logging.error(
-            f"An error occured while saving the final result in DB: {e} --"
-            f"message_id: {message_id} --"
+            f"An error occured while translating the user prompt: {e} --"
+            f"Prompt: {user_prompt} --"
+            f"message_id: {message_id}"
         )
-        raise e
+        logging.exception(e)
+        return "error", "An error occured while executing the user prompt."
 
 
 @execution_app.task(
@@ -74,79 +247,227 @@ def save_result(
     retry_kwargs={"max_retries": 3, "countdown": 30},
 )
 def execute_user_prompt(
-    user_prompt: str,
     chat_id: uuid.UUID,
     message_id: uuid.UUID,
     artifact_version_id: uuid.UUID,
-    artifact_version_uri: str,
-    previous_messages: List[dict] = None,
+    context_window: int = CONTEXT_WINDOW,
 ) -> Tuple[str, str]:
-    """Execute user prompt into method to be called
+    """Execute user prompt into method to be called. The prompt and the previous
+    messages are loaded from the DB, so the task only carries ids.
 
     Args:
-        user_prompt (str): User prompt to be translated.
         chat_id (uuid.UUID): Chat id of the message.
         message_id (uuid.UUID): Message id of the message.
         artifact_version_id (uuid.UUID): Artifact version id of the message.
-        artifact_version_uri (str): Artifact version uri of the message.
+        context_window (int, optional): The maximal number of previous messages
+            of the chat available to the interpreter. Defaults to CONTEXT_WINDOW.
 
     Returns:
         Tuple[str, str]: Tuple of message type and message content.
     """
+    return _execute_prompt(chat_id, message_id, artifact_version_id, context_window)
+
 
+@execution_app.task(
+    name="execute_and_save_user_message",
+    soft_time_limit=70,
+    autoretry_for=(TimeLimitExceeded, openai.RateLimitError),
+    retry_kwargs={"max_retries": 3, "countdown": 30},
+)
+def execute_and_save_user_message(
+    chat_id: uuid.UUID,
+    message_id: uuid.UUID,
+    artifact_version_id: uuid.UUID | None = None,
+    context_window: int = CONTEXT_WINDOW,
+) -> dict | None:
+    """Execute the user prompt and save the result as message in the DB in one
+    task, instead of the three tasks of execute_user_message. The execution is
+    retried like executing_user_prompt; if saving the result fails like in
+    save_result, the result is handed to a save_result task, so the prompt is
+    not executed again.
+
+    Args:
+        chat_id (uuid.UUID): Chat id of the message.
+        message_id (uuid.UUID): Message id of the message.
+        artifact_version_id (uuid.UUID, optional): Artifact version id of the
+            message. Defaults to None.
+        context_window (int, optional): The maximal number of previous messages
+            of the chat available to the interpreter. Defaults to CONTEXT_WINDOW.
+
+    Returns:
+        dict | None: The hop statistics of the worker process like save_result,
+            or None if the result was handed to a save_result task.
+    """
+    prompt_result = _execute_prompt(
+        chat_id, message_id, artifact_version_id, context_window
+    )
     try:
-        result = (
-            get_app()
-            .execute_message(
-                user_prompt=user_prompt,
-                chat_id=chat_id,
-                message_id=message_id,
-                artifact_version_id=artifact_version_id,
-                artifact_version_uri=artifact_version_uri,
-                previous_messages=previous_messages,
-            )
-            .to_dict()
+        return _save_result(prompt_result, chat_id, artifact_version_id, message_id, 1)
+    except (MemoryError, TimeLimitExceeded):
+        save_result.apply_async(
+            args=(prompt_result, chat_id),
+            kwargs={
+                "artifact_version_id": artifact_version_id,
+                "message_id": message_id,
+                "hops": 2,
+            },
+            countdown=1,
+            compression=CONFIG.TASK_COMPRESSION,
         )
+
+
+@execution_app.task(name="execute_user_message")
+def execute_user_message(
+    chat_id: uuid.UUID,
+    message_id: uuid.UUID,
+    artifact_version_id: uuid.UUID | None = None,
+    context_window: int = CONTEXT_WINDOW,
+):
+    chain(
+        execute_user_prompt.s(
+            chat_id=chat_id,
+            message_id=message_id,
+            artifact_version_id=artifact_version_id,
+            context_window=context_window,
+        ).set(**affinity_route(artifact_version_id)),
+        save_result.s(
+            chat_id=chat_id,
+            artifact_version_id=artifact_version_id,
+            message_id=message_id,
+            hops=3,
+        ).set(compression=CONFIG.TASK_COMPRESSION),
+    )()
+
+
+@execution_app.task(
+    name="profile_artifact_version",
+    soft_time_limit=300,
+    autoretry_for=(TimeLimitExceeded,),
+    retry_kwargs={"max_retries": 1, "countdown": 30},
+)
+def profile_artifact_version(
+    artifact_version_id: uuid.UUID,
+    artifact_version_uri: str,
+) -> Tuple[str, str]:
+    """Profile the dataset of an artifact version, or load the stored profile,
+    and return the getting started message.
+
+    Args:
+        artifact_version_id (uuid.UUID): Artifact version id of the dataset.
+        artifact_version_uri (str): Artifact version uri of the dataset.
+
+    Returns:
+        Tuple[str, str]: Tuple of message type and message content.
+    """
+    try:
+        result = getting_started_executor.run(artifact_version_id, artifact_version_uri)
         return result["message_type"], result["text_content"]
 
     except SoftTimeLimitExceeded:
         logging.error(
-            "The translation of the user prompt timed out --"
-            f"Prompt: {user_prompt} --"
-            f"message_id: {message_id}"
+            "The profiling of the dataset timed out --"
+            f"artifact_version_id: {artifact_version_id}"
         )
         raise TimeLimitExceeded()
     except Exception as e:
         logging.error(
-            f"An error occured while translating the user prompt: {e} --"
-            f"Prompt: {user_prompt} --"
-            f"message_id: {message_id}"
+            f"An error occured while profiling the dataset: {e} --"
+            f"artifact_version_id: {artifact_version_id}"
         )
         logging.exception(e)
-        return "error", "An error occured while executing the user prompt."
+        return "error", "An error occured while profiling the dataset."
 
 
-@execution_app.task(name="execute_user_message")
-def execute_user_message(
-    user_prompt: str,
+@execution_app.task(name="execute_getting_started")
+def execute_getting_started(
     chat_id: uuid.UUID,
-    message_id: uuid.UUID,
-    artifact_version_id: uuid.UUID | None = None,
-    artifact_version_uri: str | None = None,
-    previous_messages: List[dict] = None,
+    artifact_version_id: uuid.UUID,
+    artifact_version_uri: str,
 ):
     chain(
-        execute_user_prompt.s(
-            user_prompt=user_prompt,
-            chat_id=chat_id,
-            message_id=message_id,
+        profile_artifact_version.s(
             artifact_version_id=artifact_version_id,
             artifact_version_uri=artifact_version_uri,
-            previous_messages=previous_messages,
-        ),
+        ).set(**affinity_route(artifact_version_id)),
         save_result.s(
             chat_id=chat_id,
             artifact_version_id=artifact_version_id,
-            message_id=message_id,
         ),
     )()
+
+
+@execution_app.task(
+    name="warm_up_artifact_version", soft_time_limit=600, ignore_result=True
+)
+def warm_up_artifact_version(
+    artifact_version_id: uuid.UUID,
+    artifact_version_uri: str,
+):
+    """Prepare the dataset of an artifact version on the worker which answers
+    the questions about it, before the user asks the first one. Sent with a low
+    priority when a chat on the dataset is created or a version succeeded.
+
+    Args:
+        artifact_version_id (uuid.UUID): Artifact version id of the dataset.
+        artifact_version_uri (str): Artifact version uri of the dataset.
+    """
+    try:
+        get_app().warm_up(artifact_version_id, artifact_version_uri)
+    except Exception as e:
+        # the first question loads the dataset itself
+        logging.warning(
+            f"The warm-up of the dataset failed: {e} --"
+            f"artifact_version_id: {artifact_version_id}"
+        )
+
+
+@execution_app.task(name="ingest_artifact_version", soft_time_limit=3600)
+def ingest_artifact_version(
+    artifact_id: uuid.UUID,
+    artifact_version_id: uuid.UUID,
+    artifact_version_uri: str,
+    file_name: str,
+    content_type: str,
+):
+    """Process the dataset uploaded as a new artifact version, which the backend
+    stored and returned in the status "running". The progress is stored with
+    the artifact version, which succeeds or fails at the end.
+
+    Args:
+        artifact_id (uuid.UUID): Id of the artifact.
+        artifact_version_id (uuid.UUID): Id of the artifact version.
+        artifact_version_uri (str): Uri of the artifact version.
+        file_name (str): Name of the uploaded file.
+        content_type (str): Content type of the uploaded file.
+    """
+    db = SessionLocal()
+    try:
+        ingestion = ingestion_executor.ArtifactVersionIngestion(
+            db, artifact_version_id, artifact_version_uri
+        )
+        ingestion_executor.run(ingestion, artifact_id, file_name, content_type)
+        crud_set_artifact_version_status(
+            db, artifact_version_id, "succeeded", progress=1.0
+        )
+    except Exception as e:
+        if isinstance(e, SoftTimeLimitExceeded):
+            logging.error(
+                "The ingestion of the dataset timed out --"
+                f"artifact_version_id: {artifact_version_id}"
+            )
+        else:
+            logging.error(
+                f"An error occured while ingesting the dataset: {e} --"
+                f"artifact_version_id: {artifact_version_id}"
+            )
+            logging.exception(e)
+        db.rollback()
+        crud_set_artifact_version_status(db, artifact_version_id, "failed")
+    else:
+        warm_up_artifact_version.apply_async(
+            args=(str(artifact_version_id), artifact_version_uri),
+            priority=WARM_UP_TASK_PRIORITY,
+            **affinity_route(artifact_version_id),
+        )
+    finally:
+        db.close()
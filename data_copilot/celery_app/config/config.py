@@ -10,6 +10,11 @@ class Config(BaseSettings):
     CELERY_BROKER_URL: str = Field(..., validation_alias="CELERY_BROKER_URL")
     DB_CONNECTION_STRING: str = Field(..., validation_alias="DB_CONNECTION_STRING")
     STORAGE_BACKEND: str = Field(..., validation_alias="STORAGE_BACKEND")
+    # Compression of the task messages carrying an answer to save_result, e.g.
+    # "zlib" or "bzip2". The other tasks only carry ids and are not compressed.
+    TASK_COMPRESSION: str | None = Field(
+        default=None, validation_alias="TASK_COMPRESSION"
+    )
 
     if "dfs.core.windows.net" in os.getenv("STORAGE_BACKEND", ""):
         AZURE_STORAGE_ACCOUNT_NAME: str = Field(
@@ -0,0 +1,52 @@
+import uuid
+
+from sqlalchemy.orm import Session
+
+from data_copilot.db_models import artifacts as artifacts_model
+
+
+def crud_get_artifact(db: Session, artifact_id: uuid.UUID | str):
+    if type(artifact_id) is str:
+        artifact_id = uuid.UUID(artifact_id)
+
+    return db.get(artifacts_model.Artifact, artifact_id)
+
+
+def crud_get_artifact_version(db: Session, artifact_version_id: uuid.UUID | str):
+    if type(artifact_version_id) is str:
+        artifact_version_id = uuid.UUID(artifact_version_id)
+
+    return db.get(artifacts_model.ArtifactVersion, artifact_version_id)
+
+
+def crud_set_artifact_version_progress(
+    db: Session, artifact_version_id: uuid.UUID | str, progress: float
+):
+    if type(artifact_version_id) is str:
+        artifact_version_id = uuid.UUID(artifact_version_id)
+
+    db_artifact_version = db.get(artifacts_model.ArtifactVersion, artifact_version_id)
+    if db_artifact_version is None:
+        return None
+    db_artifact_version.progress = progress
+    db.commit()
+    return db_artifact_version
+
+
+def crud_set_artifact_version_status(
+    db: Session,
+    artifact_version_id: uuid.UUID | str,
+    status: str,
+    progress: float | None = None,
+):
+    if type(artifact_version_id) is str:
+        artifact_version_id = uuid.UUID(artifact_version_id)
+
+    db_artifact_version = db.get(artifacts_model.ArtifactVersion, artifact_version_id)
+    if db_artifact_version is None:
+        return None
+    db_artifact_version.status = status
+    if progress is not None:
+        db_artifact_version.progress = progress
+    db.commit()
+    return db_artifact_version
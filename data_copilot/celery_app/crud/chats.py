@@ -1,5 +1,7 @@
 import uuid
+from datetime import datetime
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from data_copilot.db_models import chats as chats_model
@@ -30,3 +32,33 @@ def crud_create_message(
     db.commit()
     db.refresh(db_message)
     return db_message
+
+
+def crud_get_message(db: Session, message_id: uuid.UUID | str):
+    if type(message_id) is str:
+        message_id = uuid.UUID(message_id)
+
+    return db.get(chats_model.Message, message_id)
+
+
+def crud_get_previous_messages_sorted_desc(
+    db: Session,
+    chat_id: uuid.UUID | str,
+    message_id: uuid.UUID | str,
+    before: datetime,
+    limit: int,
+):
+    if type(chat_id) is str:
+        chat_id = uuid.UUID(chat_id)
+
+    if type(message_id) is str:
+        message_id = uuid.UUID(message_id)
+
+    return db.scalars(
+        select(chats_model.Message)
+        .filter(chats_model.Message.chat_id == chat_id)
+        .filter(chats_model.Message.id != message_id)
+        .filter(chats_model.Message.created_at <= before)
+        .order_by(chats_model.Message.created_at.desc())
+        .limit(limit)
+    ).all()
@@ -20,8 +20,12 @@ else:
     SQLALCHEMY_DATABASE_URL = CONFIG.POSTGRES_CONNECTION
 
     if "postgresql://" in SQLALCHEMY_DATABASE_URL:
+        # The pooled connections are reused across the tasks of a worker, and
+        # checked before use since they may be idle for a long time.
         engine = create_engine(
-            SQLALCHEMY_DATABASE_URL, connect_args={"sslmode": "allow"}
+            SQLALCHEMY_DATABASE_URL,
+            connect_args={"sslmode": "allow"},
+            pool_pre_ping=True,
         )
     elif "sqlite://" in SQLALCHEMY_DATABASE_URL:
         engine = create_engine(
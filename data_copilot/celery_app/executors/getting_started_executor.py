@@ -1,52 +1,22 @@
-import logging
-from typing import Any, Dict, List, Optional
-
-import pandas as pd
-from pandas import read_excel
-import numpy as np
+import uuid
+from typing import Any, Dict
 
 from data_copilot.execution_apps import helpers
+from data_copilot.execution_apps.profiling import get_profile
 
 
-@helpers.path_processor
-def run(
-    sas_url: str,
-    schema: Dict[str, Any],
-    file_type: str,
-    sql_query: str,
-    columns: Optional[List[str]] = None,
-) -> Dict[str, Any]:
-    """Execute the command and return the correct json response.
+def build_message(profile: Dict[str, Any]) -> helpers.Message:
+    """Build the getting started message from the profile of a dataset.
 
     Args:
-        sas_url (str): The path to the dataset to operate on.
-        schema (Dict[str, Any]): The schema of the dataset.
-        sql_query (str): The SQL query to execute.
-        columns (Optional[List[str]], optional): The columns to execute the
-            command on. Defaults to None.
-    """
-
-    match file_type:
-        case "csv":
-            dataset = pd.read_csv(sas_url, sep=None)
-        case "xls" | "xlsx":
-            dataset = read_excel(sas_url, dtype={"dteday": str})
-        case _:
-            raise Exception(f"Unsupported '{file_type}' file type")
-
-    if len(dataset.index) == 0:
-        raise Exception(f"Wrong '{sas_url}' content")
-
-    try:
-        dataset.columns = helpers.harmonize_column_names(dataset.columns)
+        profile (Dict[str, Any]): The profile of the dataset.
 
-        top_3_rows = dataset.head(3).to_dict("list")
-
-    except Exception as e:
-        logging.error(e)
-
-    finally:
-        pass
+    Returns:
+        helpers.Message: The message.
+    """
+    names = dict(
+        zip(profile["head"], helpers.harmonize_column_names(list(profile["head"])))
+    )
 
     message = helpers.Message(helpers.MessageTypes.JSON, "GETTING_STARTED")
 
@@ -58,16 +28,14 @@ def run(
         "show_description": True,
         "highlight_columns": [],
     }
-    table_component.data = top_3_rows
+    table_component.data = {
+        names[column]: values for column, values in profile["head"].items()
+    }
     message.add_component(table_component)
 
     # Add some Heatmap components
-    correlation = dataset[
-        dataset.columns[dataset.dtypes[dataset.columns] != "object"]
-    ].corr()
-    print("***********\n\nlen(correlation)", correlation)
-    if len(correlation) > 0:
-        # print(correlation)
+    correlation = profile["correlation"]
+    if len(correlation["columns"]) > 0:
         heatmap_component = helpers.Component(
             "Heatmap", helpers.ComponentTypes.PLOT_HEATMAP
         )
@@ -77,54 +45,65 @@ def run(
             "show_description": True,
             "highlight_columns": [],
         }
+        columns = [names[column] for column in correlation["columns"]]
         heatmap_component.data = {
-            "columns": correlation.columns.tolist(),
-            "rows": correlation.index.tolist(),
-            "values": correlation.values.tolist(),
+            "columns": columns,
+            "rows": columns,
+            "values": correlation["values"],
         }
         message.add_component(heatmap_component)
 
-    for column in dataset.columns:
-        # get unique values sorted by frequency
-        unique_values = dataset[column].value_counts().to_dict()
-
-        # get the top 5 values and their frequencies
-        top_5 = dict(list(unique_values.items())[:5])
-        top_5_values = {str(k): v for k, v in top_5.items()}
+    for column, summary in profile["columns"].items():
+        top_values = summary["top_values"]
 
         histogram_component = helpers.Component(
-            f"Histogram for {column}", helpers.ComponentTypes.PLOT_BAR
+            f"Histogram for {names[column]}", helpers.ComponentTypes.PLOT_BAR
+        )
+        histogram_component.description = (
+            f"The top {len(top_values)} values for {names[column]}."
         )
-        histogram_component.description = f"The top 5 values for {column}."
         histogram_component.config = {
             "show_title": True,
             "show_description": True,
             "highlight_columns": [],
         }
         histogram_component.data = {
-            "categories": list(top_5_values.keys()),
-            "values": list(top_5_values.values()),
+            "categories": [str(top_value["value"]) for top_value in top_values],
+            "values": [top_value["count"] for top_value in top_values],
         }
         message.add_component(histogram_component)
 
-    for column in dataset.columns:
-        # Check if the column is numeric
-        if dataset[column].dtype in ["int64", "float64"]:
+    for column, summary in profile["columns"].items():
+        if "histogram" in summary:
             histogram_component = helpers.Component(
-                f"Histogram for {column}", helpers.ComponentTypes.PLOT_HIST
+                f"Histogram for {names[column]}", helpers.ComponentTypes.PLOT_HIST
             )
-            histogram_component.description = f"The Histogram of {column}."
+            histogram_component.description = f"The Histogram of {names[column]}."
             histogram_component.config = {
                 "show_title": True,
                 "show_description": True,
                 "highlight_columns": [],
             }
-            values, bins = np.histogram(dataset[column].values, bins=10, density=True)
-
-            histogram_component.data = {
-                "values": values.tolist(),
-                "bins": bins.tolist()[:-1],
-            }
+            histogram_component.data = summary["histogram"]
             message.add_component(histogram_component)
 
-    return message.to_dict()
+    return message
+
+
+def run(
+    artifact_version_id: uuid.UUID | str, artifact_version_uri: str
+) -> Dict[str, str]:
+    """Return the getting started message of the dataset of an artifact version:
+    its first rows, the correlation of the numeric columns, the most frequent
+    values of every column and the histograms of the numeric columns. The
+    profile of the dataset is computed once per artifact version.
+
+    Args:
+        artifact_version_id (uuid.UUID | str): The id of the artifact version.
+        artifact_version_uri (str): The uri of the artifact version.
+
+    Returns:
+        Dict[str, str]: The message content and type.
+    """
+    profile = get_profile(artifact_version_id, artifact_version_uri)
+    return build_message(profile).to_dict()
@@ -0,0 +1,70 @@
+import os
+import uuid
+from typing import IO, NamedTuple
+
+from sqlalchemy.orm import Session
+
+from data_copilot.celery_app.crud.artifacts import (
+    crud_get_artifact,
+    crud_set_artifact_version_progress,
+)
+from data_copilot.execution_apps import get_app
+from data_copilot.storage_handler import get_local_path, write_file
+
+
+class StoredUpload(NamedTuple):
+    """An uploaded file which was stored by the backend, in place of its
+    UploadFile."""
+
+    filename: str
+    content_type: str
+    file: IO[bytes]
+
+
+class ArtifactVersionIngestion:
+    """Takes the place of the CreateArtifactVersionCM of the backend while a
+    worker processes the upload of an artifact version."""
+
+    def __init__(
+        self, db: Session, artifact_version_id: uuid.UUID | str, uri: str
+    ) -> None:
+        self.db = db
+        self.uuid = artifact_version_id
+        self.uri = uri
+
+    def write(self, file_name: str, file_content: str | IO[bytes]) -> None:
+        write_file(os.path.join(self.uri, file_name), file_content)
+
+    def set_progress(self, progress: float) -> None:
+        crud_set_artifact_version_progress(self.db, self.uuid, progress)
+
+
+def run(
+    ingestion: ArtifactVersionIngestion,
+    artifact_id: uuid.UUID | str,
+    file_name: str,
+    content_type: str,
+) -> None:
+    """Process the stored upload of an artifact version like the backend does
+    within the upload request, and write the resulting files next to it.
+
+    Args:
+        ingestion (ArtifactVersionIngestion): The artifact version.
+        artifact_id (uuid.UUID | str): The id of the artifact.
+        file_name (str): The name of the uploaded file.
+        content_type (str): The content type of the uploaded file.
+    """
+    artifact = crud_get_artifact(ingestion.db, artifact_id)
+    path = get_local_path(os.path.join(ingestion.uri, file_name))
+
+    with open(path, "rb") as file:
+        files = get_app().process_data_upload(
+            [StoredUpload(file_name, content_type, file)], artifact, ingestion
+        )
+        for name, content in files:
+            # the raw upload is stored already
+            if name == file_name:
+                continue
+            ingestion.write(name, content)
+            if hasattr(content, "close"):
+                content.close()
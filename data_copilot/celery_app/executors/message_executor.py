@@ -0,0 +1,145 @@
+import json
+import uuid
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Sequence
+
+from sqlalchemy.orm import Session
+
+from data_copilot.celery_app.crud.artifacts import crud_get_artifact_version
+from data_copilot.celery_app.crud.chats import (
+    crud_get_message,
+    crud_get_previous_messages_sorted_desc,
+)
+
+
+class Prompt(NamedTuple):
+    """The user message a task answers, loaded from the ids in its arguments."""
+
+    user_prompt: str
+    created_at: datetime
+    artifact_version_uri: str | None
+
+
+def load_prompt(
+    db: Session,
+    message_id: uuid.UUID | str,
+    artifact_version_id: uuid.UUID | str | None,
+) -> Prompt:
+    """Load the user message and the uri of its artifact version.
+
+    Args:
+        db (Session): The DB session.
+        message_id (uuid.UUID | str): The id of the message.
+        artifact_version_id (uuid.UUID | str | None): The id of the artifact
+            version of the message.
+
+    Raises:
+        LookupError: If the message or the artifact version does not exist.
+
+    Returns:
+        Prompt: The user message.
+    """
+    message = crud_get_message(db, message_id)
+    if message is None:
+        raise LookupError(f"Message {message_id} not found")
+
+    artifact_version_uri = None
+    if artifact_version_id is not None:
+        artifact_version = crud_get_artifact_version(db, artifact_version_id)
+        if artifact_version is None:
+            raise LookupError(f"Artifact version {artifact_version_id} not found")
+        artifact_version_uri = artifact_version.artifact_uri
+
+    return Prompt(message.content, message.created_at, artifact_version_uri)
+
+
+def message_to_dict(message) -> dict:
+    """Return a message of the DB as dict, with the content of JSON messages
+    decoded.
+
+    Args:
+        message (chats_model.Message): The message.
+
+    Returns:
+        dict: The message.
+    """
+    content = message.content
+    if message.content_type == "json":
+        content = json.loads(content)
+    return {
+        "id": message.id,
+        "chat_id": message.chat_id,
+        "sender_id": message.sender_id,
+        "system_generated": message.system_generated,
+        "artifact_version_id": message.artifact_version_id,
+        "content_type": message.content_type,
+        "created_at": message.created_at,
+        "content": content,
+    }
+
+
+class PreviousMessages(Sequence[dict]):
+    """
+    The latest messages of a chat before a message, latest first, as passed to
+    `execute_message`. The messages are only fetched from the DB when they are
+    read for the first time, so the tasks carry the context window instead of
+    the messages and interpreters not using them do not pay for them.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        chat_id: uuid.UUID | str,
+        message_id: uuid.UUID | str,
+        before: datetime,
+        context_window: int,
+    ) -> None:
+        """Initialize the messages.
+
+        Args:
+            session_factory (Callable[[], Session]): Factory of the DB session
+                used to fetch the messages.
+            chat_id (uuid.UUID | str): The id of the chat.
+            message_id (uuid.UUID | str): The id of the message, which is
+                excluded.
+            before (datetime): The creation time of the message.
+            context_window (int): The maximal number of messages.
+        """
+        self.session_factory = session_factory
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.before = before
+        self.context_window = context_window
+        self._messages: List[dict] | None = None
+
+    def _load(self) -> List[dict]:
+        if self._messages is None:
+            if self.context_window <= 0:
+                self._messages = []
+            else:
+                db = self.session_factory()
+                try:
+                    self._messages = [
+                        message_to_dict(message)
+                        for message in crud_get_previous_messages_sorted_desc(
+                            db,
+                            self.chat_id,
+                            self.message_id,
+                            self.before,
+                            self.context_window,
+                        )
+                    ]
+                finally:
+                    db.close()
+        return self._messages
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the messages were fetched."""
+        return self._messages is not None
+
+    def __getitem__(self, index):
+        return self._load()[index]
+
+    def __len__(self) -> int:
+        return len(self._load())
@@ -0,0 +1,97 @@
+import os
+import uuid
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from celery.exceptions import TimeLimitExceeded
+
+with patch.dict(
+    os.environ,
+    {
+        "ENVIRONMENT": "TEST",
+        "CELERY_BROKER_URL": "memory://",
+        "DB_CONNECTION_STRING": "sqlite://",
+        "STORAGE_BACKEND": "file:///tmp",
+    },
+):
+    from data_copilot.celery_app.apps import prompt_execution_app as app
+
+
+@patch.object(app, "publish_message")
+@patch.object(app, "SessionLocal")
+@patch.object(app, "crud_create_message")
+@patch.object(app, "_execute_prompt", return_value=("json", '{"n": 1}'))
+class ExecuteAndSaveUserMessageTest(TestCase):
+    def setUp(self) -> None:
+        app.hop_stats.reset()
+        self.chat_id, self.message_id = uuid.uuid4(), uuid.uuid4()
+        self.artifact_version_id = uuid.uuid4()
+
+    def execute(self):
+        return app.execute_and_save_user_message(
+            self.chat_id, self.message_id, self.artifact_version_id, 5
+        )
+
+    def test_saves_the_answer_in_one_task(
+        self, execute_prompt, crud_create_message, session_local, publish_message
+    ):
+        crud_create_message.return_value = MagicMock(id="answer")
+
+        stats = self.execute()
+
+        execute_prompt.assert_called_once_with(
+            self.chat_id, self.message_id, self.artifact_version_id, 5
+        )
+        crud_create_message.assert_called_once_with(
+            session_local.return_value,
+            self.chat_id,
+            self.artifact_version_id,
+            '{"n": 1}',
+            "json",
+        )
+        session_local.return_value.close.assert_called_once()
+        publish_message.assert_called_once_with(self.chat_id, "answer")
+        self.assertEqual(stats, {"answers": 1, "hops": 1, "hops_per_answer": 1.0})
+
+    def test_hands_the_answer_to_save_result_if_saving_fails(
+        self, execute_prompt, crud_create_message, session_local, publish_message
+    ):
+        crud_create_message.side_effect = MemoryError()
+
+        with patch.object(app.save_result, "apply_async") as apply_async:
+            self.assertIsNone(self.execute())
+
+        execute_prompt.assert_called_once()
+        apply_async.assert_called_once()
+        self.assertEqual(apply_async.call_args.kwargs["args"][0], ("json", '{"n": 1}'))
+        self.assertEqual(
+            apply_async.call_args.kwargs["kwargs"],
+            {
+                "artifact_version_id": self.artifact_version_id,
+                "message_id": self.message_id,
+                "hops": 2,
+            },
+        )
+        publish_message.assert_not_called()
+        self.assertEqual(app.hop_stats.answers, 0)
+
+    def test_save_result_counts_the_hops(
+        self, execute_prompt, crud_create_message, session_local, publish_message
+    ):
+        crud_create_message.return_value = MagicMock(id="answer")
+
+        app.save_result(("text", "answer"), self.chat_id, hops=3)
+        stats = app.save_result(("text", "answer"), self.chat_id, hops=2)
+
+        execute_prompt.assert_not_called()
+        self.assertEqual(stats, {"answers": 2, "hops": 5, "hops_per_answer": 2.5})
+
+    def test_saving_timeout_is_handed_to_save_result(
+        self, execute_prompt, crud_create_message, session_local, publish_message
+    ):
+        crud_create_message.side_effect = TimeLimitExceeded()
+
+        with patch.object(app.save_result, "apply_async") as apply_async:
+            self.execute()
+
+        apply_async.assert_called_once()
@@ -0,0 +1,43 @@
+import json
+import os
+import tempfile
+import uuid
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from data_copilot.celery_app.executors import ingestion_executor
+
+
+class IngestionExecutorTest(TestCase):
+    @patch.dict(os.environ, {"COMPUTE_BACKEND": "sql"})
+    @patch.object(ingestion_executor, "crud_set_artifact_version_progress")
+    @patch.object(ingestion_executor, "crud_get_artifact")
+    def test_run(self, crud_get_artifact, crud_set_progress):
+        artifact_id, artifact_version_id = uuid.uuid4(), uuid.uuid4()
+        crud_get_artifact.return_value = MagicMock(id=artifact_id)
+        raw = b"name;age\nAnna;31\nBeat;45\n"
+
+        with tempfile.TemporaryDirectory() as directory:
+            # the raw upload stored by the backend
+            with open(os.path.join(directory, "data.csv"), "wb") as file:
+                file.write(raw)
+            ingestion = ingestion_executor.ArtifactVersionIngestion(
+                MagicMock(), artifact_version_id, f"file://{directory}"
+            )
+
+            ingestion_executor.run(ingestion, artifact_id, "data.csv", "text/csv")
+
+            self.assertEqual(
+                sorted(os.listdir(directory)),
+                ["config.json", "data.csv", "df.parquet", "df.sqlite"],
+            )
+            with open(os.path.join(directory, "data.csv"), "rb") as file:
+                self.assertEqual(file.read(), raw)
+            with open(os.path.join(directory, "config.json")) as file:
+                config = json.load(file)
+
+        self.assertEqual(config["artifact_version_id"], str(artifact_version_id))
+        self.assertEqual(config["files"][0]["rows"], 2)
+        progress = [call.args[2] for call in crud_set_progress.call_args_list]
+        self.assertTrue(progress)
+        self.assertEqual(progress, sorted(progress))
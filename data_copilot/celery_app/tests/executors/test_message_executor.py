@@ -0,0 +1,51 @@
+import uuid
+from datetime import datetime
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from data_copilot.celery_app.executors import message_executor
+
+
+class MessageExecutorTest(TestCase):
+    @patch.object(message_executor, "crud_get_artifact_version")
+    @patch.object(message_executor, "crud_get_message")
+    def test_load_prompt(self, crud_get_message, crud_get_artifact_version):
+        created_at = datetime(2024, 1, 1)
+        crud_get_message.return_value = MagicMock(
+            content="How many rows?", created_at=created_at
+        )
+        crud_get_artifact_version.return_value = MagicMock(artifact_uri="file:///v1")
+
+        prompt = message_executor.load_prompt(MagicMock(), uuid.uuid4(), uuid.uuid4())
+        self.assertEqual(prompt, ("How many rows?", created_at, "file:///v1"))
+
+        crud_get_message.return_value = None
+        with self.assertRaises(LookupError):
+            message_executor.load_prompt(MagicMock(), uuid.uuid4(), None)
+
+    @patch.object(message_executor, "crud_get_previous_messages_sorted_desc")
+    def test_previous_messages_are_fetched_on_first_access(self, crud_get_previous):
+        crud_get_previous.return_value = [
+            MagicMock(content_type="json", content='{"method_name": "SQL"}'),
+            MagicMock(content_type="text", content="How many rows?"),
+        ]
+        session_factory = MagicMock()
+        messages = message_executor.PreviousMessages(
+            session_factory, uuid.uuid4(), uuid.uuid4(), datetime(2024, 1, 1), 10
+        )
+        self.assertFalse(messages.loaded)
+        session_factory.assert_not_called()
+
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(messages[0]["content"], {"method_name": "SQL"})
+        self.assertEqual([m["content_type"] for m in messages], ["json", "text"])
+        crud_get_previous.assert_called_once()
+        session_factory.return_value.close.assert_called_once()
+
+    def test_empty_context_window(self):
+        session_factory = MagicMock()
+        messages = message_executor.PreviousMessages(
+            session_factory, uuid.uuid4(), uuid.uuid4(), datetime(2024, 1, 1), 0
+        )
+        self.assertEqual(list(messages), [])
+        session_factory.assert_not_called()
@@ -0,0 +1,32 @@
+"""1. Artifact version progress
+
+Revision ID: 4f1c2b7e9a3d
+Revises: da02d508d980
+Create Date: 2026-10-18 09:12:31.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "4f1c2b7e9a3d"
+down_revision = "da02d508d980"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "artifact_versions",
+        sa.Column("progress", sa.Float(), server_default="0", nullable=False),
+    )
+    # The existing versions were processed within the upload request.
+    op.execute(
+        "UPDATE artifact_versions SET progress = 1 "
+        "WHERE status IN ('succeeded', 'active')"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("artifact_versions", "progress")
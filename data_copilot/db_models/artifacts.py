@@ -25,6 +25,8 @@ class ArtifactVersion(Base):
     description: Mapped[str] = mapped_column(default="")
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
     status: Mapped[str] = mapped_column(default="active")
+    # Share of the processing of the uploaded dataset which is done, from 0 to 1.
+    progress: Mapped[float] = mapped_column(default=0.0)
 
     artifact: Mapped["Artifact"] = relationship(back_populates="versions")
 
@@ -7,6 +7,7 @@ from data_copilot.execution_apps.base import DataCopilotApp
 class BACKENDS(enum.Enum):
     SQL = "sql"
     LANGCHAIN = "langchain"
+    DUCKDB = "duckdb"
 
 
 STANDARD_BACKEND = BACKENDS.SQL
@@ -23,3 +24,9 @@ def get_app() -> DataCopilotApp:
         )
 
         return LangchainInterpreter
+    elif os.environ.get("COMPUTE_BACKEND") == BACKENDS.DUCKDB.value:
+        from data_copilot.execution_apps.apps.duckdb_interpreter import (
+            DuckDBInterpreter,
+        )
+
+        return DuckDBInterpreter
@@ -0,0 +1,201 @@
+import os
+import tempfile
+import uuid
+from io import BytesIO
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
+
+from data_copilot.execution_apps.base import DataCopilotApp, StaticProperty
+
+if TYPE_CHECKING:
+    from data_copilot.execution_apps import helpers
+    from data_copilot.execution_apps.queries import QueryResult
+    from data_copilot.backend.artifacts.artifact import CreateArtifactVersionCM
+    from data_copilot.backend.schemas.artifacts import Artifact
+
+# Number of threads DuckDB uses per query. Defaults to the number of cores.
+DUCKDB_THREADS = os.environ.get("DUCKDB_THREADS")
+# Memory DuckDB may use per query before it spills to the temp directory.
+DUCKDB_MEMORY_LIMIT = os.environ.get("DUCKDB_MEMORY_LIMIT", "2GB")
+DUCKDB_TEMP_DIRECTORY = os.environ.get(
+    "DUCKDB_TEMP_DIRECTORY", os.path.join(tempfile.gettempdir(), "data_copilot_duckdb")
+)
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _create_dataset_view(
+    connection,
+    file_config: Dict,
+    artifact_version_id: uuid.UUID,
+    artifact_version_uri: str,
+) -> None:
+    """Create the view "df" with harmonized column names on top of the stored
+    dataset. DuckDB scans the Parquet or csv file directly, only the excel files
+    uploaded before the Parquet copy existed are loaded into memory.
+
+    Args:
+        connection (duckdb.DuckDBPyConnection): The DuckDB connection.
+        file_config (Dict): The config of the dataset file.
+        artifact_version_id (uuid.UUID): The id of the artifact version.
+        artifact_version_uri (str): The uri of the artifact version.
+    """
+    from data_copilot import storage_handler
+    from data_copilot.execution_apps import helpers
+    from data_copilot.execution_apps.datasets import load_dataset
+
+    columnar_file_name = file_config.get("columnar_file_name")
+    file_type = file_config.get("file_type", "")
+
+    if columnar_file_name is not None:
+        path = storage_handler.get_local_path(
+            os.path.join(artifact_version_uri, columnar_file_name)
+        )
+        source = f"read_parquet({_quote_literal(path)})"
+    elif file_type == "csv":
+        path = storage_handler.get_local_path(
+            os.path.join(artifact_version_uri, file_config.get("file_name"))
+        )
+        source = f"read_csv_auto({_quote_literal(path)}, header = true)"
+    else:
+        _, dataset = load_dataset(artifact_version_id, artifact_version_uri)
+        connection.register("dataset", dataset)
+        source = "dataset"
+
+    columns = list(file_config.get("file_schema", {}).keys())
+    projection = ", ".join(
+        f"{_quote_identifier(column)} AS {_quote_identifier(harmonized)}"
+        for column, harmonized in zip(columns, helpers.harmonize_column_names(columns))
+    )
+    connection.execute(f"CREATE VIEW df AS SELECT {projection} FROM {source}")
+
+
+def _execute_query(
+    query: str,
+    file_config: Dict,
+    artifact_version_id: uuid.UUID,
+    artifact_version_uri: str,
+) -> "QueryResult":
+    """Execute a query on the dataset of an artifact version within its budget,
+    and fetch the preview and the full result.
+
+    Args:
+        query (str): The cleaned query.
+        file_config (Dict): The config of the dataset file.
+        artifact_version_id (uuid.UUID): The id of the artifact version.
+        artifact_version_uri (str): The uri of the artifact version.
+
+    Returns:
+        QueryResult: The fetched result.
+    """
+    import duckdb
+
+    from data_copilot.execution_apps.queries import (
+        RESULT_MAX_ROWS,
+        QueryBudget,
+        fetch_result,
+        limit_query,
+    )
+
+    os.makedirs(DUCKDB_TEMP_DIRECTORY, exist_ok=True)
+    config = {
+        "memory_limit": DUCKDB_MEMORY_LIMIT,
+        "temp_directory": DUCKDB_TEMP_DIRECTORY,
+    }
+    if DUCKDB_THREADS:
+        config["threads"] = int(DUCKDB_THREADS)
+
+    with duckdb.connect(":memory:", config=config) as connection:
+        _create_dataset_view(
+            connection, file_config, artifact_version_id, artifact_version_uri
+        )
+        # Let the database stop after RESULT_MAX_ROWS rows, and fetch them
+        # incrementally into the preview and the persisted result, so the size
+        # of the full result is bounded.
+        limited_query = (
+            limit_query(query, RESULT_MAX_ROWS + 1) if RESULT_MAX_ROWS else None
+        )
+        budget = QueryBudget()
+        with budget.enforce_duckdb(connection):
+            try:
+                cursor = connection.execute(limited_query or query)
+            except duckdb.Error:
+                if limited_query is None or budget.exceeded:
+                    raise
+                cursor = connection.execute(query)
+
+            return fetch_result(
+                cursor.fetchmany, [column[0] for column in cursor.description]
+            )
+
+
+class DuckDBInterpreter(DataCopilotApp):
+    @StaticProperty
+    def supported_file_types(cls):
+        return {
+            "text/csv": "csv",
+            "application/vnd.ms-excel": "xls",
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "xlsx",
+        }
+
+    @staticmethod
+    def process_data_upload(
+        uploaded_files: List, artifact: "Artifact", cm: "CreateArtifactVersionCM"
+    ) -> List[Tuple[str, BytesIO]]:
+        from data_copilot.execution_apps.ingestion import process_tabular_upload
+
+        return process_tabular_upload(
+            uploaded_files,
+            artifact,
+            cm,
+            DuckDBInterpreter.supported_file_types,
+            sqlite_database=False,
+        )
+
+    @staticmethod
+    def warm_up(artifact_version_id: uuid.UUID, artifact_version_uri: str) -> None:
+        from data_copilot import storage_handler
+        from data_copilot.execution_apps.datasets import get_file_config, load_dataset
+        from data_copilot.execution_apps.profiling import get_stored_profile
+
+        file_config = get_file_config(artifact_version_id, artifact_version_uri)
+        # DuckDB scans the local copy of the Parquet or csv file, like in
+        # _create_dataset_view
+        file_name = file_config.get("columnar_file_name")
+        if file_name is None and file_config.get("file_type", "") == "csv":
+            file_name = file_config.get("file_name")
+        if file_name is not None:
+            storage_handler.get_local_path(
+                os.path.join(artifact_version_uri, file_name)
+            )
+        else:
+            load_dataset(artifact_version_id, artifact_version_uri)
+        # profiling would load the dataset, only a stored profile is fetched
+        get_stored_profile(artifact_version_id, artifact_version_uri)
+
+    @staticmethod
+    def execute_message(
+        user_prompt: str,
+        chat_id: uuid.UUID,
+        message_id: uuid.UUID,
+        artifact_version_id: uuid.UUID,
+        artifact_version_uri: str,
+        previous_messages: Sequence[dict],
+    ) -> "helpers.Message":
+        from data_copilot.execution_apps.apps.sql_interpreter import (
+            execute_sql_message,
+        )
+
+        return execute_sql_message(
+            user_prompt,
+            message_id,
+            artifact_version_id,
+            artifact_version_uri,
+            _execute_query,
+            dialect="DuckDB",
+        )
@@ -1,6 +1,6 @@
 import uuid
 from io import BytesIO
-from typing import TYPE_CHECKING, List, Tuple
+from typing import TYPE_CHECKING, List, Sequence, Tuple
 
 from data_copilot.execution_apps.base import DataCopilotApp, StaticProperty
 
@@ -23,47 +23,12 @@ class LangchainInterpreter(DataCopilotApp):
     def process_data_upload(
         uploaded_files: List, artifact: "Artifact", cm: "CreateArtifactVersionCM"
     ) -> List[Tuple[str, BytesIO]]:
-        import json
+        from data_copilot.execution_apps.ingestion import process_tabular_upload
 
-        import pandas as pd
-
-        file = uploaded_files[0]
-        file_type = LangchainInterpreter.supported_file_types.get(
-            file.content_type, None
+        return process_tabular_upload(
+            uploaded_files, artifact, cm, LangchainInterpreter.supported_file_types
         )
 
-        match file_type:
-            case "csv":
-                data_frame = pd.read_csv(file.file, sep=None, encoding="utf-8-sig")
-            case "xls" | "xlsx":
-                data_frame = pd.read_excel(file.file, dtype={"dteday": str})
-
-        if data_frame.empty:
-            raise ValueError("Empty file")
-
-        schema = {col: str(data_frame[col].dtype) for col in data_frame.columns}
-
-        file_config = {
-            "file_name": file.filename,
-            "file_type": file_type,
-            "file_schema": schema,
-            "rows": data_frame.shape[0],
-        }
-        artifact_version_config = {
-            "artifact_id": str(artifact.id),
-            "artifact_version_id": str(cm.uuid),
-            "files": [file_config],
-        }
-        file.file.seek(0)
-        files = [
-            (
-                "config.json",
-                json.dumps(artifact_version_config, indent=4),
-            ),
-            (file.filename, file.file),
-        ]
-        return files
-
     @staticmethod
     def execute_message(
         user_prompt: str,
@@ -71,48 +36,29 @@ class LangchainInterpreter(DataCopilotApp):
         message_id: uuid.UUID,
         artifact_version_id: uuid.UUID,
         artifact_version_uri: str,
-        previous_messages: List[dict],
+        previous_messages: Sequence[dict],
     ) -> "helpers.Message":
-        import json
         import logging
-        import os
 
         from langchain.agents import create_pandas_dataframe_agent
         from langchain.llms import OpenAI
         import openai
 
-        from data_copilot import storage_handler
         from data_copilot.execution_apps import helpers
+        from data_copilot.execution_apps.datasets import load_dataset
+        from data_copilot.execution_apps.llm_client import get_openai_client
 
         message = helpers.Message(helpers.MessageTypes.TEXT, "Answer")
 
         try:
-            artifact_config = json.load(
-                storage_handler.read_file(
-                    os.path.join(artifact_version_uri, "config.json")
-                )
-            )
-            file_type = artifact_config.get("files", [dict()])[0].get("file_type", "")
-            file_name = artifact_config.get("files", [dict()])[0].get("file_name", None)
-
-            if not storage_handler.exists(
-                os.path.join(artifact_version_uri, file_name)
-            ):
-                raise ValueError(
-                    f"The artifact version must contain a file named {file_name}",
-                )
-
-            dataset = helpers.read_dataset_io(
-                os.path.join(artifact_version_uri, file_name), file_type
-            )
-
-            if len(dataset.index) == 0:
-                raise Exception(
-                    f"Wrong '{os.path.join(artifact_version_uri, file_name)}' content"
-                )
+            _, dataset = load_dataset(artifact_version_id, artifact_version_uri)
 
             agent = create_pandas_dataframe_agent(
-                OpenAI(temperature=0), dataset, verbose=False
+                # the agent may modify the data frame, which is shared with the
+                # dataset cache
+                OpenAI(temperature=0, client=get_openai_client().completions),
+                dataset.copy(),
+                verbose=False,
             )
 
             answer = agent.run(user_prompt)
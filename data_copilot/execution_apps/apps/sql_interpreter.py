@@ -1,5 +1,7 @@
-from typing import List, Tuple
+from typing import Callable, List, Sequence, Tuple
 from io import BytesIO
+import os
+import threading
 import uuid
 
 from typing import TYPE_CHECKING
@@ -11,23 +13,105 @@ if TYPE_CHECKING:
     from data_copilot.backend.artifacts.artifact import CreateArtifactVersionCM
     from data_copilot.backend.schemas.artifacts import Artifact
     from data_copilot.execution_apps import helpers
+    from data_copilot.execution_apps.queries import QueryResult
 
 
-def generate_sql_query(prompt, columns):
-    from openai import OpenAI
+# The LLM translating the user prompts to SQL.
+SQL_GENERATION_MODEL = os.environ.get("SQL_GENERATION_MODEL", "gpt-3.5-turbo")
+# How a user prompt is translated: "two_step" first classifies the prompt and
+# then asks for the SQL or the explanation, "single" gets the verdict and the
+# SQL or the explanation from one structured completion and falls back to
+# "two_step" if that answer can not be parsed, "speculative" asks for the
+# classification and the SQL concurrently and discards the SQL if the prompt
+# turns out not to be answerable.
+SQL_GENERATION_MODE = os.environ.get("SQL_GENERATION_MODE", "two_step")
 
-    client = OpenAI()
+
+def generate_sql_query(prompt, columns, dialect="SQLite"):
+    """Translate a user prompt to a SQL query, or explain why it can not be
+    translated. Responses are cached by prompt, columns, model and dialect.
+
+    Args:
+        prompt (str): The user prompt.
+        columns (Iterable[str]): The column names of the dataset.
+        dialect (str, optional): The SQL dialect. Defaults to "SQLite".
+
+    Returns:
+        Tuple[str, str]: The response type, "SQL" or "TEXT", and the response.
+    """
+    from data_copilot.execution_apps.llm_cache import get_llm_cache, llm_cache_key
 
     columns = harmonize_column_names(columns)
-    cols_text = ", ".join(["'" + col + "'" for col in columns])
 
-    rule_1 = (
+    cache = get_llm_cache()
+    key = llm_cache_key(prompt, columns, SQL_GENERATION_MODEL, dialect)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    response_type, response, cacheable = _generate_sql_query(prompt, columns, dialect)
+    if cache is not None and cacheable:
+        cache.set(key, (response_type, response))
+    return (response_type, response)
+
+
+class SpeculationStatistics:
+    """Class to count the speculative SQL generations and how many of them were
+    wasted because the classification rejected the prompt."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.speculations = 0
+        self.wasted = 0
+
+    @property
+    def waste_rate(self) -> float:
+        """The share of speculative SQL generations which were discarded."""
+        return self.wasted / self.speculations if self.speculations else 0.0
+
+    def record(self, wasted: bool) -> None:
+        with self._lock:
+            self.speculations += 1
+            self.wasted += int(wasted)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.speculations = 0
+            self.wasted = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "speculations": self.speculations,
+            "wasted": self.wasted,
+            "waste_rate": self.waste_rate,
+        }
+
+
+speculation_stats = SpeculationStatistics()
+
+
+def _system_rule(dialect):
+    return (
         "You are an assistant which helps a user to translate a business "
         "question he has about a dataset to a SQL query. You don't execute "
         "the query on the data yourself. You are only allowed to write SQL "
-        "queries that are compatible with SQLite."
+        f"queries that are compatible with {dialect}."
     )
-    prompt_1 = (
+
+
+def _complete(client, messages, **kwargs) -> str:
+    return (
+        client.chat.completions.create(
+            model=SQL_GENERATION_MODEL, messages=messages, **kwargs
+        )
+        .choices[0]
+        .message.content
+    )
+
+
+def _classify(client, prompt, cols_text, dialect) -> str:
+    user_prompt = (
         "Please answer if the following user question can be "
         "answered with an sql query and no additional text: "
         f"{prompt}\n"
@@ -35,86 +119,371 @@ def generate_sql_query(prompt, columns):
         f"The column name of the data are: {cols_text}"
         "Answer [yes/no]: "
     )
+    messages = [
+        {"role": "system", "content": _system_rule(dialect)},
+        {"role": "user", "content": user_prompt},
+    ]
+    return _complete(client, messages, max_tokens=1)
 
+
+def _write_sql(client, prompt, cols_text, dialect) -> str:
+    user_prompt = (
+        "Please answer the following user question with an sql query "
+        "and no additional text: "
+        f"{prompt}\n"
+        "The table is called: df \n"
+        f"The column name of the data are: {cols_text}"
+        f"{dialect} Query:"
+    )
     messages = [
-        {"role": "system", "content": rule_1},
-        {"role": "user", "content": prompt_1},
+        {"role": "system", "content": _system_rule(dialect)},
+        {"role": "user", "content": user_prompt},
     ]
+    return _complete(client, messages, temperature=0.0)
 
-    response = (
-        client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=messages,
-            max_tokens=1,
-        )
-        .choices[0]
-        .message.content
+
+def _explain(client, prompt, cols_text, dialect) -> str:
+    user_prompt = (
+        "Please explain why it is not possible to translate the "
+        "following question to sql: "
+        f"{prompt}\n"
+        "The table is called: df \n"
+        f"The column name of the data are: {cols_text}"
+        "Your Answer:"
     )
+    messages = [
+        {"role": "system", "content": _system_rule(dialect)},
+        {"role": "user", "content": user_prompt},
+    ]
+    return _complete(client, messages)
 
-    if response.lower() in ("y", "yes"):
-        response_type = "SQL"
-
-        rule_2 = (
-            "You are an assistant which helps a user to translate a "
-            "business question he has about a dataset to a SQL query. "
-            "You don't execute the query on the data yourself. You are "
-            "only allowed to write SQL queries that are compatible with "
-            "SQLite."
-        )
-        prompt_2 = (
-            "Please answer the following user question with an sql query "
-            "and no additional text: "
-            f"{prompt}\n"
-            "The table is called: df \n"
-            f"The column name of the data are: {cols_text}"
-            "SQLite Query:"
-        )
-        messages = [
-            {"role": "system", "content": rule_2},
-            {"role": "user", "content": prompt_2},
-        ]
-
-        response = (
-            client.chat.completions.create(
-                model="gpt-3.5-turbo", messages=messages, temperature=0.0
-            )
-            .choices[0]
-            .message.content
-        )
 
+def _generate_two_step(client, prompt, cols_text, dialect):
+    response = _classify(client, prompt, cols_text, dialect)
+
+    if response.lower() in ("y", "yes"):
+        return ("SQL", _write_sql(client, prompt, cols_text, dialect), True)
     elif response.lower() in ("n", "no"):
-        response_type = "TEXT"
-        rule_3 = (
-            "You are an assistant which helps a user to translate a "
-            "business question he has about a dataset to a SQL query. "
-            "You don't execute the query on the data yourself. You are "
-            "only allowed to write SQL queries that are compatible with "
-            "SQLite."
-        )
-        prompt_3 = (
-            "Please explain why it is not possible to translate the "
-            "following question to sql: "
-            f"{prompt}\n"
-            "The table is called: df \n"
-            f"The column name of the data are: {cols_text}"
-            "Your Answer:"
+        return ("TEXT", _explain(client, prompt, cols_text, dialect), True)
+    # the classification could not be parsed, don't cache it
+    return ("TEXT", response, False)
+
+
+def _generate_speculative(client, prompt, cols_text, dialect):
+    import logging
+    from concurrent.futures import ThreadPoolExecutor
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        sql_future = executor.submit(_write_sql, client, prompt, cols_text, dialect)
+        response = _classify(client, prompt, cols_text, dialect)
+
+        if response.lower() in ("y", "yes"):
+            speculation_stats.record(wasted=False)
+            return ("SQL", sql_future.result(), True)
+
+        # The speculative SQL is not needed, don't wait for it.
+        sql_future.cancel()
+        speculation_stats.record(wasted=True)
+        logging.info(
+            "Discarded a speculative SQL generation -- "
+            f"Speculation stats: {speculation_stats.to_dict()}"
         )
+        if response.lower() in ("n", "no"):
+            return ("TEXT", _explain(client, prompt, cols_text, dialect), True)
+        # the classification could not be parsed, don't cache it
+        return ("TEXT", response, False)
+    finally:
+        executor.shutdown(wait=False)
+
+
+def parse_structured_response(response: str) -> Tuple[str, str] | None:
+    """Parse the answer of the single call mode, a JSON object with the verdict
+    "answerable" and either the "sql" query or the "explanation".
+
+    Args:
+        response (str): The answer of the LLM.
+
+    Returns:
+        Tuple[str, str] | None: The response type, "SQL" or "TEXT", and the
+            response, or None if the answer does not follow the format.
+    """
+    import json
+
+    text = response.strip()
+    if text.startswith("```"):
+        text = text.strip("`").strip()
+        if text.lower().startswith("json"):
+            text = text[4:]
+    try:
+        answer = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(answer, dict):
+        return None
+
+    answerable = answer.get("answerable")
+    sql = answer.get("sql")
+    explanation = answer.get("explanation")
+    if answerable is True and isinstance(sql, str) and sql.strip():
+        return ("SQL", sql)
+    if answerable is False and isinstance(explanation, str) and explanation.strip():
+        return ("TEXT", explanation)
+    return None
+
+
+def _generate_single_call(client, prompt, cols_text, dialect):
+    user_prompt = (
+        "Please decide if the following user question can be answered with "
+        f"an sql query: {prompt}\n"
+        "The table is called: df \n"
+        f"The column name of the data are: {cols_text}\n"
+        "Answer with a JSON object and no additional text. If the question "
+        'can be answered, use the format {"answerable": true, "sql": "<the '
+        f'{dialect} query>"}}. Otherwise use the format {{"answerable": false, '
+        '"explanation": "<why it is not possible to translate the question to '
+        'sql>"}.'
+    )
+    messages = [
+        {"role": "system", "content": _system_rule(dialect)},
+        {"role": "user", "content": user_prompt},
+    ]
+    response = _complete(client, messages, temperature=0.0)
+
+    parsed = parse_structured_response(response)
+    if parsed is None:
+        return None
+    return (*parsed, True)
+
+
+def _generate_sql_query(prompt, columns, dialect):
+    import logging
 
-        messages = [
-            {"role": "system", "content": rule_3},
-            {"role": "user", "content": prompt_3},
-        ]
+    from data_copilot.execution_apps.llm_client import get_openai_client
 
-        response = (
-            client.chat.completions.create(model="gpt-3.5-turbo", messages=messages)
-            .choices[0]
-            .message.content
+    client = get_openai_client()
+
+    cols_text = ", ".join(["'" + col + "'" for col in columns])
+
+    if SQL_GENERATION_MODE == "single":
+        result = _generate_single_call(client, prompt, cols_text, dialect)
+        if result is not None:
+            return result
+        logging.warning(
+            "The structured answer of the LLM could not be parsed, falling back "
+            f"to the two step generation -- Prompt: {prompt}"
         )
+    elif SQL_GENERATION_MODE == "speculative":
+        return _generate_speculative(client, prompt, cols_text, dialect)
+    return _generate_two_step(client, prompt, cols_text, dialect)
+
+
+def _execute_query(
+    query: str,
+    file_config: dict,
+    artifact_version_id: uuid.UUID,
+    artifact_version_uri: str,
+) -> "QueryResult":
+    """Execute a query on the SQLite database of an artifact version within
+    its budget, and fetch the preview and the full result.
+
+    Args:
+        query (str): The cleaned query.
+        file_config (dict): The config of the dataset file.
+        artifact_version_id (uuid.UUID): The id of the artifact version.
+        artifact_version_uri (str): The uri of the artifact version.
+
+    Returns:
+        QueryResult: The fetched result.
+    """
+    from functools import partial
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.exc import DBAPIError
+
+    from data_copilot import storage_handler
+    from data_copilot.execution_apps import helpers
+    from data_copilot.execution_apps.datasets import load_dataset
+    from data_copilot.execution_apps.queries import (
+        RESULT_MAX_ROWS,
+        QueryBudget,
+        fetch_result,
+        limit_query,
+    )
+    from data_copilot.execution_apps.sqlite_database import connect_read_only
 
+    sqlite_file_name = file_config.get("sqlite_file_name")
+    if sqlite_file_name is not None:
+        sqlite_path = storage_handler.get_local_path(
+            os.path.join(artifact_version_uri, sqlite_file_name)
+        )
+        engine = create_engine(
+            "sqlite://", creator=partial(connect_read_only, sqlite_path)
+        )
     else:
-        response_type = "TEXT"
+        # artifact versions uploaded before the SQLite database was built at
+        # upload time
+        _, dataset = load_dataset(artifact_version_id, artifact_version_uri)
+        engine = create_engine("sqlite:///:memory:")
+        # Write the DataFrame to the SQL table
+
+        # shallow copy, the cached dataset must not be modified
+        dataset = dataset.copy(deep=False)
+        dataset.columns = helpers.harmonize_column_names(dataset.columns)
+
+        dataset.to_sql("df", engine, if_exists="replace", index=False)
+
+    # Let the database stop after RESULT_MAX_ROWS rows, and fetch them
+    # incrementally into the preview and the persisted result, so the size of
+    # the full result is bounded.
+    limited_query = limit_query(query, RESULT_MAX_ROWS + 1) if RESULT_MAX_ROWS else None
+
+    # Create a connection and execute the query within its budget
+    budget = QueryBudget()
+    with engine.connect() as connection, budget.enforce_sqlite(
+        connection.connection.driver_connection
+    ):
+        try:
+            result = connection.exec_driver_sql(limited_query or query)
+        except DBAPIError:
+            if limited_query is None or budget.exceeded:
+                raise
+            connection.rollback()
+            result = connection.exec_driver_sql(query)
+
+        query_result = fetch_result(result.fetchmany, list(result.keys()))
+        result.close()
+
+    engine.dispose()
+    return query_result
+
+
+def execute_sql_message(
+    user_prompt: str,
+    message_id: uuid.UUID,
+    artifact_version_id: uuid.UUID,
+    artifact_version_uri: str,
+    execute_query: Callable[[str, dict, uuid.UUID, str], "QueryResult"],
+    dialect: str = "SQLite",
+) -> "helpers.Message":
+    """Answer a user prompt about the dataset of an artifact version: translate
+    it to SQL, execute the query with the engine specific `execute_query`
+    unless its result is cached, and build the message of the answer. Errors
+    are answered with an error message.
+
+    Args:
+        user_prompt (str): The user prompt.
+        message_id (uuid.UUID): The id of the message.
+        artifact_version_id (uuid.UUID): The id of the artifact version.
+        artifact_version_uri (str): The uri of the artifact version.
+        execute_query (Callable[[str, dict, uuid.UUID, str], QueryResult]):
+            Executes a cleaned query with the config of the dataset file on the
+            dataset of the artifact version.
+        dialect (str, optional): The SQL dialect. Defaults to "SQLite".
+
+    Returns:
+        helpers.Message: The answer.
+    """
+    import logging
+
+    import openai
 
-    return (response_type, response)
+    from data_copilot.execution_apps import helpers
+    from data_copilot.execution_apps.datasets import get_file_config
+    from data_copilot.execution_apps.queries import QueryBudgetExceeded, clean_query
+    from data_copilot.execution_apps.result_cache import (
+        get_result_cache,
+        result_cache_key,
+    )
+    from data_copilot.execution_apps.results import persist_result, result_exists
+
+    try:
+        file_config = get_file_config(artifact_version_id, artifact_version_uri)
+        schema = file_config.get("file_schema", {})
+
+        query = generate_sql_query(user_prompt, schema.keys(), dialect=dialect)
+
+        if query[0] == "TEXT":
+            message = helpers.Message(helpers.MessageTypes.TEXT, "Answer")
+            message.add_text(query[1])
+
+        else:  # query[0] == "SQL"
+            query = clean_query(query[1])
+            # Artifact versions are immutable, so a cached result of the same
+            # query is never stale.
+            cache = get_result_cache()
+            key = result_cache_key(artifact_version_id, query, dialect)
+            table = cache.get(key) if cache is not None else None
+            if table is not None and not result_exists(
+                artifact_version_uri, table["result"]
+            ):
+                # the persisted result of the cached answer expired
+                table = None
+            if table is None:
+                query_result = execute_query(
+                    query, file_config, artifact_version_id, artifact_version_uri
+                )
+                table = {
+                    "data": helpers.format_data(dict(query_result.preview.items())),
+                    "result": persist_result(
+                        query_result, artifact_version_uri, message_id
+                    ),
+                }
+                if cache is not None:
+                    cache.set(key, table)
+            if cache is not None:
+                logging.debug(f"Result cache statistics: {cache.stats.to_dict()}")
+
+            message = helpers.Message(helpers.MessageTypes.JSON, "SQL")
+            table_component = helpers.Component(
+                "Column Names", helpers.ComponentTypes.TABLE
+            )
+            table_component.description = "The Result of your SQL Query"
+            table_component.config = {
+                "show_title": True,
+                "show_description": False,
+                "highlight_columns": [],
+            }
+            table_component.data = table["data"]
+            table_component.result = table["result"]
+            message.add_component(table_component)
+
+    except QueryBudgetExceeded as e:
+        logging.warning(f"{e} -- Prompt: {user_prompt} -- message_id: {message_id}")
+        message = helpers.Message(helpers.MessageTypes.ERROR, "Answer")
+        message.add_text(f"{e} Please try to ask a simpler question or narrow it down.")
+
+    except openai.RateLimitError:
+        logging.error(
+            "The translation of the user prompt failed due to rate limit error --"
+            f"Prompt: {user_prompt} --"
+            f"message_id: {message_id}"
+        )
+        message = helpers.Message(helpers.MessageTypes.ERROR, "Answer")
+        message.add_text("Rate limit error from OpenAI API. Please try again later")
+
+    except openai.AuthenticationError:
+        logging.error(
+            "The translation of the user prompt failed due to authentication "
+            f"error -- Prompt: {user_prompt} --"
+            f"message_id: {message_id}"
+        )
+        message = helpers.Message(helpers.MessageTypes.ERROR, "Answer")
+        message.add_text("OpenAI API key is invalid")
+
+    except Exception as e:
+        logging.error(
+            f"An error occured while executing the user prompt: {e} --"
+            f"Prompt: {user_prompt} --"
+            f"message_id: {message_id}"
+        )
+
+        logging.exception(e)
+        message = helpers.Message(helpers.MessageTypes.ERROR, "Answer")
+        message.add_text(
+            "An error occured while executing. Please have a look at the logs."
+        )
+    return message
 
 
 class SQLInterpreter(DataCopilotApp):
@@ -130,43 +499,29 @@ class SQLInterpreter(DataCopilotApp):
     def process_data_upload(
         uploaded_files: List, artifact: "Artifact", cm: "CreateArtifactVersionCM"
     ) -> List[Tuple[str, BytesIO]]:
-        import pandas as pd
-        import json
-
-        file = uploaded_files[0]
-        file_type = SQLInterpreter.supported_file_types.get(file.content_type, None)
-
-        match file_type:
-            case "csv":
-                data_frame = pd.read_csv(file.file, sep=None, encoding="utf-8-sig")
-            case "xls" | "xlsx":
-                data_frame = pd.read_excel(file.file, dtype={"dteday": str})
-
-        if data_frame.empty:
-            raise ValueError("Empty file")
+        from data_copilot.execution_apps.ingestion import process_tabular_upload
 
-        schema = {col: str(data_frame[col].dtype) for col in data_frame.columns}
+        return process_tabular_upload(
+            uploaded_files, artifact, cm, SQLInterpreter.supported_file_types
+        )
 
-        file_config = {
-            "file_name": file.filename,
-            "file_type": file_type,
-            "file_schema": schema,
-            "rows": data_frame.shape[0],
-        }
-        artifact_version_config = {
-            "artifact_id": str(artifact.id),
-            "artifact_version_id": str(cm.uuid),
-            "files": [file_config],
-        }
-        file.file.seek(0)
-        files = [
-            (
-                "config.json",
-                json.dumps(artifact_version_config, indent=4),
-            ),
-            (file.filename, file.file),
-        ]
-        return files
+    @staticmethod
+    def warm_up(artifact_version_id: uuid.UUID, artifact_version_uri: str) -> None:
+        from data_copilot import storage_handler
+        from data_copilot.execution_apps.datasets import get_file_config, load_dataset
+        from data_copilot.execution_apps.profiling import get_stored_profile
+
+        file_config = get_file_config(artifact_version_id, artifact_version_uri)
+        sqlite_file_name = file_config.get("sqlite_file_name")
+        if sqlite_file_name is not None:
+            # the queries only need the local copy of the SQLite database
+            storage_handler.get_local_path(
+                os.path.join(artifact_version_uri, sqlite_file_name)
+            )
+        else:
+            load_dataset(artifact_version_id, artifact_version_uri)
+        # profiling would load the dataset, only a stored profile is fetched
+        get_stored_profile(artifact_version_id, artifact_version_uri)
 
     @staticmethod
     def execute_message(
@@ -175,108 +530,12 @@ class SQLInterpreter(DataCopilotApp):
         message_id: uuid.UUID,
         artifact_version_id: uuid.UUID,
         artifact_version_uri: str,
-        previous_messages: List[dict],
+        previous_messages: Sequence[dict],
     ) -> "helpers.Message":
-        import json
-        import os
-        from data_copilot import storage_handler
-        import logging
-        from data_copilot.execution_apps import helpers
-        import openai
-        import pandas as pd
-        from sqlalchemy import create_engine, text
-
-        try:
-            artifact_config = json.load(
-                storage_handler.read_file(
-                    os.path.join(artifact_version_uri, "config.json")
-                )
-            )
-            file_type = artifact_config.get("files", [dict()])[0].get("file_type", "")
-            file_name = artifact_config.get("files", [dict()])[0].get("file_name", None)
-            schema = artifact_config.get("files", [dict()])[0].get("file_schema", {})
-
-            if not storage_handler.exists(
-                os.path.join(artifact_version_uri, file_name)
-            ):
-                raise ValueError(
-                    f"The artifact version must contain a file named {file_name}",
-                )
-
-            dataset = helpers.read_dataset_io(
-                os.path.join(artifact_version_uri, file_name), file_type
-            )
-
-            if len(dataset.index) == 0:
-                raise Exception(
-                    f"Wrong '{os.path.join(artifact_version_uri, file_name)}' content"
-                )
-
-            query = generate_sql_query(user_prompt, schema.keys())
-
-            if query[0] == "TEXT":
-                message = helpers.Message(helpers.MessageTypes.TEXT, "Answer")
-                message.add_text(query[1])
-
-            else:  # query[0] == "SQL"
-                engine = create_engine("sqlite:///:memory:")
-                # Write the DataFrame to the SQL table
-
-                dataset.columns = helpers.harmonize_column_names(dataset.columns)
-
-                dataset.to_sql("df", engine, if_exists="replace", index=False)
-
-                # Your query variable
-                query = text(query[1].replace("```", "").strip())
-
-                # Create a connection and execute the query
-                with engine.connect() as connection:
-                    result_df = pd.read_sql_query(query, connection)
-
-                    # limit the result to 100 rows
-                    result_df = result_df.head(100)
-
-                engine.dispose()
-
-                message = helpers.Message(helpers.MessageTypes.JSON, "SQL")
-                table_component = helpers.Component(
-                    "Column Names", helpers.ComponentTypes.TABLE
-                )
-                table_component.description = "The Result of your SQL Query"
-                table_component.config = {
-                    "show_title": True,
-                    "show_description": False,
-                    "highlight_columns": [],
-                }
-                table_component.data = result_df.to_dict("list")
-                message.add_component(table_component)
-
-        except openai.RateLimitError:
-            logging.error(
-                "The translation of the user prompt failed due to rate limit error --"
-                f"Prompt: {user_prompt} --"
-                f"message_id: {message_id}"
-            )
-            message = helpers.Message(helpers.MessageTypes.ERROR, "Answer")
-            message.add_text("Rate limit error from OpenAI API. Please try again later")
-
-        except openai.AuthenticationError:
-            logging.error(
-                "The translation of the user prompt failed due to authentication "
-                f"error -- Prompt: {user_prompt} --"
-                f"message_id: {message_id}"
-            )
-            message.add_text("OpenAI API key is invalid")
-
-        except Exception as e:
-            logging.error(
-                f"An error occured while translating the user prompt: {e} --"
-                f"Prompt: {user_prompt} --"
-                f"message_id: {message_id}"
-            )
-
-            logging.exception(e)
-            message.add_text(
-                "An error occured while executing. Please have a look at the logs."
-            )
-        return message
+        return execute_sql_message(
+            user_prompt,
+            message_id,
+            artifact_version_id,
+            artifact_version_uri,
+            _execute_query,
+        )
@@ -1,7 +1,7 @@
 import abc
 import uuid
 from io import BytesIO
-from typing import List, Tuple
+from typing import List, Sequence, Tuple
 
 from typing import TYPE_CHECKING
 
@@ -40,6 +40,24 @@ class DataCopilotApp(abc.ABC):
         message_id: uuid.UUID,
         artifact_version_id: uuid.UUID,
         artifact_version_uri: str,
-        previous_messages: List[dict],
+        previous_messages: Sequence[dict],
     ) -> "helpers.Message":
         pass
+
+    @staticmethod
+    def warm_up(artifact_version_id: uuid.UUID, artifact_version_uri: str) -> None:
+        """Prepare the dataset of an artifact version before the first message
+        about it arrives: build the derived files which are computed on first
+        use and load what `execute_message` needs into the caches of the
+        worker. Loads the dataset and its stored profile by default, profiles
+        are never computed by the warm-up.
+
+        Args:
+            artifact_version_id (uuid.UUID): The id of the artifact version.
+            artifact_version_uri (str): The uri of the artifact version.
+        """
+        from data_copilot.execution_apps.datasets import load_dataset
+        from data_copilot.execution_apps.profiling import get_stored_profile
+
+        load_dataset(artifact_version_id, artifact_version_uri)
+        get_stored_profile(artifact_version_id, artifact_version_uri)
@@ -0,0 +1,254 @@
+import abc
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class CacheStatistics:
+    """Class to count the hits, misses and evictions of a cache."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of lookups which were answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def reset(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+
+class CacheABC(abc.ABC):
+    """Cache of the answers of an expensive step, which counts its lookups."""
+
+    def __init__(self) -> None:
+        self.stats = CacheStatistics()
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Any:
+        """Return the cached value, or None."""
+        pass
+
+    @abc.abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+
+class LRUCache:
+    """
+    Thread safe in-process cache with least recently used eviction.
+
+    The capacity is expressed in the unit returned by `sizeof`, which counts
+    every entry as 1 by default. Pass e.g. a function returning the memory
+    footprint of a value to get a cache bounded in bytes.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        sizeof: Callable[[Any], int] = lambda value: 1,
+        ttl: float | None = None,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_size (int): The capacity of the cache. 0 disables the cache.
+            sizeof (Callable[[Any], int], optional): Returns the size of a value.
+                Defaults to counting every entry as 1.
+            ttl (float, optional): Seconds after which an entry expires.
+                Defaults to None, i.e. entries never expire.
+        """
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self.ttl = ttl
+        self.size = 0
+        self.stats = CacheStatistics()
+        # key -> (value, size, expiry timestamp)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._is_expired(entry)
+
+    def _is_expired(self, entry: tuple) -> bool:
+        return entry[2] is not None and entry[2] < time.monotonic()
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.size -= size
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value and mark it as recently used.
+
+        Args:
+            key (Hashable): The key of the value.
+            default (Any, optional): Returned on a cache miss. Defaults to None.
+
+        Returns:
+            Any: The cached value or the default.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._is_expired(entry):
+                if entry is not None:
+                    self._remove(key)
+                self.stats.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> bool:
+        """Add a value to the cache, evicting the least recently used entries
+        until it fits.
+
+        Args:
+            key (Hashable): The key of the value.
+            value (Any): The value to cache.
+
+        Returns:
+            bool: False if the value is larger than the capacity of the cache and
+                was therefore not added.
+        """
+        size = self.sizeof(value)
+        if size > self.max_size:
+            return False
+
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and self.size + size > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.stats.evictions += 1
+            self._entries[key] = (value, size, expires_at)
+            self.size += size
+        return True
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove a value from the cache, if present."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Remove all values from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class RedisLRUCache:
+    """
+    Cache in Redis shared by all workers, with values stored as JSON. A sorted
+    set of the keys by last access is used to evict the least recently used
+    entries once there are more than `max_entries`. Errors of Redis are logged
+    and count as misses, so the callers fall back to computing the value.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        prefix: str,
+        max_entries: int,
+        ttl: float | None = None,
+        dumps: Callable[[Any], str | bytes] = json.dumps,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            url (str): The url of the Redis server.
+            prefix (str): The prefix of the keys of the cache in Redis.
+            max_entries (int): The number of entries.
+            ttl (float, optional): Seconds after which an entry expires.
+                Defaults to None, i.e. entries never expire.
+            dumps (Callable[[Any], str | bytes], optional): Encodes a value as
+                JSON. Defaults to json.dumps.
+        """
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.index = f"{prefix}:index"
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.dumps = dumps
+        self.stats = CacheStatistics()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value and mark it as recently used.
+
+        Args:
+            key (str): The key of the value.
+            default (Any, optional): Returned on a cache miss. Defaults to None.
+
+        Returns:
+            Any: The cached value or the default.
+        """
+        import redis
+
+        try:
+            value = self.client.get(f"{self.prefix}:{key}")
+            if value is None:
+                # expired or evicted
+                self.client.zrem(self.index, key)
+                self.stats.misses += 1
+                return default
+            self.client.zadd(self.index, {key: time.time()})
+        except redis.RedisError as e:
+            logging.warning(f"Could not read from the cache {self.prefix}: {e}")
+            self.stats.misses += 1
+            return default
+
+        self.stats.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        """Add a value to the cache, evicting the least recently used entries
+        if there are more than `max_entries`.
+
+        Args:
+            key (str): The key of the value.
+            value (Any): The value to cache.
+        """
+        import redis
+
+        ex = int(self.ttl) if self.ttl is not None else None
+        try:
+            pipeline = self.client.pipeline()
+            pipeline.set(f"{self.prefix}:{key}", self.dumps(value), ex=ex)
+            pipeline.zadd(self.index, {key: time.time()})
+            pipeline.zcard(self.index)
+            size = pipeline.execute()[-1]
+
+            if size > self.max_entries:
+                evicted = self.client.zpopmin(self.index, size - self.max_entries)
+                if evicted:
+                    self.client.delete(
+                        *[f"{self.prefix}:{k.decode()}" for k, _ in evicted]
+                    )
+                    self.stats.evictions += len(evicted)
+        except redis.RedisError as e:
+            logging.warning(f"Could not write to the cache {self.prefix}: {e}")
@@ -0,0 +1,242 @@
+import json
+import logging
+import os
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Tuple
+
+from data_copilot import storage_handler
+from data_copilot.execution_apps import helpers
+from data_copilot.execution_apps.cache import LRUCache
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Memory budget in bytes of the datasets kept in memory by every worker process.
+DATASET_CACHE_MAX_BYTES = int(
+    os.environ.get("DATASET_CACHE_MAX_BYTES", 512 * 1024 * 1024)
+)
+
+
+def _sizeof(entry: Tuple[Dict[str, Any], "pd.DataFrame"]) -> int:
+    _, dataset = entry
+    return int(dataset.memory_usage(index=True, deep=True).sum())
+
+
+# Artifact versions are immutable once they were created, therefore the
+# artifact version id is a key which never has to be invalidated.
+dataset_cache = LRUCache(max_size=DATASET_CACHE_MAX_BYTES, sizeof=_sizeof)
+
+
+# The configs are small, the number of cached configs is bounded instead.
+config_cache = LRUCache(max_size=1024)
+
+# String columns with at most this share of distinct values are loaded as
+# categoricals.
+CATEGORY_MAX_DISTINCT_RATIO = float(os.environ.get("CATEGORY_MAX_DISTINCT_RATIO", 0.5))
+# Integers are not downcast below 32 bits, narrower integers overflow silently
+# in pandas arithmetic.
+INTEGER_DTYPES = ("int32", "int64")
+
+
+def _downcast_integers(column: "pd.Series", nullable: bool) -> "pd.Series":
+    import numpy as np
+
+    low, high = column.min(), column.max()
+    for dtype in INTEGER_DTYPES:
+        if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+            break
+    return column.astype(dtype.capitalize() if nullable else dtype)
+
+
+def compact_dataset(data_frame: "pd.DataFrame") -> "pd.DataFrame":
+    """Convert the columns of a dataset to compact dtypes: integers to the
+    smallest integer type of at least 32 bits, floats with missing but otherwise
+    integral values, which pandas parses as float, to nullable integers and
+    strings with few distinct values to categoricals.
+
+    Args:
+        data_frame (pd.DataFrame): The dataset.
+
+    Returns:
+        pd.DataFrame: The dataset with compact dtypes.
+    """
+    import numpy as np
+    import pandas as pd
+
+    columns = {}
+    for name in data_frame.columns:
+        column = data_frame[name]
+        values = column.dropna()
+        if values.empty:
+            columns[name] = column
+        elif pd.api.types.is_bool_dtype(column):
+            columns[name] = column
+        elif pd.api.types.is_integer_dtype(column) and column.dtype.kind == "i":
+            columns[name] = _downcast_integers(column, nullable=False)
+        elif pd.api.types.is_float_dtype(column):
+            # complete float columns stay floats, which keeps the division of
+            # SQL queries on them a float division
+            missing = column.isna().any()
+            finite = np.isfinite(values).all()
+            integral = finite and (values == np.round(values)).all()
+            if missing and integral and (values.abs() < 2**53).all():
+                columns[name] = _downcast_integers(
+                    column.astype("Int64"), nullable=True
+                )
+            else:
+                columns[name] = column
+        elif column.dtype == object and pd.api.types.infer_dtype(values) == "string":
+            if values.nunique() <= CATEGORY_MAX_DISTINCT_RATIO * len(column.index):
+                columns[name] = column.astype("category")
+            else:
+                columns[name] = column
+        else:
+            columns[name] = column
+    return pd.DataFrame(columns, index=data_frame.index)
+
+
+def read_artifact_version_config(artifact_version_uri: str) -> Dict[str, Any]:
+    """Read the config.json of an artifact version.
+
+    Args:
+        artifact_version_uri (str): The uri of the artifact version.
+
+    Returns:
+        Dict[str, Any]: The artifact version config.
+    """
+    return json.load(
+        storage_handler.read_file(os.path.join(artifact_version_uri, "config.json"))
+    )
+
+
+def get_file_config(
+    artifact_version_id: uuid.UUID | str, artifact_version_uri: str
+) -> Dict[str, Any]:
+    """Return the config of the dataset file of an artifact version.
+
+    Args:
+        artifact_version_id (uuid.UUID | str): The id of the artifact version.
+        artifact_version_uri (str): The uri of the artifact version.
+
+    Returns:
+        Dict[str, Any]: The config of the dataset file.
+    """
+    key = str(artifact_version_id)
+    file_config = config_cache.get(key)
+    if file_config is None:
+        artifact_config = read_artifact_version_config(artifact_version_uri)
+        file_config = artifact_config.get("files", [dict()])[0]
+        config_cache.set(key, file_config)
+    return file_config
+
+
+def load_dataset(
+    artifact_version_id: uuid.UUID | str, artifact_version_uri: str
+) -> Tuple[Dict[str, Any], "pd.DataFrame"]:
+    """Load the dataset of an artifact version, from the worker's cache if it was
+    loaded before. The returned data frame is shared with the cache and must not
+    be modified in place.
+
+    Args:
+        artifact_version_id (uuid.UUID | str): The id of the artifact version.
+        artifact_version_uri (str): The uri of the artifact version.
+
+    Raises:
+        ValueError: If the dataset file of the artifact version does not exist.
+        Exception: If the dataset is empty.
+
+    Returns:
+        Tuple[Dict[str, Any], pd.DataFrame]: The config of the dataset file and
+            the dataset.
+    """
+    key = str(artifact_version_id)
+    entry = dataset_cache.get(key)
+    if entry is not None:
+        return entry
+
+    file_config = get_file_config(artifact_version_id, artifact_version_uri)
+    file_name = file_config.get("file_name", None)
+    columnar_file_name = file_config.get("columnar_file_name")
+
+    if not storage_handler.exists(os.path.join(artifact_version_uri, file_name)):
+        raise ValueError(
+            f"The artifact version must contain a file named {file_name}",
+        )
+
+    dataset = helpers.read_dataset_io(
+        os.path.join(artifact_version_uri, file_name),
+        file_config.get("file_type", ""),
+        columnar_uri=(
+            os.path.join(artifact_version_uri, columnar_file_name)
+            if columnar_file_name
+            else None
+        ),
+        schema=file_config.get("file_schema"),
+        csv_options=file_config.get("csv_options"),
+    )
+
+    if len(dataset.index) == 0:
+        raise Exception(
+            f"Wrong '{os.path.join(artifact_version_uri, file_name)}' content"
+        )
+    dataset = compact_dataset(dataset)
+
+    entry = (file_config, dataset)
+    dataset_cache.set(key, entry)
+    logging.debug(f"Dataset cache statistics: {dataset_cache.stats.to_dict()}")
+    return entry
+
+
+def iter_dataset_chunks(
+    artifact_version_id: uuid.UUID | str,
+    artifact_version_uri: str,
+    chunk_size: int,
+) -> Iterator["pd.DataFrame"]:
+    """Iterate over the dataset of an artifact version in chunks of rows. The
+    Parquet and csv files are streamed, only excel files are loaded at once.
+
+    Args:
+        artifact_version_id (uuid.UUID | str): The id of the artifact version.
+        artifact_version_uri (str): The uri of the artifact version.
+        chunk_size (int): The number of rows per chunk.
+
+    Yields:
+        pd.DataFrame: The chunks.
+    """
+    import pandas as pd
+
+    entry = dataset_cache.get(str(artifact_version_id))
+    if entry is None:
+        file_config = get_file_config(artifact_version_id, artifact_version_uri)
+        columnar_file_name = file_config.get("columnar_file_name")
+
+        if columnar_file_name is not None:
+            import pyarrow.parquet as pq
+
+            parquet_file = pq.ParquetFile(
+                storage_handler.get_local_path(
+                    os.path.join(artifact_version_uri, columnar_file_name)
+                )
+            )
+            for batch in parquet_file.iter_batches(batch_size=chunk_size):
+                yield batch.to_pandas()
+            return
+
+        if file_config.get("file_type") == "csv":
+            path = storage_handler.get_local_path(
+                os.path.join(artifact_version_uri, file_config.get("file_name"))
+            )
+            yield from pd.read_csv(
+                path,
+                encoding="utf-8-sig",
+                dtype=file_config.get("file_schema"),
+                chunksize=chunk_size,
+                **(file_config.get("csv_options") or {"sep": None, "engine": "python"}),
+            )
+            return
+
+        entry = load_dataset(artifact_version_id, artifact_version_uri)
+
+    _, dataset = entry
+    for start in range(0, len(dataset.index), chunk_size):
+        yield dataset.iloc[start : start + chunk_size]
@@ -1,6 +1,11 @@
+import datetime
+import decimal
+import logging
 from enum import Enum
+from io import BytesIO
 from typing import Any, Dict
 
+import numpy as np
 import pandas as pd
 
 from data_copilot import storage_handler
@@ -47,6 +52,8 @@ class Component:
         self.data = {}
         self.description = ""
         self.config = {}
+        # reference to the persisted full result of a table previewed in data
+        self.result = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Return the json component as a dictionary.
@@ -54,13 +61,16 @@ class Component:
         Returns:
             Dict[str, Any]: The json component as a dictionary.
         """
-        return {
+        component = {
             "type": self.type.value,
             "name": self.name,
             "description": self.description,
-            "data": stringify_numbers_in_dict(self.data),
+            "data": format_data(self.data),
             "config": self.config,
         }
+        if self.result is not None:
+            component["result"] = self.result
+        return component
 
 
 def stringify_numbers_in_dict(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -118,6 +128,192 @@ def stringify_number(value: int | float) -> str:
         return f"{value:.3f}"
 
 
+def format_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Stringify the numbers in the data of a component, with the rules of
+    `stringify_number`. Columns given as pandas series, NumPy arrays or lists
+    are formatted at once by `format_column`. The data is not modified.
+
+    Args:
+        data (Dict[str, Any]): The data of the component.
+
+    Returns:
+        Dict[str, Any]: A copy of the data with stringified numbers.
+    """
+    return {key: _format_value(value) for key, value in data.items()}
+
+
+def _format_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return format_data(value)
+    if isinstance(value, (list, tuple, np.ndarray, pd.Series, pd.Index)):
+        return format_column(value)
+    if isinstance(value, (int, float)):
+        return stringify_number(value)
+    return value
+
+
+def format_column(values: Any) -> list:
+    """Stringify the numbers of a column, with the rules of `stringify_number`.
+    Numeric columns are formatted vectorized, other columns value by value.
+
+    Args:
+        values (Any): The column as pandas series, NumPy array or list. Nested
+            lists of equal length are formatted as matrix.
+
+    Returns:
+        list: The column with stringified numbers, as (nested) list. Timestamp
+            columns are returned as NumPy array.
+    """
+    if isinstance(values, (pd.Series, pd.Index)):
+        if pd.api.types.infer_dtype(values, skipna=False) == "string":
+            return values.tolist()
+        # timestamps are serialized natively by `to_json`, except for NaT
+        if values.dtype.kind == "M" and isinstance(values.dtype, np.dtype):
+            if not values.hasnans:
+                return values.to_numpy()
+            return values.astype(object).where(values.notna(), None).tolist()
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            return format_column(values.astype(object))
+        # nullable numbers are formatted like NumPy numbers, missing ones as NaN
+        if not isinstance(values.dtype, np.dtype) and values.dtype.kind in "biuf":
+            values = values.to_numpy(
+                dtype=np.float64 if values.hasnans else values.dtype.numpy_dtype,
+                na_value=np.nan,
+            )
+            return _format_array(values).tolist()
+        # other extension types are formatted value by value
+        if not isinstance(values.dtype, np.dtype) or values.dtype.kind not in "biuf":
+            return [_format_value(value) for value in values.tolist()]
+        array = values.to_numpy()
+    else:
+        try:
+            array = np.asarray(values)
+        except ValueError:
+            # nested lists of different lengths
+            array = None
+        if array is not None and array.dtype.kind == "U":
+            return array.tolist()
+        if array is None or array.dtype.kind not in "biuf":
+            return [_format_value(value) for value in values]
+    return _format_array(array).tolist()
+
+
+def _format_array(array: np.ndarray) -> np.ndarray:
+    if array.dtype.kind == "b":
+        return np.where(array, "1", "0")
+    if array.dtype.kind in "iu":
+        return array.astype(str)
+
+    array = array.astype(np.float64, copy=False)
+    finite = np.isfinite(array)
+    integral = finite & (np.floor(array) == array)
+    int64 = integral & (np.abs(array) < 2**63)
+    scientific = finite & ~integral & ((array > 1000000) | (array < 0.000001))
+    fixed = finite & ~integral & ~scientific
+    # nan, inf and integral values beyond the int64 range
+    remaining = ~(int64 | scientific | fixed)
+
+    result = np.empty(array.shape, dtype=object if remaining.any() else "<U20")
+    result[int64] = array[int64].astype(np.int64).astype(str)
+    result[scientific] = _format_scientific(array[scientific])
+    result[fixed] = _format_fixed(array[fixed])
+    if remaining.any():
+        result[remaining] = [stringify_number(v) for v in array[remaining].tolist()]
+    return result
+
+
+def _digits(values: np.ndarray, width: int) -> np.ndarray:
+    """Return the digits of non-negative integers below 2**31 as matrix of
+    character codes, right aligned."""
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int32)
+    return values.astype(np.int32)[:, None] // powers % 10 + np.int32(ord("0"))
+
+
+def _to_strings(chars: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """Return the strings made of the characters at the given columns of each
+    row of a matrix of character codes. Columns beyond the matrix end the
+    strings."""
+    width = chars.shape[1]
+    chars = np.take_along_axis(chars, np.minimum(index, width - 1), axis=1)
+    chars[index >= width] = 0
+    # the code points are the UCS4 representation of the strings
+    return chars.astype(np.uint32, copy=False).view(f"U{width}").ravel()
+
+
+def _is_ambiguous(scaled: np.ndarray) -> np.ndarray:
+    """Return where a scaled value is too close to a rounding tie to round it in
+    floating point arithmetic the way the string formatting does."""
+    return np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+
+
+def _format_fixed(values: np.ndarray) -> np.ndarray:
+    """Format positive values up to 1e6 like f"{value:.3f}"."""
+    if not values.size:
+        return np.empty(0, dtype="U11")
+
+    scaled = values * 1000
+    rounded = np.rint(scaled).astype(np.int32)
+    integer_width = 1 + (rounded[:, None] >= 10 ** np.arange(4, 10)).sum(axis=1)
+
+    # layout "ddddddd.ddd" with leading zeros, which are skipped
+    digits = _digits(rounded, 10)
+    chars = np.empty((values.size, 11), dtype=np.int32)
+    chars[:, :7] = digits[:, :7]
+    chars[:, 7] = ord(".")
+    chars[:, 8:] = digits[:, 7:]
+
+    index = np.arange(11) + (7 - integer_width)[:, None]
+    result = _to_strings(chars, index)
+    ambiguous = _is_ambiguous(scaled)
+    if ambiguous.any():
+        result[ambiguous] = [f"{value:.3f}" for value in values[ambiguous].tolist()]
+    return result
+
+
+def _format_scientific(values: np.ndarray) -> np.ndarray:
+    """Format finite non-zero values like f"{value:.3e}"."""
+    if not values.size:
+        return np.empty(0, dtype="U11")
+
+    magnitude = np.abs(values)
+    exponent = np.floor(np.log10(magnitude)).astype(np.int64)
+    # the powers of ten of subnormal numbers are not precise enough
+    subnormal = exponent < -300
+    exponent[subnormal] = 0
+    mantissa = magnitude / 10.0**exponent
+    # correct the rounding errors of the logarithm
+    exponent[mantissa < 1] -= 1
+    exponent[mantissa >= 10] += 1
+    mantissa = magnitude / 10.0**exponent
+    mantissa[subnormal] = 1.0
+
+    scaled = mantissa * 1000
+    significand = np.rint(scaled).astype(np.int64)
+    carry = significand >= 10000
+    significand[carry] //= 10
+    exponent[carry] += 1
+
+    # layout "-d.ddde+ddd", the sign of positive values and the leading zero of
+    # two digit exponents are skipped
+    chars = np.empty((values.size, 11), dtype=np.int32)
+    chars[:, 0] = ord("-")
+    significand_digits = _digits(significand, 4)
+    chars[:, 1] = significand_digits[:, 0]
+    chars[:, 2] = ord(".")
+    chars[:, 3:6] = significand_digits[:, 1:]
+    chars[:, 6] = ord("e")
+    chars[:, 7] = np.where(exponent < 0, ord("-"), ord("+"))
+    chars[:, 8:] = _digits(np.abs(exponent), 3)
+
+    index = np.arange(11) + (values >= 0)[:, None]
+    index += (index >= 8) & (np.abs(exponent) < 100)[:, None]
+    result = _to_strings(chars, index)
+    ambiguous = _is_ambiguous(scaled) | subnormal
+    if ambiguous.any():
+        result[ambiguous] = [f"{value:.3e}" for value in values[ambiguous].tolist()]
+    return result
+
+
 class Message:
     """Class to represent a json message."""
 
@@ -153,8 +349,6 @@ class Message:
         self.text_content += text
 
     def to_dict(self) -> Dict[str, str]:
-        import simplejson
-
         """Return the message as a dictionary with the message type and stringified
         message content.
 
@@ -169,29 +363,107 @@ class Message:
         else:
             return {
                 "message_type": self.message_type.value,
-                "text_content": simplejson.dumps(
+                "text_content": to_json(
                     {
                         "method_name": self.method_name,
                         "components": [
                             component.to_dict() for component in self.components
                         ],
-                    },
-                    ignore_nan=True,
+                    }
                 ),
             }
 
 
-def read_dataset_io(uri, file_type):
+def _json_default(value: Any) -> Any:
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return str(value)
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (np.ndarray, pd.Series, pd.Index)):
+        # arrays of types orjson does not serialize natively, e.g. objects
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def to_json(data: Any) -> str:
+    """Serialize data to JSON with orjson. NumPy scalars and arrays, timestamps
+    and decimals are serialized natively, NaN and infinite values as null.
+
+    Args:
+        data (Any): The data to serialize.
+
+    Returns:
+        str: The JSON document.
+    """
+    import orjson
+
+    return orjson.dumps(
+        data,
+        default=_json_default,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+    ).decode()
+
+
+def open_seekable(uri):
+    """Open a file of the storage as a seekable stream. Remote storages return
+    streams which can only be read once, those are buffered in memory.
+
+    Args:
+        uri (str): The uri of the file.
+
+    Returns:
+        The seekable stream.
+    """
+    file = storage_handler.read_file(uri)
+    if hasattr(file, "seekable") and file.seekable():
+        return file
+    return BytesIO(file.read())
+
+
+def read_dataset_io(uri, file_type, columnar_uri=None, schema=None, csv_options=None):
+    """Read a dataset from the storage. If the typed columnar copy written at
+    upload time exists, it is read instead of parsing the raw file. csv files
+    are parsed with the dtypes of the schema recorded at upload time.
+
+    Args:
+        uri (str): The uri of the raw uploaded file.
+        file_type (str): The type of the raw file, e.g. "csv" or "xlsx".
+        columnar_uri (str, optional): The uri of the columnar copy of the
+            dataset. Defaults to None.
+        schema (Dict[str, str], optional): The dtypes by column. Defaults to
+            None, which reads all columns as strings.
+        csv_options (Dict[str, str], optional): The delimiter and quote
+            character sniffed at upload time. Defaults to None, which sniffs
+            them again.
+
+    Returns:
+        pd.DataFrame: The dataset.
+    """
+    if columnar_uri is not None and storage_handler.exists(columnar_uri):
+        return pd.read_parquet(open_seekable(columnar_uri))
+
     file = storage_handler.read_file(uri)
     match file_type:
         case "csv":
-            dataset = pd.read_csv(
-                file,
-                sep=None,
-                encoding="utf-8-sig",
-                dtype=object,
-                engine="python",
-            )
+            options = csv_options or {"sep": None, "engine": "python"}
+            try:
+                dataset = pd.read_csv(
+                    file, encoding="utf-8-sig", dtype=schema or object, **options
+                )
+            except (ValueError, TypeError) as e:
+                if schema is None:
+                    raise
+                logging.warning(f"Could not apply the schema of {uri}: {e}")
+                dataset = pd.read_csv(
+                    storage_handler.read_file(uri),
+                    encoding="utf-8-sig",
+                    dtype=object,
+                    **options,
+                )
         case "xls" | "xlsx":
             dataset = pd.read_excel(file, dtype={"dteday": str})
         case _:
@@ -0,0 +1,338 @@
+import csv
+import json
+import logging
+import os
+import tempfile
+from io import BufferedRandom, BytesIO
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Tuple
+
+from data_copilot.execution_apps.sqlite_database import (
+    INGEST_CHUNK_SIZE,
+    SQLITE_FILE_NAME,
+    build_sqlite_database,
+)
+from data_copilot.execution_apps.statistics import (
+    StatisticsSketch,
+    compute_statistics,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from data_copilot.backend.artifacts.artifact import CreateArtifactVersionCM
+    from data_copilot.backend.schemas.artifacts import Artifact
+
+# Name of the typed columnar copy of the uploaded dataset, stored next to the
+# raw file and the config.json in the artifact version folder.
+COLUMNAR_FILE_NAME = "df.parquet"
+# Number of bytes at the start of a csv upload used to sniff its dialect.
+CSV_SNIFF_SAMPLE_SIZE = int(os.environ.get("CSV_SNIFF_SAMPLE_SIZE", 64 * 1024))
+
+NUMERIC_DTYPES = ("int64", "uint64", "float64")
+
+
+def to_columnar(data_frame: "pd.DataFrame") -> BytesIO | None:
+    """Serialize a data frame into the columnar (Parquet) sidecar format.
+
+    Args:
+        data_frame (pd.DataFrame): The parsed dataset.
+
+    Returns:
+        BytesIO | None: The Parquet file, or None if the data frame can not be
+            represented as Parquet (e.g. columns with mixed types).
+    """
+    buffer = BytesIO()
+    try:
+        data_frame.to_parquet(buffer, index=False)
+    except (ValueError, TypeError, NotImplementedError) as e:
+        logging.warning(f"Could not write the columnar copy of the dataset: {e}")
+        return None
+    buffer.seek(0)
+    return buffer
+
+
+class ColumnarWriter:
+    """Write a dataset chunk by chunk into the columnar (Parquet) sidecar format.
+    The file is written to a temporary file, so the dataset can be larger than
+    the available memory.
+    """
+
+    def __init__(self, schema: Dict[str, str]) -> None:
+        import pyarrow as pa
+
+        self.schema = pa.schema(
+            [
+                (
+                    str(column),
+                    pa.string() if dtype == "object" else pa.from_numpy_dtype(dtype),
+                )
+                for column, dtype in schema.items()
+            ]
+        )
+        self.file = tempfile.TemporaryFile()
+        self.failed = False
+        self._writer = None
+
+    def write(self, chunk: "pd.DataFrame") -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.failed:
+            return
+        try:
+            table = pa.Table.from_pandas(
+                chunk, schema=self.schema, preserve_index=False
+            )
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.file, table.schema)
+            self._writer.write_table(table)
+        except (pa.ArrowException, ValueError, TypeError) as e:
+            logging.warning(f"Could not write the columnar copy of the dataset: {e}")
+            self.failed = True
+
+    def close(self) -> BufferedRandom | None:
+        """Finish the file.
+
+        Returns:
+            BufferedRandom | None: The Parquet file, or None if the dataset can not
+                be represented as Parquet.
+        """
+        if self._writer is not None:
+            self._writer.close()
+        if self.failed or self._writer is None:
+            self.file.close()
+            return None
+        self.file.seek(0)
+        return self.file
+
+
+def sniff_csv_options(file: IO[bytes]) -> Dict[str, str]:
+    """Sniff the delimiter and the quote character of a csv file on a sample of
+    its first CSV_SNIFF_SAMPLE_SIZE bytes.
+
+    Args:
+        file (IO[bytes]): The csv file.
+
+    Returns:
+        Dict[str, str]: The "sep" and "quotechar" options of `pd.read_csv`.
+    """
+    file.seek(0)
+    sample = file.read(CSV_SNIFF_SAMPLE_SIZE)
+    file.seek(0)
+
+    text = sample.decode("utf-8-sig", errors="ignore")
+    if len(sample) == CSV_SNIFF_SAMPLE_SIZE:
+        # drop the last line, which was cut
+        text = text[: text.rfind("\n") + 1] or text
+
+    sniffer = csv.Sniffer()
+    for candidate in (text, text.split("\n", 1)[0]):
+        try:
+            dialect = sniffer.sniff(candidate)
+        except csv.Error:
+            continue
+        return {"sep": dialect.delimiter, "quotechar": dialect.quotechar}
+    return {"sep": ",", "quotechar": '"'}
+
+
+def _promote_dtype(left: str, right: str) -> str:
+    if left == right:
+        return left
+    if left in NUMERIC_DTYPES and right in NUMERIC_DTYPES:
+        return "float64"
+    return "object"
+
+
+def infer_csv_schema(
+    file: IO[bytes], csv_options: Dict[str, str]
+) -> Tuple[Dict[str, str], int]:
+    """Infer the column types of a csv file and count its rows, reading it in
+    chunks. The types inferred on the first chunk are widened when a later chunk
+    does not fit them: integers to floats, anything else to strings.
+
+    Args:
+        file (IO[bytes]): The csv file.
+        csv_options (Dict[str, str]): The options of `pd.read_csv`, see
+            `sniff_csv_options`.
+
+    Returns:
+        Tuple[Dict[str, str], int]: The dtypes by column and the number of rows.
+    """
+    import pandas as pd
+
+    file.seek(0)
+    schema, rows = {}, 0
+    for chunk in pd.read_csv(
+        file, encoding="utf-8-sig", chunksize=INGEST_CHUNK_SIZE, **csv_options
+    ):
+        rows += chunk.shape[0]
+        for column in chunk.columns:
+            dtype = str(chunk[column].dtype)
+            schema[column] = _promote_dtype(schema.get(column, dtype), dtype)
+    file.seek(0)
+    return schema, rows
+
+
+def _read_typed_csv_chunks(
+    file: IO[bytes], csv_options: Dict[str, str], schema: Dict[str, str]
+) -> Iterator["pd.DataFrame"]:
+    import pandas as pd
+
+    file.seek(0)
+    yield from pd.read_csv(
+        file,
+        encoding="utf-8-sig",
+        chunksize=INGEST_CHUNK_SIZE,
+        dtype=schema,
+        **csv_options,
+    )
+
+
+def process_tabular_upload(
+    uploaded_files: List,
+    artifact: "Artifact",
+    cm: "CreateArtifactVersionCM",
+    supported_file_types: Dict[str, str],
+    sqlite_database: bool = True,
+) -> List[Tuple[str, BytesIO]]:
+    """Parse an uploaded csv/excel file and return the files of the artifact
+    version: the config.json with the schema and the column statistics of the
+    dataset, the raw upload and, if possible, a typed columnar copy of the
+    dataset which is preferred over the raw file when reading it and a SQLite
+    database of the dataset to run queries on.
+
+    csv files are streamed: the dialect is sniffed on a sample, the types are
+    inferred and the rows counted in a first pass over chunks, the columnar
+    copy, the database and the statistics are built in a second pass. Only one
+    chunk is held in memory at a time and the raw upload is passed on as a
+    stream. Excel files are parsed at once. The progress is reported to the
+    context manager creating the version.
+
+    Args:
+        uploaded_files (List): The uploaded files. Only the first one is used.
+        artifact (Artifact): The artifact the version belongs to.
+        cm (CreateArtifactVersionCM): The context manager creating the version.
+        supported_file_types (Dict[str, str]): Mapping of content types to file
+            types of the compute backend.
+        sqlite_database (bool, optional): Whether to build the SQLite database.
+            Defaults to True.
+
+    Raises:
+        ValueError: If the uploaded file is empty.
+
+    Returns:
+        List[Tuple[str, BytesIO]]: The file names and contents to write.
+    """
+    file = uploaded_files[0]
+    file_type = supported_file_types.get(file.content_type, None)
+
+    match file_type:
+        case "csv":
+            file_config, files = _process_csv(
+                file.file, sqlite_database, cm.set_progress
+            )
+        case "xls" | "xlsx":
+            file_config, files = _process_excel(
+                file.file, sqlite_database, cm.set_progress
+            )
+
+    file_config = {"file_name": file.filename, "file_type": file_type, **file_config}
+
+    artifact_version_config = {
+        "artifact_id": str(artifact.id),
+        "artifact_version_id": str(cm.uuid),
+        "files": [file_config],
+    }
+    file.file.seek(0)
+    return [
+        (
+            "config.json",
+            json.dumps(artifact_version_config, indent=4),
+        ),
+        (file.filename, file.file),
+        *files,
+    ]
+
+
+def _process_csv(
+    file: IO[bytes], sqlite_database: bool, set_progress: Callable[[float], None]
+) -> Tuple[Dict[str, Any], List[Tuple[str, IO[bytes]]]]:
+    csv_options = sniff_csv_options(file)
+    schema, rows = infer_csv_schema(file, csv_options)
+    if rows == 0:
+        raise ValueError("Empty file")
+    set_progress(0.1)
+
+    # A dataset which fits into one chunk gets exact statistics.
+    statistics = None
+    statistics_sketch = StatisticsSketch()
+    columnar_writer = ColumnarWriter(schema)
+
+    def chunks() -> Iterator["pd.DataFrame"]:
+        nonlocal statistics
+        processed_rows = 0
+        for chunk in _read_typed_csv_chunks(file, csv_options, schema):
+            if rows <= INGEST_CHUNK_SIZE:
+                statistics = compute_statistics(chunk)
+            else:
+                statistics_sketch.update(chunk)
+            columnar_writer.write(chunk)
+            yield chunk
+            processed_rows += chunk.shape[0]
+            set_progress(0.1 + 0.8 * processed_rows / rows)
+
+    stream = chunks()
+    sqlite_file = None
+    if sqlite_database:
+        sqlite_file = build_sqlite_database(stream, schema)
+    # drain the chunks left by a failed SQLite build, so the columnar copy and
+    # the statistics cover the whole dataset
+    for _ in stream:
+        pass
+    columnar_file = columnar_writer.close()
+
+    file_config = {
+        "file_schema": schema,
+        "csv_options": csv_options,
+        "rows": rows,
+        "statistics": statistics or statistics_sketch.to_statistics(),
+    }
+    return file_config, _sidecar_files(file_config, columnar_file, sqlite_file)
+
+
+def _process_excel(
+    file: IO[bytes], sqlite_database: bool, set_progress: Callable[[float], None]
+) -> Tuple[Dict[str, Any], List[Tuple[str, IO[bytes]]]]:
+    import pandas as pd
+
+    data_frame = pd.read_excel(file, dtype={"dteday": str})
+    if data_frame.empty:
+        raise ValueError("Empty file")
+    set_progress(0.5)
+
+    schema = {col: str(data_frame[col].dtype) for col in data_frame.columns}
+    file_config = {
+        "file_schema": schema,
+        "rows": data_frame.shape[0],
+        "statistics": compute_statistics(data_frame),
+    }
+    columnar_file = to_columnar(data_frame)
+    sqlite_file = (
+        build_sqlite_database([data_frame], schema) if sqlite_database else None
+    )
+    return file_config, _sidecar_files(file_config, columnar_file, sqlite_file)
+
+
+def _sidecar_files(
+    file_config: Dict[str, Any],
+    columnar_file: IO[bytes] | None,
+    sqlite_file: IO[bytes] | None,
+) -> List[Tuple[str, IO[bytes]]]:
+    files = []
+    if columnar_file is not None:
+        file_config["columnar_file_name"] = COLUMNAR_FILE_NAME
+        files.append((COLUMNAR_FILE_NAME, columnar_file))
+    if sqlite_file is not None:
+        file_config["sqlite_file_name"] = SQLITE_FILE_NAME
+        files.append((SQLITE_FILE_NAME, sqlite_file))
+    return files
@@ -0,0 +1,115 @@
+import abc
+import hashlib
+import json
+import os
+from typing import Iterable, Tuple
+
+from data_copilot.execution_apps.cache import CacheABC, LRUCache, RedisLRUCache
+
+# Store of the LLM response cache: "memory" (per worker process), "redis"
+# (shared by all workers) or "none".
+LLM_CACHE_BACKEND = os.environ.get("LLM_CACHE_BACKEND", "memory")
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", 10_000))
+LLM_CACHE_TTL_SECONDS = float(os.environ.get("LLM_CACHE_TTL_SECONDS", 24 * 3600))
+LLM_CACHE_REDIS_URL = os.environ.get(
+    "LLM_CACHE_REDIS_URL", os.environ.get("CELERY_BROKER_URL", "")
+)
+
+
+def llm_cache_key(
+    prompt: str, columns: Iterable[str], model: str, dialect: str = "SQLite"
+) -> str:
+    """Return the cache key of a SQL generation request. Whitespace in the prompt
+    is collapsed, so questions differing only in whitespace share an entry. The
+    case is kept, as literals in the question end up in case sensitive
+    comparisons of the SQL.
+
+    Args:
+        prompt (str): The user prompt.
+        columns (Iterable[str]): The harmonized column names of the dataset.
+        model (str): The name of the LLM.
+        dialect (str, optional): The SQL dialect. Defaults to "SQLite".
+
+    Returns:
+        str: The cache key.
+    """
+    normalized_prompt = " ".join(prompt.split())
+    payload = json.dumps([normalized_prompt, list(columns), model, dialect])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCacheABC(CacheABC):
+    @abc.abstractmethod
+    def get(self, key: str) -> Tuple[str, str] | None:
+        """Return the cached response type and response, or None."""
+        pass
+
+    @abc.abstractmethod
+    def set(self, key: str, value: Tuple[str, str]) -> None:
+        pass
+
+
+class InMemoryLLMCache(LLMCacheABC):
+    """LLM response cache local to the worker process."""
+
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        ttl: float = LLM_CACHE_TTL_SECONDS,
+    ) -> None:
+        super().__init__()
+        self.cache = LRUCache(max_size=max_entries, ttl=ttl)
+        # share the counters with the underlying cache
+        self.stats = self.cache.stats
+
+    def get(self, key: str) -> Tuple[str, str] | None:
+        return self.cache.get(key)
+
+    def set(self, key: str, value: Tuple[str, str]) -> None:
+        self.cache.set(key, tuple(value))
+
+
+class RedisLLMCache(LLMCacheABC):
+    """LLM response cache shared by all workers, entries expire after the TTL."""
+
+    def __init__(
+        self,
+        url: str = LLM_CACHE_REDIS_URL,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        ttl: float = LLM_CACHE_TTL_SECONDS,
+        prefix: str = "data_copilot:llm_cache",
+    ) -> None:
+        super().__init__()
+        self.cache = RedisLRUCache(url, prefix, max_entries, ttl=ttl)
+        # share the counters with the underlying cache
+        self.stats = self.cache.stats
+
+    def get(self, key: str) -> Tuple[str, str] | None:
+        value = self.cache.get(key)
+        return tuple(value) if value is not None else None
+
+    def set(self, key: str, value: Tuple[str, str]) -> None:
+        self.cache.set(key, list(value))
+
+
+_llm_cache: LLMCacheABC | None = None
+
+
+def get_llm_cache() -> LLMCacheABC | None:
+    """Return the LLM response cache of the process, as configured by
+    LLM_CACHE_BACKEND, or None if caching is disabled.
+
+    Returns:
+        LLMCacheABC | None: The cache.
+    """
+    global _llm_cache
+
+    if _llm_cache is None:
+        match LLM_CACHE_BACKEND:
+            case "memory":
+                _llm_cache = InMemoryLLMCache()
+            case "redis":
+                _llm_cache = RedisLLMCache()
+            case _:
+                return None
+    return _llm_cache
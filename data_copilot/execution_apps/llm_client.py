@@ -0,0 +1,78 @@
+import os
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+# Connection pool of the LLM client shared by all tasks of a worker process.
+LLM_POOL_MAX_CONNECTIONS = int(os.environ.get("LLM_POOL_MAX_CONNECTIONS", 20))
+LLM_POOL_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.environ.get("LLM_POOL_MAX_KEEPALIVE_CONNECTIONS", 10)
+)
+LLM_POOL_KEEPALIVE_EXPIRY = float(os.environ.get("LLM_POOL_KEEPALIVE_EXPIRY", 60))
+# Timeouts in seconds of a single LLM request. The request timeout has to stay
+# below the soft time limit of the celery task executing the prompt.
+LLM_CONNECT_TIMEOUT = float(os.environ.get("LLM_CONNECT_TIMEOUT", 5))
+LLM_REQUEST_TIMEOUT = float(os.environ.get("LLM_REQUEST_TIMEOUT", 30))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", 2))
+
+_lock = threading.Lock()
+_openai_client: "OpenAI | None" = None
+
+
+def create_openai_client() -> "OpenAI":
+    """Create an OpenAI client with a keep-alive connection pool and the
+    configured timeouts.
+
+    Returns:
+        OpenAI: The client.
+    """
+    import httpx
+    from openai import OpenAI
+
+    timeout = httpx.Timeout(LLM_REQUEST_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=LLM_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=LLM_POOL_KEEPALIVE_EXPIRY,
+        ),
+        timeout=timeout,
+        follow_redirects=True,
+    )
+    return OpenAI(http_client=http_client, timeout=timeout, max_retries=LLM_MAX_RETRIES)
+
+
+def get_openai_client() -> "OpenAI":
+    """Return the OpenAI client of the process, which is created on first use.
+
+    Returns:
+        OpenAI: The client.
+    """
+    global _openai_client
+
+    if _openai_client is None:
+        with _lock:
+            if _openai_client is None:
+                _openai_client = create_openai_client()
+    return _openai_client
+
+
+def init_openai_client() -> None:
+    """(Re)create the OpenAI client of the process. Called in every forked
+    worker process, so no connections are shared with the parent process."""
+    global _openai_client
+
+    with _lock:
+        _openai_client = create_openai_client()
+
+
+def close_openai_client() -> None:
+    """Close the connections of the OpenAI client of the process."""
+    global _openai_client
+
+    with _lock:
+        if _openai_client is not None:
+            _openai_client.close()
+            _openai_client = None
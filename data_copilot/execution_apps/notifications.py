@@ -0,0 +1,157 @@
+"""
+Notifications of new chat messages over Redis pub/sub, so the clients waiting
+for the answer to a message are pushed a notification instead of polling the
+messages table.
+
+The worker saving a message publishes its id to the channel of the chat. Every
+backend process holds one pattern subscription to the channels of all chats
+and wakes up the streams of the chat, which then load the new messages from
+the DB. Notifications only wake the streams up, so notifications which are
+missed or arrive in bursts cost at most one query per stream.
+"""
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import uuid
+from typing import Dict, Iterator, Set
+
+NOTIFICATIONS_REDIS_URL = os.environ.get(
+    "NOTIFICATIONS_REDIS_URL", os.environ.get("CELERY_BROKER_URL", "")
+)
+# Seconds to wait before resubscribing after the connection to Redis was lost.
+NOTIFICATIONS_RECONNECT_DELAY = float(
+    os.environ.get("NOTIFICATIONS_RECONNECT_DELAY", 1)
+)
+
+CHANNEL_PREFIX = "data_copilot:chats"
+
+
+def chat_channel(chat_id: uuid.UUID | str) -> str:
+    """Return the pub/sub channel of the new messages of a chat."""
+    return f"{CHANNEL_PREFIX}:{chat_id}"
+
+
+def notifications_enabled() -> bool:
+    """Whether notifications are available, which requires Redis."""
+    return NOTIFICATIONS_REDIS_URL.startswith(("redis://", "rediss://"))
+
+
+_client = None
+
+
+def publish_message(chat_id: uuid.UUID | str, message_id: uuid.UUID | str) -> None:
+    """Notify the streams of a chat about a new message. Failing to publish is
+    not an error, the clients polling the messages still get the message.
+
+    Args:
+        chat_id (uuid.UUID | str): The id of the chat.
+        message_id (uuid.UUID | str): The id of the new message.
+    """
+    global _client
+
+    if not notifications_enabled():
+        return
+
+    import redis
+
+    try:
+        if _client is None:
+            _client = redis.Redis.from_url(NOTIFICATIONS_REDIS_URL)
+        _client.publish(
+            chat_channel(chat_id),
+            json.dumps({"chat_id": str(chat_id), "message_id": str(message_id)}),
+        )
+    except redis.RedisError as e:
+        logging.warning(f"Could not publish the message {message_id}: {e}")
+
+
+class ChatListener:
+    """
+    Listens to the channels of all chats with a single connection and wakes up
+    the subscribers of the chat of every notification.
+    """
+
+    def __init__(self, url: str = NOTIFICATIONS_REDIS_URL) -> None:
+        self.url = url
+        self._subscribers: Dict[str, Set[asyncio.Event]] = {}
+        self._task: asyncio.Task | None = None
+
+    def _wake_up(self, chat_id: str | None = None) -> None:
+        if chat_id is None:
+            subscribers = [s for events in self._subscribers.values() for s in events]
+        else:
+            subscribers = self._subscribers.get(chat_id, ())
+        for event in subscribers:
+            event.set()
+
+    async def _listen(self) -> None:
+        import redis
+        import redis.asyncio
+
+        while True:
+            client = None
+            try:
+                client = redis.asyncio.Redis.from_url(self.url)
+                async with client.pubsub() as pubsub:
+                    await pubsub.psubscribe(f"{CHANNEL_PREFIX}:*")
+                    # notifications published while disconnected were missed
+                    self._wake_up()
+                    async for message in pubsub.listen():
+                        if message["type"] == "pmessage":
+                            channel = message["channel"].decode()
+                            self._wake_up(channel[len(CHANNEL_PREFIX) + 1 :])
+            except redis.RedisError as e:
+                logging.warning(f"Lost the subscription to the chat messages: {e}")
+            except Exception:
+                # any other error would end the listener, and the streams of the
+                # process would never be woken up again
+                logging.exception("Unexpected error in the chat messages listener")
+            finally:
+                if client is not None:
+                    await client.aclose()
+            await asyncio.sleep(NOTIFICATIONS_RECONNECT_DELAY)
+
+    @contextlib.contextmanager
+    def subscribe(self, chat_id: uuid.UUID | str) -> Iterator[asyncio.Event]:
+        """Subscribe to the new messages of a chat, starting the listener in the
+        running event loop if needed.
+
+        Args:
+            chat_id (uuid.UUID | str): The id of the chat.
+
+        Yields:
+            asyncio.Event: The event set whenever the chat may have new messages.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._listen())
+
+        event = asyncio.Event()
+        subscribers = self._subscribers.setdefault(str(chat_id), set())
+        subscribers.add(event)
+        try:
+            yield event
+        finally:
+            subscribers.discard(event)
+            if not subscribers:
+                self._subscribers.pop(str(chat_id), None)
+
+
+_listener: ChatListener | None = None
+
+
+def get_chat_listener() -> ChatListener | None:
+    """Return the chat listener of the process, or None if notifications are not
+    available.
+
+    Returns:
+        ChatListener | None: The listener.
+    """
+    global _listener
+
+    if not notifications_enabled():
+        return None
+    if _listener is None:
+        _listener = ChatListener()
+    return _listener
@@ -0,0 +1,408 @@
+import json
+import logging
+import os
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, List
+
+from data_copilot import storage_handler
+from data_copilot.execution_apps.cache import LRUCache
+from data_copilot.execution_apps.sketches import (
+    HyperLogLog,
+    KLLSketch,
+    ReservoirSample,
+    SpaceSaving,
+)
+from data_copilot.execution_apps.statistics import QUANTILES, TOP_K, to_json_value
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# Name of the profile of the dataset, stored next to the config.json in the
+# artifact version folder once it was computed.
+PROFILE_FILE_NAME = "profile.json"
+# Number of rows of the dataset included in the profile.
+HEAD_ROWS = 3
+HISTOGRAM_BINS = 10
+
+# "exact" profiles the dataset in memory, "approximate" streams it in chunks
+# through mergeable sketches in bounded memory, "auto" profiles datasets with
+# more than PROFILING_EXACT_MAX_ROWS rows approximately.
+PROFILING_MODE = os.environ.get("PROFILING_MODE", "auto")
+PROFILING_EXACT_MAX_ROWS = int(os.environ.get("PROFILING_EXACT_MAX_ROWS", 1_000_000))
+PROFILING_CHUNK_SIZE = int(os.environ.get("PROFILING_CHUNK_SIZE", 100_000))
+# Number of rows sampled to estimate the correlation in the approximate mode.
+CORRELATION_SAMPLE_SIZE = 10_000
+
+# Artifact versions are immutable, so are their profiles.
+profile_cache = LRUCache(max_size=128)
+
+
+def _is_numeric(column: "pd.Series") -> bool:
+    import pandas as pd
+
+    return pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(
+        column
+    )
+
+
+def correlation_matrix(values: "np.ndarray") -> "np.ndarray":
+    """Compute the Pearson correlation of all pairs of columns of a matrix, using
+    the rows where both columns are not NaN, like `pd.DataFrame.corr`. All sums
+    are computed at once as matrix products.
+
+    Args:
+        values (np.ndarray): The values, one column per variable.
+
+    Returns:
+        np.ndarray: The correlation matrix, NaN where it is not defined.
+    """
+    import numpy as np
+
+    valid = ~np.isnan(values)
+    # The covariance does not depend on the location, centering the columns
+    # avoids the cancellation of large sums.
+    with np.errstate(invalid="ignore", divide="ignore"):
+        centered = np.where(valid, values - np.nanmean(values, axis=0), 0.0)
+    mask = valid.astype(np.float64)
+
+    # [i, j] = sums over the rows where column i and column j are valid
+    count = mask.T @ mask
+    sum_x = centered.T @ mask
+    sum_xx = (centered * centered).T @ mask
+    sum_xy = centered.T @ centered
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        covariance = sum_xy - sum_x * sum_x.T / count
+        variance = sum_xx - sum_x * sum_x / count
+        correlation = covariance / np.sqrt(variance * variance.T)
+    correlation[(count < 2) | (variance <= 0) | (variance.T <= 0)] = np.nan
+    return np.clip(correlation, -1.0, 1.0)
+
+
+def _to_float(column: "pd.Series") -> "np.ndarray":
+    import numpy as np
+    import pandas as pd
+
+    return pd.to_numeric(column, errors="coerce").to_numpy(
+        dtype=np.float64, na_value=np.nan
+    )
+
+
+def _histogram(values: "np.ndarray", bins: int) -> Dict[str, List[float]]:
+    import numpy as np
+
+    values = values[np.isfinite(values)]
+    if not values.size:
+        return {"values": [], "bins": []}
+    densities, edges = np.histogram(values, bins=bins, density=True)
+    return {"values": densities.tolist(), "bins": edges[:-1].tolist()}
+
+
+def profile_dataset(
+    data_frame: "pd.DataFrame",
+    top_k: int = TOP_K,
+    bins: int = HISTOGRAM_BINS,
+    approximate: bool = False,
+) -> Dict[str, Any]:
+    """Profile a dataset in one columnar pass: the first rows, the frequent
+    values of every column, a histogram of every numeric column and the
+    correlation of the numeric columns. Every column is read once, the numeric
+    columns are extracted into one matrix which all numeric summaries are
+    computed from.
+
+    Args:
+        data_frame (pd.DataFrame): The dataset.
+        top_k (int, optional): Number of most frequent values. Defaults to TOP_K.
+        bins (int, optional): Number of histogram bins. Defaults to
+            HISTOGRAM_BINS.
+        approximate (bool, optional): Whether to summarize the dataset in chunks
+            with sketches, see `DatasetSketch`. Defaults to False.
+
+    Returns:
+        Dict[str, Any]: The JSON serializable profile.
+    """
+    import numpy as np
+
+    if approximate:
+        sketch = DatasetSketch(top_k)
+        for start in range(0, len(data_frame.index), PROFILING_CHUNK_SIZE):
+            sketch.update(data_frame.iloc[start : start + PROFILING_CHUNK_SIZE])
+        return sketch.to_profile(bins)
+
+    numeric_columns = [c for c in data_frame.columns if _is_numeric(data_frame[c])]
+    numeric_values = np.empty((len(data_frame.index), len(numeric_columns)))
+    for i, column in enumerate(numeric_columns):
+        numeric_values[:, i] = data_frame[column].to_numpy(
+            dtype=np.float64, na_value=np.nan
+        )
+
+    columns = {}
+    for column in data_frame.columns:
+        values = data_frame[column]
+        counts = values.value_counts(sort=True)
+        top_values = counts.head(top_k)
+        summary = {
+            "dtype": str(values.dtype),
+            "null_count": int(values.isna().sum()),
+            "distinct_count": len(counts),
+            "top_values": [
+                {"value": to_json_value(value), "count": int(count)}
+                for value, count in top_values.items()
+            ],
+        }
+        if column in numeric_columns:
+            summary["histogram"] = _histogram(
+                numeric_values[:, numeric_columns.index(column)], bins
+            )
+        columns[str(column)] = summary
+
+    correlation = correlation_matrix(numeric_values)
+    head = data_frame.head(HEAD_ROWS)
+    return {
+        "approximate": False,
+        "rows": len(data_frame.index),
+        "head": {
+            str(column): [to_json_value(value) for value in head[column].tolist()]
+            for column in head.columns
+        },
+        "columns": columns,
+        "correlation": {
+            "columns": [str(column) for column in numeric_columns],
+            "values": [
+                [to_json_value(value) for value in row] for row in correlation.tolist()
+            ],
+        },
+    }
+
+
+class DatasetSketch:
+    """
+    Mergeable summary of a dataset, updated chunk by chunk in bounded memory:
+    HyperLogLog sketches of the distinct counts, Space-Saving summaries of the
+    most frequent values, KLL sketches of the quantiles and histograms of the
+    numeric columns and a reservoir sample of the rows to estimate their
+    correlation. Sketches of chunks profiled in parallel can be merged.
+    """
+
+    def __init__(self, top_k: int = TOP_K, seed: int | None = None) -> None:
+        self.top_k = top_k
+        self.rows = 0
+        self.head: "pd.DataFrame | None" = None
+        self.dtypes: Dict[str, str] = {}
+        self.numeric_columns: List[str] = []
+        self.null_counts: Dict[str, int] = {}
+        self.distinct: Dict[str, HyperLogLog] = {}
+        self.frequent: Dict[str, SpaceSaving] = {}
+        self.quantiles: Dict[str, KLLSketch] = {}
+        self.correlation_sample = ReservoirSample(CORRELATION_SAMPLE_SIZE, seed)
+        self._seed = seed
+
+    def _add_columns(self, chunk: "pd.DataFrame") -> None:
+        for column in chunk.columns:
+            self.dtypes[column] = str(chunk[column].dtype)
+            self.null_counts[column] = 0
+            self.distinct[column] = HyperLogLog()
+            self.frequent[column] = SpaceSaving()
+            if _is_numeric(chunk[column]):
+                self.numeric_columns.append(column)
+                self.quantiles[column] = KLLSketch(seed=self._seed)
+
+    def update(self, chunk: "pd.DataFrame") -> None:
+        """Add a chunk of the dataset. All chunks must have the same columns.
+
+        Args:
+            chunk (pd.DataFrame): The chunk.
+        """
+        import numpy as np
+        import pandas as pd
+
+        if self.head is None:
+            self._add_columns(chunk)
+            self.head = chunk.head(HEAD_ROWS)
+        elif len(self.head.index) < HEAD_ROWS:
+            missing_rows = HEAD_ROWS - len(self.head.index)
+            self.head = pd.concat([self.head, chunk.head(missing_rows)])
+        self.rows += len(chunk.index)
+
+        for column in self.dtypes:
+            values = chunk[column]
+            self.null_counts[column] += int(values.isna().sum())
+            self.distinct[column].update(values)
+            self.frequent[column].update(values)
+
+        numeric_values = np.empty((len(chunk.index), len(self.numeric_columns)))
+        for i, column in enumerate(self.numeric_columns):
+            numeric_values[:, i] = _to_float(chunk[column])
+            self.quantiles[column].update(numeric_values[:, i])
+        self.correlation_sample.update(numeric_values)
+
+    def merge(self, other: "DatasetSketch") -> None:
+        """Add the summary of other chunks of the same dataset.
+
+        Args:
+            other (DatasetSketch): The summary of the other chunks.
+        """
+        if other.head is None:
+            return
+        if self.head is None:
+            self.__dict__.update(other.__dict__)
+            return
+
+        self.rows += other.rows
+        for column in self.dtypes:
+            self.null_counts[column] += other.null_counts[column]
+            self.distinct[column].merge(other.distinct[column])
+            self.frequent[column].merge(other.frequent[column])
+        for column in self.numeric_columns:
+            self.quantiles[column].merge(other.quantiles[column])
+        self.correlation_sample.merge(other.correlation_sample)
+
+    def to_profile(self, bins: int = HISTOGRAM_BINS) -> Dict[str, Any]:
+        """Return the approximate profile of the dataset, in the format of
+        `profile_dataset` plus the error bounds of the estimates:
+
+        - distinct_count_error: the relative standard error of distinct_count.
+        - the error of every top value: the maximum overestimation of its count.
+        - quantile_rank_error: the maximum normalized rank error of the
+          quantiles and histogram bin edges, with 99% confidence.
+        - correlation error: the half width of the 95% confidence interval of
+          the correlations estimated on sample_size rows.
+
+        Args:
+            bins (int, optional): Number of histogram bins. Defaults to
+                HISTOGRAM_BINS.
+
+        Returns:
+            Dict[str, Any]: The JSON serializable profile.
+        """
+        import math
+
+        import numpy as np
+
+        columns = {}
+        for column, dtype in self.dtypes.items():
+            distinct = self.distinct[column]
+            summary = {
+                "dtype": dtype,
+                "null_count": self.null_counts[column],
+                "distinct_count": distinct.count(),
+                "distinct_count_error": distinct.relative_error,
+                "top_values": [
+                    {**top_value, "value": to_json_value(top_value["value"])}
+                    for top_value in self.frequent[column].top(self.top_k)
+                ],
+            }
+            if column in self.quantiles:
+                quantiles = self.quantiles[column]
+                summary["histogram"] = quantiles.histogram(bins)
+                summary["quantiles"] = {
+                    str(q): to_json_value(value)
+                    for q, value in zip(QUANTILES, quantiles.quantiles(QUANTILES))
+                }
+                summary["quantile_rank_error"] = quantiles.rank_error
+            columns[str(column)] = summary
+
+        sample = self.correlation_sample.sample
+        if sample is None:
+            sample = np.empty((0, len(self.numeric_columns)))
+        sample_size = sample.shape[0]
+        correlation = correlation_matrix(sample)
+        head = self.head if self.head is not None else {}
+        return {
+            "approximate": True,
+            "rows": self.rows,
+            "head": {
+                str(column): [to_json_value(value) for value in head[column].tolist()]
+                for column in head
+            },
+            "columns": columns,
+            "correlation": {
+                "columns": [str(column) for column in self.numeric_columns],
+                "values": [
+                    [to_json_value(value) for value in row]
+                    for row in correlation.tolist()
+                ],
+                "sample_size": sample_size,
+                "error": (
+                    1.96 / math.sqrt(sample_size)
+                    if 0 < sample_size < self.rows
+                    else 0.0
+                ),
+            },
+        }
+
+
+def get_stored_profile(
+    artifact_version_id: uuid.UUID | str, artifact_version_uri: str
+) -> Dict[str, Any] | None:
+    """Return the profile of the dataset of an artifact version if it was
+    computed before, without profiling the dataset otherwise.
+
+    Args:
+        artifact_version_id (uuid.UUID | str): The id of the artifact version.
+        artifact_version_uri (str): The uri of the artifact version.
+
+    Returns:
+        Dict[str, Any] | None: The profile, or None if it was not computed yet.
+    """
+    key = str(artifact_version_id)
+    profile = profile_cache.get(key)
+    if profile is not None:
+        return profile
+
+    profile_uri = os.path.join(artifact_version_uri, PROFILE_FILE_NAME)
+    if not storage_handler.exists(profile_uri):
+        return None
+    profile = json.load(storage_handler.read_file(profile_uri))
+    profile_cache.set(key, profile)
+    return profile
+
+
+def get_profile(
+    artifact_version_id: uuid.UUID | str, artifact_version_uri: str
+) -> Dict[str, Any]:
+    """Return the profile of the dataset of an artifact version. The profile is
+    computed once and stored as profile.json in the artifact version folder.
+    Depending on PROFILING_MODE and the size of the dataset, the dataset is
+    profiled exactly in memory or approximately in chunks.
+
+    Args:
+        artifact_version_id (uuid.UUID | str): The id of the artifact version.
+        artifact_version_uri (str): The uri of the artifact version.
+
+    Returns:
+        Dict[str, Any]: The profile.
+    """
+    from data_copilot.execution_apps.datasets import (
+        get_file_config,
+        iter_dataset_chunks,
+        load_dataset,
+    )
+
+    profile = get_stored_profile(artifact_version_id, artifact_version_uri)
+    if profile is not None:
+        return profile
+
+    key = str(artifact_version_id)
+    profile_uri = os.path.join(artifact_version_uri, PROFILE_FILE_NAME)
+    rows = get_file_config(artifact_version_id, artifact_version_uri).get("rows")
+    if PROFILING_MODE == "approximate" or (
+        PROFILING_MODE == "auto" and (rows or 0) > PROFILING_EXACT_MAX_ROWS
+    ):
+        sketch = DatasetSketch()
+        for chunk in iter_dataset_chunks(
+            artifact_version_id, artifact_version_uri, PROFILING_CHUNK_SIZE
+        ):
+            sketch.update(chunk)
+        profile = sketch.to_profile()
+    else:
+        _, dataset = load_dataset(artifact_version_id, artifact_version_uri)
+        profile = profile_dataset(dataset)
+    try:
+        storage_handler.write_file(profile_uri, json.dumps(profile))
+    except Exception as e:
+        logging.warning(f"Could not store the profile of {key}: {e}")
+
+    profile_cache.set(key, profile)
+    return profile
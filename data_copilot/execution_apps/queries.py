@@ -0,0 +1,245 @@
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import IO, TYPE_CHECKING, Callable, Iterator, List, NamedTuple, Sequence
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Maximum number of rows of a query result which are returned to the user in the
+# message, as preview of the persisted result.
+RESULT_PREVIEW_ROWS = 100
+# Maximum number of rows of a query result which are persisted to be paged
+# through, 0 for no limit.
+RESULT_MAX_ROWS = int(os.environ.get("RESULT_MAX_ROWS", 1_000_000))
+# Number of rows fetched from the database cursor at once.
+FETCH_BATCH_SIZE = 1000
+
+# Execution budget of a generated query. The timeout has to stay below the soft
+# time limit of the celery task executing the prompt. 0 disables the limits.
+QUERY_TIMEOUT_SECONDS = float(os.environ.get("QUERY_TIMEOUT_SECONDS", 30))
+QUERY_MAX_INSTRUCTIONS = int(os.environ.get("QUERY_MAX_INSTRUCTIONS", 0))
+# Number of SQLite virtual machine instructions between two budget checks.
+PROGRESS_HANDLER_INTERVAL = 10_000
+
+_SELECT_STATEMENT = re.compile(r"^\s*(SELECT|WITH|VALUES)\b", re.IGNORECASE)
+
+
+def clean_query(query: str) -> str:
+    """Remove markdown code fences, surrounding whitespace and trailing
+    semicolons from a generated query.
+
+    Args:
+        query (str): The generated query.
+
+    Returns:
+        str: The cleaned query.
+    """
+    return query.replace("```", "").strip().rstrip(";").strip()
+
+
+def limit_query(query: str, limit: int) -> str | None:
+    """Wrap a query in an outer SELECT with a LIMIT, so the database stops
+    producing rows once the limit is reached.
+
+    Args:
+        query (str): The cleaned query.
+        limit (int): The maximum number of rows.
+
+    Returns:
+        str | None: The limited query, or None if the query is not a single
+            SELECT statement and can not be wrapped.
+    """
+    if not _SELECT_STATEMENT.match(query) or ";" in query:
+        return None
+    return f"SELECT * FROM (\n{query}\n) LIMIT {int(limit)}"
+
+
+def fetch_batches(
+    fetchmany: Callable[[int], Sequence],
+    limit: int | None = None,
+    batch_size: int = FETCH_BATCH_SIZE,
+) -> Iterator[List]:
+    """Fetch the rows of an executed query in batches.
+
+    Args:
+        fetchmany (Callable[[int], Sequence]): The fetchmany method of the cursor.
+        limit (int, optional): Stop after this many rows. Defaults to None.
+        batch_size (int, optional): The number of rows fetched at once.
+
+    Yields:
+        List: The batches of rows.
+    """
+    fetched = 0
+    while limit is None or fetched < limit:
+        size = batch_size if limit is None else min(batch_size, limit - fetched)
+        rows = fetchmany(size)
+        if not rows:
+            return
+        fetched += len(rows)
+        yield list(rows)
+
+
+class QueryResult(NamedTuple):
+    """The preview of a query result and its full rows as Parquet file."""
+
+    preview: "pd.DataFrame"
+    total_rows: int
+    truncated: bool
+    file: IO[bytes] | None
+
+
+def fetch_result(
+    fetchmany: Callable[[int], Sequence],
+    columns: List[str],
+    preview_rows: int = RESULT_PREVIEW_ROWS,
+    max_rows: int = RESULT_MAX_ROWS,
+) -> QueryResult:
+    """Fetch the rows of an executed query in batches. The first `preview_rows`
+    rows are kept in memory, all rows are written to a Parquet file once the
+    result is larger than the preview.
+
+    Args:
+        fetchmany (Callable[[int], Sequence]): The fetchmany method of the cursor.
+        columns (List[str]): The column names of the result.
+        preview_rows (int, optional): The number of rows of the preview.
+            Defaults to RESULT_PREVIEW_ROWS.
+        max_rows (int, optional): Stop after this many rows, 0 for no limit.
+            Defaults to RESULT_MAX_ROWS.
+
+    Returns:
+        QueryResult: The preview, the number of fetched rows, whether the
+            result had more than `max_rows` rows, and the Parquet file or None
+            if the result fits into the preview or could not be persisted.
+    """
+    import pandas as pd
+
+    from data_copilot.execution_apps.results import ResultWriter
+
+    rows, writer, total_rows, truncated = [], None, 0, False
+    for batch in fetch_batches(fetchmany, max_rows + 1 if max_rows else None):
+        if max_rows and total_rows + len(batch) > max_rows:
+            batch, truncated = batch[: max_rows - total_rows], True
+        total_rows += len(batch)
+        if writer is None:
+            rows.extend(batch)
+            if total_rows > preview_rows:
+                writer = ResultWriter()
+                writer.write(pd.DataFrame.from_records(rows, columns=columns))
+                del rows[preview_rows:]
+        else:
+            writer.write(pd.DataFrame.from_records(batch, columns=columns))
+
+    preview = pd.DataFrame.from_records(rows, columns=columns)
+    file = writer.close() if writer is not None else None
+    return QueryResult(preview, total_rows, truncated, file)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a query was cancelled because it exceeded its budget."""
+
+
+class QueryBudget:
+    """
+    Execution budget of a single query, enforced inside the database engine so
+    that a runaway query is cancelled without tearing down the task executing it.
+    """
+
+    def __init__(
+        self,
+        timeout: float = QUERY_TIMEOUT_SECONDS,
+        max_instructions: int = QUERY_MAX_INSTRUCTIONS,
+    ) -> None:
+        """Initialize the budget.
+
+        Args:
+            timeout (float, optional): Maximum execution time in seconds, 0 for
+                no limit. Defaults to QUERY_TIMEOUT_SECONDS.
+            max_instructions (int, optional): Maximum number of SQLite virtual
+                machine instructions, 0 for no limit. Only enforced for SQLite.
+                Defaults to QUERY_MAX_INSTRUCTIONS.
+        """
+        self.timeout = timeout
+        self.max_instructions = max_instructions
+        self.instructions = 0
+        self.exceeded: str | None = None
+        self._deadline: float | None = None
+
+    def _start(self) -> None:
+        self.instructions = 0
+        self.exceeded = None
+        self._deadline = time.monotonic() + self.timeout if self.timeout else None
+
+    def _progress_handler(self) -> int:
+        self.instructions += PROGRESS_HANDLER_INTERVAL
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            self.exceeded = f"it ran for more than {self.timeout:g}s"
+        elif self.max_instructions and self.instructions > self.max_instructions:
+            self.exceeded = (
+                f"it executed more than {self.max_instructions} instructions"
+            )
+        # a non-zero return value makes SQLite interrupt the query
+        return 1 if self.exceeded else 0
+
+    @contextmanager
+    def _raise_if_exceeded(self):
+        try:
+            yield self
+        except Exception as e:
+            if self.exceeded:
+                raise QueryBudgetExceeded(
+                    f"The query was cancelled because {self.exceeded}."
+                ) from e
+            raise
+
+    @contextmanager
+    def enforce_sqlite(self, connection):
+        """Enforce the budget on the queries executed and fetched on a SQLite
+        connection within the context.
+
+        Args:
+            connection (sqlite3.Connection): The DB-API connection.
+
+        Raises:
+            QueryBudgetExceeded: If a query exceeded the budget.
+        """
+        self._start()
+        connection.set_progress_handler(
+            self._progress_handler, PROGRESS_HANDLER_INTERVAL
+        )
+        try:
+            with self._raise_if_exceeded():
+                yield self
+        finally:
+            connection.set_progress_handler(None, PROGRESS_HANDLER_INTERVAL)
+
+    @contextmanager
+    def enforce_duckdb(self, connection):
+        """Enforce the timeout on the queries executed and fetched on a DuckDB
+        connection within the context.
+
+        Args:
+            connection (duckdb.DuckDBPyConnection): The connection.
+
+        Raises:
+            QueryBudgetExceeded: If a query exceeded the timeout.
+        """
+        self._start()
+        timer = None
+        if self.timeout:
+
+            def interrupt():
+                self.exceeded = f"it ran for more than {self.timeout:g}s"
+                connection.interrupt()
+
+            timer = threading.Timer(self.timeout, interrupt)
+            timer.daemon = True
+            timer.start()
+        try:
+            with self._raise_if_exceeded():
+                yield self
+        finally:
+            if timer is not None:
+                timer.cancel()
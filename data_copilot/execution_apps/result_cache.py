@@ -0,0 +1,212 @@
+import abc
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import uuid
+from typing import Any, Dict, List, Tuple
+
+from data_copilot.execution_apps.cache import CacheABC, RedisLRUCache
+
+# Store of the query result cache: "disk" (shared by the workers of a host),
+# "redis" (shared by all workers) or "none". Artifact versions are immutable,
+# so entries never expire and are only evicted when the cache is full.
+RESULT_CACHE_BACKEND = os.environ.get("RESULT_CACHE_BACKEND", "disk")
+RESULT_CACHE_DIRECTORY = os.environ.get(
+    "RESULT_CACHE_DIRECTORY",
+    os.path.join(tempfile.gettempdir(), "data_copilot_result_cache"),
+)
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", 512 * 2**20))
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", 10_000))
+RESULT_CACHE_REDIS_URL = os.environ.get(
+    "RESULT_CACHE_REDIS_URL", os.environ.get("CELERY_BROKER_URL", "")
+)
+
+# quoted string literals and identifiers, with escaped quotes
+_QUOTED = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")")
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a cleaned query, so queries differing only in the case of
+    keywords and identifiers or in whitespace share an entry. Quoted literals
+    and identifiers are kept as they are.
+
+    Args:
+        query (str): The cleaned query.
+
+    Returns:
+        str: The normalized query.
+    """
+    parts = _QUOTED.split(query)
+    # the odd parts are the quoted ones
+    return "".join(
+        part if index % 2 else re.sub(r"\s+", " ", part).lower()
+        for index, part in enumerate(parts)
+    ).strip()
+
+
+def result_cache_key(
+    artifact_version_id: uuid.UUID | str, query: str, dialect: str = "SQLite"
+) -> str:
+    """Return the cache key of the result of a query on the dataset of an
+    artifact version.
+
+    Args:
+        artifact_version_id (uuid.UUID | str): The id of the artifact version.
+        query (str): The cleaned query.
+        dialect (str, optional): The SQL dialect. Defaults to "SQLite".
+
+    Returns:
+        str: The cache key.
+    """
+    payload = json.dumps([str(artifact_version_id), dialect, normalize_query(query)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCacheABC(CacheABC):
+    @abc.abstractmethod
+    def get(self, key: str) -> Dict[str, Any] | None:
+        """Return the cached table, i.e. the formatted preview as `data` and
+        the reference to the persisted result as `result`, or None."""
+        pass
+
+    @abc.abstractmethod
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        pass
+
+
+class DiskResultCache(ResultCacheABC):
+    """
+    Query result cache in a local directory, shared by the worker processes of
+    a host. The modification time of an entry is its last access.
+
+    Every process tracks the size of the directory from one scan plus its own
+    writes, and only lists the directory again to remove the least recently
+    used entries once the tracked size crosses `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        directory: str = RESULT_CACHE_DIRECTORY,
+        max_bytes: int = RESULT_CACHE_MAX_BYTES,
+    ) -> None:
+        super().__init__()
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size: int | None = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Dict[str, Any] | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                value = json.loads(file.read())
+            os.utime(path)
+        except (OSError, ValueError):
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        return value
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    # removed by another process
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self.stats.evictions += 1
+            except OSError:
+                pass
+            size -= entry_size
+        self._size = size
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        from data_copilot.execution_apps.helpers import to_json
+
+        content = to_json(value).encode("utf-8")
+        if len(content) > self.max_bytes:
+            return
+        try:
+            # write to a temporary file first, so concurrent readers never see
+            # a partially written entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                file.write(content)
+            os.replace(tmp_path, self._path(key))
+            with self._lock:
+                if self._size is None:
+                    self._size = sum(entry[1] for entry in self._entries())
+                else:
+                    self._size += len(content)
+                if self._size > self.max_bytes:
+                    self._evict()
+        except OSError as e:
+            logging.warning(f"Could not write to the result cache: {e}")
+
+
+class RedisResultCache(ResultCacheABC):
+    """Query result cache shared by all workers."""
+
+    def __init__(
+        self,
+        url: str = RESULT_CACHE_REDIS_URL,
+        max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+        prefix: str = "data_copilot:result_cache",
+    ) -> None:
+        from data_copilot.execution_apps.helpers import to_json
+
+        super().__init__()
+        self.cache = RedisLRUCache(url, prefix, max_entries, dumps=to_json)
+        # share the counters with the underlying cache
+        self.stats = self.cache.stats
+
+    def get(self, key: str) -> Dict[str, Any] | None:
+        return self.cache.get(key)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self.cache.set(key, value)
+
+
+_result_cache: ResultCacheABC | None = None
+
+
+def get_result_cache() -> ResultCacheABC | None:
+    """Return the query result cache of the process, as configured by
+    RESULT_CACHE_BACKEND, or None if caching is disabled.
+
+    Returns:
+        ResultCacheABC | None: The cache.
+    """
+    global _result_cache
+
+    if _result_cache is None:
+        match RESULT_CACHE_BACKEND:
+            case "disk":
+                _result_cache = DiskResultCache()
+            case "redis":
+                _result_cache = RedisResultCache()
+            case _:
+                return None
+    return _result_cache
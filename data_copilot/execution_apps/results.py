@@ -0,0 +1,295 @@
+"""
+Full query results, persisted as Parquet files next to the dataset of the
+artifact version, so messages only keep a preview and large results can be
+paged without running the query again. The files keep the column types of the
+result, the values are only formatted when a page is served.
+
+Persisted results expire after `RESULT_RETENTION_SECONDS`. Persisting a result
+removes the expired results of its artifact version, at most once every
+`RESULT_CLEANUP_INTERVAL` seconds per process. The preview in the message stays
+available after the full result expired.
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import IO, TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from data_copilot.execution_apps.queries import QueryResult
+
+# Folder of the persisted results, relative to the uri of the artifact version.
+RESULTS_FOLDER = "results"
+# Number of rows of a persisted result which are written in one row group. A
+# page of a result only reads the row groups it overlaps.
+RESULT_ROW_GROUP_SIZE = int(os.environ.get("RESULT_ROW_GROUP_SIZE", 10_000))
+# Age in seconds after which persisted results are removed, 0 to keep them.
+RESULT_RETENTION_SECONDS = float(
+    os.environ.get("RESULT_RETENTION_SECONDS", 30 * 24 * 3600)
+)
+# Minimum number of seconds between two cleanups of an artifact version.
+RESULT_CLEANUP_INTERVAL = 3600
+
+_last_cleanups: Dict[str, float] = {}
+_cleanup_lock = threading.Lock()
+
+
+def result_uri(artifact_version_uri: str, result_id: str) -> str:
+    """Return the uri of a persisted result.
+
+    Args:
+        artifact_version_uri (str): The uri of the artifact version.
+        result_id (str): The id of the result.
+
+    Returns:
+        str: The uri of the result.
+    """
+    return os.path.join(artifact_version_uri, RESULTS_FOLDER, f"{result_id}.parquet")
+
+
+def result_exists(artifact_version_uri: str, reference: Dict[str, Any] | None) -> bool:
+    """Whether the persisted result of a message was not removed yet.
+
+    Args:
+        artifact_version_uri (str): The uri of the artifact version.
+        reference (Dict[str, Any] | None): The reference to the result of the
+            message, None if the result was not persisted.
+
+    Returns:
+        bool: Whether the result exists, True if it was not persisted.
+    """
+    from data_copilot import storage_handler
+
+    if reference is None:
+        return True
+    return storage_handler.exists(
+        result_uri(artifact_version_uri, reference["result_id"])
+    )
+
+
+class ResultWriter:
+    """
+    Writes the batches of a query result into a Parquet file. The column types
+    are taken from the first batch, and later batches are cast to them; if a
+    batch can not be cast, the result can not be persisted and `close` returns
+    None.
+    """
+
+    def __init__(self, row_group_size: int = RESULT_ROW_GROUP_SIZE) -> None:
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self.failed = False
+        self._schema = None
+        self._buffer: List = []
+        self._buffered_rows = 0
+        self._file: IO[bytes] | None = None
+        self._writer = None
+
+    def _to_table(self, batch: "pd.DataFrame"):
+        import pyarrow as pa
+
+        if self._schema is None:
+            arrays = [pa.array(values, from_pandas=True) for _, values in batch.items()]
+            # columns without any value in the first batch hold strings
+            arrays = [
+                array.cast(pa.string()) if pa.types.is_null(array.type) else array
+                for array in arrays
+            ]
+            self._schema = pa.schema(
+                [pa.field(str(name), array.type) for name, array in zip(batch, arrays)]
+            )
+        else:
+            arrays = [
+                _to_array(values, field.type)
+                for (_, values), field in zip(batch.items(), self._schema)
+            ]
+        return pa.Table.from_arrays(arrays, schema=self._schema)
+
+    def _flush(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            self._file = tempfile.TemporaryFile()
+            self._writer = pq.ParquetWriter(self._file, self._schema)
+        if self._buffer:
+            self._writer.write_table(
+                pa.concat_tables(self._buffer), row_group_size=self.row_group_size
+            )
+        self._buffer, self._buffered_rows = [], 0
+
+    def write(self, batch: "pd.DataFrame") -> None:
+        """Append a batch of rows to the result.
+
+        Args:
+            batch (pd.DataFrame): The rows.
+        """
+        import pyarrow as pa
+
+        if self.failed:
+            return
+        try:
+            table = self._to_table(batch)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+            logging.warning(f"The query result can not be persisted: {e}")
+            self.failed = True
+            return
+        self._buffer.append(table)
+        self._buffered_rows += table.num_rows
+        self.rows += table.num_rows
+        if self._buffered_rows >= self.row_group_size:
+            self._flush()
+
+    def close(self) -> IO[bytes] | None:
+        """Finish the Parquet file.
+
+        Returns:
+            IO[bytes] | None: The file, positioned at its start, or None if the
+                result could not be persisted.
+        """
+        if self.failed:
+            if self._writer is not None:
+                self._writer.close()
+                self._file.close()
+            return None
+        if self._schema is None:
+            return None
+        self._flush()
+        self._writer.close()
+        self._file.seek(0)
+        return self._file
+
+
+def _to_array(values: "pd.Series", data_type):
+    import pyarrow as pa
+
+    try:
+        return pa.array(values, type=data_type, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # e.g. floats after integers, or numbers in a column of strings
+        return pa.array(values, from_pandas=True).cast(data_type)
+
+
+def read_result_page(uri: str, offset: int, limit: int) -> Dict[str, Any]:
+    """Read a range of rows of a persisted result. Only the row groups which
+    overlap the range are read from the file.
+
+    Args:
+        uri (str): The uri of the result.
+        offset (int): The index of the first row.
+        limit (int): The maximum number of rows.
+
+    Returns:
+        Dict[str, Any]: The formatted columns of the rows as `data`, with the
+            `offset`, `limit` and the `total_rows` of the result.
+    """
+    import pyarrow.parquet as pq
+
+    from data_copilot import storage_handler
+    from data_copilot.execution_apps.helpers import format_data
+
+    parquet_file = pq.ParquetFile(storage_handler.get_local_path(uri))
+    metadata = parquet_file.metadata
+
+    row_groups, first_row, start = [], None, 0
+    for index in range(metadata.num_row_groups):
+        rows = metadata.row_group(index).num_rows
+        if start + rows > offset and start < offset + limit:
+            row_groups.append(index)
+            first_row = start if first_row is None else first_row
+        start += rows
+
+    if row_groups:
+        table = parquet_file.read_row_groups(row_groups)
+        table = table.slice(offset - first_row, limit)
+    else:
+        table = parquet_file.schema_arrow.empty_table()
+
+    return {
+        "offset": offset,
+        "limit": limit,
+        "total_rows": metadata.num_rows,
+        "data": format_data(table.to_pydict()),
+    }
+
+
+def persist_result(
+    query_result: "QueryResult", artifact_version_uri: str, result_id: str
+) -> Dict[str, Any] | None:
+    """Store the Parquet file of a query result next to the dataset of the
+    artifact version.
+
+    Args:
+        query_result (QueryResult): The fetched result.
+        artifact_version_uri (str): The uri of the artifact version.
+        result_id (str): The id of the result.
+
+    Returns:
+        Dict[str, Any] | None: The reference to the result for the message, or
+            None if the result fits into the preview or could not be persisted.
+    """
+    from data_copilot import storage_handler
+
+    if query_result.file is None:
+        return None
+    with query_result.file as file:
+        storage_handler.write_file(result_uri(artifact_version_uri, result_id), file)
+
+    with _cleanup_lock:
+        last_cleanup = _last_cleanups.get(artifact_version_uri, 0.0)
+        cleanup = time.monotonic() - last_cleanup > RESULT_CLEANUP_INTERVAL
+        if cleanup:
+            _last_cleanups[artifact_version_uri] = time.monotonic()
+    if cleanup:
+        cleanup_results(artifact_version_uri)
+
+    return {
+        "result_id": str(result_id),
+        "total_rows": query_result.total_rows,
+        "truncated": query_result.truncated,
+    }
+
+
+def cleanup_results(
+    artifact_version_uri: str, max_age: float = RESULT_RETENTION_SECONDS
+) -> int:
+    """Remove the persisted results of an artifact version which are older than
+    `max_age`. Failing to remove a result is not an error, the next cleanup
+    tries again.
+
+    Args:
+        artifact_version_uri (str): The uri of the artifact version.
+        max_age (float, optional): The age in seconds, 0 to keep all results.
+            Defaults to RESULT_RETENTION_SECONDS.
+
+    Returns:
+        int: The number of removed results.
+    """
+    from data_copilot import storage_handler
+
+    if not max_age:
+        return 0
+
+    folder = os.path.join(artifact_version_uri, RESULTS_FOLDER)
+    removed, expired_before = 0, time.time() - max_age
+    try:
+        names = [
+            os.path.basename(str(path)) for path in storage_handler.list_files(folder)
+        ]
+    except FileNotFoundError:
+        return 0
+    for name in names:
+        uri = os.path.join(folder, name)
+        try:
+            if storage_handler.get_modified_time(uri) < expired_before:
+                storage_handler.delete_file(uri)
+                removed += 1
+        except FileNotFoundError:
+            # removed concurrently
+            continue
+        except Exception as e:
+            logging.warning(f"Could not remove the expired result {uri}: {e}")
+    return removed
@@ -0,0 +1,351 @@
+"""
+Affinity routing of the tasks working on a dataset, so the questions about an
+artifact version land on the worker which already holds it in its caches.
+
+Every worker consumes its own direct queue besides the shared one, and
+announces itself with a heartbeat in a sorted set in Redis. Artifact versions
+are assigned to the live workers by consistent hashing, so only the artifact
+versions of a worker which joins or leaves move. Tasks go to the shared queue
+if the target worker is saturated, or if the broker is not Redis.
+
+The live workers move the tasks left in the direct queues of the workers which
+stopped sending heartbeats to the shared queue, so no task waits for a worker
+which is gone.
+"""
+import bisect
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List
+
+# Route the tasks working on a dataset to the worker holding it. Requires a
+# Redis broker of version 6.2 or later, whose LMOVE command moves the tasks of
+# gone workers to the shared queue.
+AFFINITY_ROUTING = os.environ.get("AFFINITY_ROUTING", "false").lower() == "true"
+# Seconds between two heartbeats of a worker, and after which a worker without
+# heartbeat is considered gone.
+WORKER_HEARTBEAT_INTERVAL = float(os.environ.get("WORKER_HEARTBEAT_INTERVAL", 10))
+WORKER_HEARTBEAT_TIMEOUT = float(os.environ.get("WORKER_HEARTBEAT_TIMEOUT", 30))
+# Number of tasks waiting for a worker, in its direct queue or prefetched, from
+# which on new tasks go to the shared queue instead.
+AFFINITY_MAX_QUEUE_LENGTH = int(os.environ.get("AFFINITY_MAX_QUEUE_LENGTH", 4))
+# Number of points of every worker on the hash ring.
+AFFINITY_VIRTUAL_NODES = int(os.environ.get("AFFINITY_VIRTUAL_NODES", 64))
+# Seconds for which the senders reuse the ring of live workers.
+AFFINITY_RING_TTL = float(os.environ.get("AFFINITY_RING_TTL", 5))
+# Priority of the warm-up tasks, which must not delay the questions. With the
+# Redis transport, 0 is the highest and 9 the lowest priority.
+WARM_UP_TASK_PRIORITY = 9
+ROUTING_REDIS_URL = os.environ.get(
+    "ROUTING_REDIS_URL", os.environ.get("CELERY_BROKER_URL", "")
+)
+
+# Seconds after which a gone worker is forgotten. Its direct queue is emptied
+# until then, which also catches the unacknowledged tasks the broker restores
+# after its visibility timeout of one hour.
+WORKER_FORGET_AFTER = float(os.environ.get("WORKER_FORGET_AFTER", 2 * 3600))
+
+# Oldest Redis server version with the LMOVE command.
+MIN_REDIS_VERSION = (6, 2)
+
+# Sorted set of the worker node names, scored by their last heartbeat.
+WORKERS_KEY = "data_copilot:workers"
+# Hash of the number of tasks prefetched by every worker, as of its heartbeat.
+PREFETCHED_KEY = "data_copilot:workers:prefetched"
+# The Redis transport keeps the tasks of every priority step in its own list,
+# named after the queue and the step. Step 0 uses the name of the queue.
+PRIORITY_STEPS = [0, 3, 6, 9]
+PRIORITY_SEPARATOR = "\x06\x16"
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash ring assigning keys to nodes."""
+
+    def __init__(
+        self, nodes: Iterable[str], virtual_nodes: int = AFFINITY_VIRTUAL_NODES
+    ) -> None:
+        """Initialize the ring.
+
+        Args:
+            nodes (Iterable[str]): The nodes.
+            virtual_nodes (int, optional): The number of points of every node on
+                the ring. Defaults to AFFINITY_VIRTUAL_NODES.
+        """
+        self.nodes = sorted(set(nodes))
+        points = sorted(
+            (_hash(f"{node}#{index}"), node)
+            for node in self.nodes
+            for index in range(virtual_nodes)
+        )
+        self._hashes = [point[0] for point in points]
+        self._nodes = [point[1] for point in points]
+
+    def get(self, key: str) -> str | None:
+        """Return the node of a key, the first node clockwise on the ring.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            str | None: The node, or None if the ring is empty.
+        """
+        if not self._nodes:
+            return None
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._nodes[index]
+
+
+def direct_queue_name(node_name: str) -> str:
+    """Return the name of the direct queue of a worker, as consumed by Celery
+    workers with `worker_direct` enabled."""
+    from celery.utils.nodenames import worker_direct
+
+    return worker_direct(node_name).name
+
+
+def priority_queue_names(queue: str) -> List[str]:
+    """Return the names of the Redis lists holding the tasks of a queue, one
+    per priority step, highest priority first."""
+    return [
+        f"{queue}{PRIORITY_SEPARATOR}{step}" if step else queue
+        for step in PRIORITY_STEPS
+    ]
+
+
+def prefetched_tasks() -> int:
+    """Return the number of tasks the worker of the process received and did
+    not start yet."""
+    from celery.worker import state
+
+    return len(state.reserved_requests - state.active_requests)
+
+
+class AffinityRouter:
+    """
+    Chooses the queue of the tasks working on the dataset of an artifact
+    version, from the workers with a recent heartbeat.
+    """
+
+    def __init__(
+        self,
+        url: str = ROUTING_REDIS_URL,
+        max_queue_length: int = AFFINITY_MAX_QUEUE_LENGTH,
+        ring_ttl: float = AFFINITY_RING_TTL,
+    ) -> None:
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.max_queue_length = max_queue_length
+        self.ring_ttl = ring_ttl
+        self._ring: HashRing | None = None
+        self._ring_expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def live_workers(self) -> List[str]:
+        """Return the node names of the workers with a recent heartbeat."""
+        since = time.time() - WORKER_HEARTBEAT_TIMEOUT
+        return [
+            node.decode()
+            for node in self.client.zrangebyscore(WORKERS_KEY, since, "+inf")
+        ]
+
+    def ring(self) -> HashRing:
+        """Return the ring of the live workers, rebuilt when it expired, so
+        joining and leaving workers are taken into account."""
+        with self._lock:
+            if self._ring is None or time.monotonic() > self._ring_expires_at:
+                self._ring = HashRing(self.live_workers())
+                self._ring_expires_at = time.monotonic() + self.ring_ttl
+            return self._ring
+
+    def route(self, artifact_version_id: uuid.UUID | str) -> Dict[str, Any]:
+        """Return the routing options of a task working on the dataset of an
+        artifact version.
+
+        Args:
+            artifact_version_id (uuid.UUID | str): The id of the artifact
+                version.
+
+        Returns:
+            Dict[str, Any]: The `queue` option of the direct queue of the
+                target worker, or no option for the shared queue.
+        """
+        import redis
+
+        try:
+            node = self.ring().get(str(artifact_version_id))
+            if node is None:
+                return {}
+            queue = direct_queue_name(node)
+            pipeline = self.client.pipeline()
+            for name in priority_queue_names(queue):
+                pipeline.llen(name)
+            pipeline.hget(PREFETCHED_KEY, node)
+            *lengths, prefetched = pipeline.execute()
+            if sum(lengths) + int(prefetched or 0) >= self.max_queue_length:
+                logging.debug(f"Worker {node} is saturated, using the shared queue")
+                return {}
+        except redis.RedisError as e:
+            logging.warning(f"Could not route the task by affinity: {e}")
+            return {}
+        return {"queue": queue}
+
+
+_router: AffinityRouter | None = None
+
+
+def get_router() -> AffinityRouter | None:
+    """Return the affinity router of the process, or None if affinity routing
+    is disabled or the broker is not Redis.
+
+    Returns:
+        AffinityRouter | None: The router.
+    """
+    global _router
+
+    if not AFFINITY_ROUTING or not ROUTING_REDIS_URL.startswith(
+        ("redis://", "rediss://")
+    ):
+        return None
+    if _router is None:
+        _router = AffinityRouter()
+    return _router
+
+
+def affinity_route(artifact_version_id: uuid.UUID | str | None) -> Dict[str, Any]:
+    """Return the routing options of a task working on the dataset of an
+    artifact version, to be passed to `send_task`, `apply_async` or a
+    signature's `set`.
+
+    Args:
+        artifact_version_id (uuid.UUID | str | None): The id of the artifact
+            version.
+
+    Returns:
+        Dict[str, Any]: The routing options, empty for the shared queue.
+    """
+    router = get_router()
+    if router is None or artifact_version_id is None:
+        return {}
+    return router.route(artifact_version_id)
+
+
+class WorkerHeartbeat:
+    """
+    Announces a worker in the sorted set of live workers until stopped, and
+    moves the tasks of the gone workers to the shared queue.
+    """
+
+    def __init__(
+        self,
+        node_name: str,
+        url: str = ROUTING_REDIS_URL,
+        interval: float = WORKER_HEARTBEAT_INTERVAL,
+        shared_queue: str = "celery",
+    ) -> None:
+        import redis
+
+        self.node_name = node_name
+        self.interval = interval
+        self.shared_queue = shared_queue
+        self.client = redis.Redis.from_url(url)
+        self.reroute = True
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def check_server_version(self) -> None:
+        """Disable the rerouting of the tasks of gone workers if the Redis
+        server is older than MIN_REDIS_VERSION."""
+        import redis
+
+        try:
+            version = self.client.info("server")["redis_version"]
+        except (redis.RedisError, KeyError) as e:
+            logging.warning(f"Could not check the version of the Redis server: {e}")
+            return
+        if tuple(int(part) for part in version.split(".")[:2]) < MIN_REDIS_VERSION:
+            logging.error(
+                f"Redis {version} can not move the tasks of gone workers to the "
+                f"shared queue, affinity routing requires Redis "
+                f"{'.'.join(map(str, MIN_REDIS_VERSION))} or later"
+            )
+            self.reroute = False
+
+    def beat(self) -> None:
+        import redis
+
+        try:
+            pipeline = self.client.pipeline()
+            pipeline.zadd(WORKERS_KEY, {self.node_name: time.time()})
+            pipeline.hset(PREFETCHED_KEY, self.node_name, prefetched_tasks())
+            pipeline.execute()
+            if self.reroute:
+                self.reroute_gone_workers()
+        except redis.RedisError as e:
+            logging.warning(f"Could not send the worker heartbeat: {e}")
+
+    def reroute_gone_workers(self) -> int:
+        """Move the tasks waiting in the direct queues of the workers without a
+        recent heartbeat to the shared queue, keeping their priority and order,
+        and forget the workers gone for longer than WORKER_FORGET_AFTER.
+
+        Returns:
+            int: The number of moved tasks.
+        """
+        now = time.time()
+        moved = 0
+        gone = self.client.zrangebyscore(
+            WORKERS_KEY, "-inf", now - WORKER_HEARTBEAT_TIMEOUT
+        )
+        for node in gone:
+            node = node.decode()
+            sources = priority_queue_names(direct_queue_name(node))
+            targets = priority_queue_names(self.shared_queue)
+            for source, target in zip(sources, targets):
+                # the transport pushes to the left and pops from the right
+                while self.client.lmove(source, target, "LEFT", "RIGHT") is not None:
+                    moved += 1
+        if moved:
+            logging.warning(f"Moved {moved} tasks of gone workers to the shared queue")
+
+        forgotten = self.client.zrangebyscore(
+            WORKERS_KEY, "-inf", now - WORKER_FORGET_AFTER
+        )
+        if forgotten:
+            pipeline = self.client.pipeline()
+            pipeline.zrem(WORKERS_KEY, *forgotten)
+            pipeline.hdel(PREFETCHED_KEY, *forgotten)
+            pipeline.execute()
+        return moved
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.beat()
+
+    def start(self) -> None:
+        self.check_server_version()
+        self.beat()
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the heartbeat and mark the worker as gone, so its artifact
+        versions move to the other workers right away and they move the tasks
+        left in its direct queue to the shared queue."""
+        import redis
+
+        self._stopped.set()
+        try:
+            gone_since = time.time() - WORKER_HEARTBEAT_TIMEOUT - 1
+            pipeline = self.client.pipeline()
+            pipeline.zadd(WORKERS_KEY, {self.node_name: gone_since})
+            pipeline.hdel(PREFETCHED_KEY, self.node_name)
+            pipeline.execute()
+        except redis.RedisError as e:
+            logging.warning(f"Could not remove the worker heartbeat: {e}")
@@ -0,0 +1,293 @@
+"""
+Mergeable sketches to summarize datasets larger than memory in one pass.
+
+Every sketch is updated with chunks of values, can be merged with a sketch of
+the same configuration built on other chunks, and reports the error bound of
+its estimates.
+"""
+import math
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def hash_values(values: "pd.Series") -> np.ndarray:
+    """Return 64 bit hashes of the non missing values of a column. Numbers are
+    hashed as float, so the hashes do not depend on the inferred dtype of a
+    chunk.
+
+    Args:
+        values (pd.Series): The values.
+
+    Returns:
+        np.ndarray: The hashes.
+    """
+    import pandas as pd
+
+    values = values.dropna()
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        array = values.to_numpy(dtype=np.float64)
+    else:
+        array = values.to_numpy(dtype=object)
+    return pd.util.hash_array(array, categorize=False)
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Return the number of significant bits of unsigned 64 bit integers."""
+    length = np.zeros(values.shape, dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = values >> np.uint64(shift)
+        has_high = high != 0
+        values = np.where(has_high, high, values)
+        length += has_high.astype(np.uint8) * np.uint8(shift)
+    return length + (values != 0).astype(np.uint8)
+
+
+class HyperLogLog:
+    """Estimates the number of distinct values with a relative standard error of
+    1.04 / sqrt(2 ** precision)."""
+
+    def __init__(self, precision: int = 14) -> None:
+        self.precision = precision
+        self.registers = np.zeros(2**precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        """The relative standard error of the estimate."""
+        return 1.04 / math.sqrt(self.registers.size)
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        bits = 64 - self.precision
+        index = (hashes >> np.uint64(bits)).astype(np.intp)
+        remainder = hashes & np.uint64((1 << bits) - 1)
+        rank = np.uint8(bits + 1) - _bit_length(remainder)
+        np.maximum.at(self.registers, index, rank)
+
+    def update(self, values: "pd.Series") -> None:
+        self.update_hashes(hash_values(values))
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Can not merge sketches of different precision.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        """Return the estimated number of distinct values."""
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(int)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros > 0:
+            # linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class SpaceSaving:
+    """
+    Keeps the `capacity` most frequent values with an upper bound of their
+    count. The count of a value is overestimated by at most its `error`, and no
+    value which is not kept occurs more often than `threshold`.
+    """
+
+    def __init__(self, capacity: int = 1000) -> None:
+        self.capacity = capacity
+        self.counts: Dict[Any, int] = {}
+        self.errors: Dict[Any, int] = {}
+        self.threshold = 0
+
+    def update(self, values: "pd.Series") -> None:
+        counts = values.value_counts(sort=False, dropna=True)
+        chunk = SpaceSaving(self.capacity)
+        if len(counts) > self.capacity:
+            counts = counts.nlargest(self.capacity + 1)
+            chunk.threshold = int(counts.iloc[-1])
+            counts = counts.iloc[:-1]
+        chunk.counts = {key: int(count) for key, count in counts.items()}
+        chunk.errors = dict.fromkeys(chunk.counts, 0)
+        self.merge(chunk)
+
+    def merge(self, other: "SpaceSaving") -> None:
+        counts, errors = {}, {}
+        for key in self.counts.keys() | other.counts.keys():
+            counts[key] = self.counts.get(key, self.threshold) + other.counts.get(
+                key, other.threshold
+            )
+            errors[key] = self.errors.get(key, self.threshold) + other.errors.get(
+                key, other.threshold
+            )
+        threshold = self.threshold + other.threshold
+
+        if len(counts) > self.capacity:
+            ranked = sorted(counts, key=counts.get, reverse=True)
+            threshold = max(threshold, counts[ranked[self.capacity]])
+            counts = {key: counts[key] for key in ranked[: self.capacity]}
+        self.counts = counts
+        self.errors = {key: errors[key] for key in counts}
+        self.threshold = threshold
+
+    def top(self, k: int) -> List[Dict[str, Any]]:
+        """Return the k most frequent values with their estimated count and the
+        maximum overestimation of the count."""
+        ranked = sorted(self.counts, key=self.counts.get, reverse=True)[:k]
+        return [
+            {"value": key, "count": self.counts[key], "error": self.errors[key]}
+            for key in ranked
+        ]
+
+
+class KLLSketch:
+    """
+    Quantile sketch of Karnin, Lang and Liberty. The rank of a returned quantile
+    differs from the requested rank by at most `rank_error` (normalized) with
+    99% confidence.
+    """
+
+    def __init__(self, k: int = 200, seed: int | None = None) -> None:
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def rank_error(self) -> float:
+        """The normalized rank error, as in Apache DataSketches."""
+        if len(self.levels) == 1:
+            # nothing was compacted yet, the quantiles are exact
+            return 0.0
+        return 2.296 / self.k**0.9723
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(8, math.ceil(self.k * (2 / 3) ** depth))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # an odd item stays on the level
+                kept = items[: items.size % 2]
+                promoted = items[kept.size :][self._rng.integers(2) :: 2]
+                self.levels[level] = kept
+                self.levels[level + 1] = np.concatenate(
+                    [self.levels[level + 1], promoted]
+                )
+            level += 1
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return
+        self.n += values.size
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def _sorted_items(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [
+                np.full(level.size, 2**h, dtype=np.int64)
+                for h, level in enumerate(self.levels)
+            ]
+        )
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, q: Sequence[float]) -> List[float | None]:
+        """Return the estimated quantiles, the minimum and maximum exactly."""
+        if not self.n:
+            return [None] * len(q)
+        items, cumulative = self._sorted_items()
+        ranks = np.asarray(q, dtype=np.float64) * cumulative[-1]
+        index = np.minimum(np.searchsorted(cumulative, ranks), items.size - 1)
+        result = items[index]
+        result[np.asarray(q) <= 0] = self.min
+        result[np.asarray(q) >= 1] = self.max
+        return result.tolist()
+
+    def cdf(self, points: Sequence[float]) -> np.ndarray:
+        """Return the estimated share of values less than or equal to the
+        points."""
+        items, cumulative = self._sorted_items()
+        index = np.searchsorted(items, np.asarray(points, dtype=np.float64), "right")
+        ranks = np.where(index > 0, cumulative[np.maximum(index - 1, 0)], 0)
+        return ranks / cumulative[-1]
+
+    def histogram(self, bins: int = 10) -> Dict[str, List[float]]:
+        """Return the estimated histogram with equal width bins between the
+        minimum and maximum, as densities like `np.histogram(density=True)`."""
+        if not self.n:
+            return {"values": [], "bins": []}
+        low, high = self.min, self.max
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+        edges = np.linspace(low, high, bins + 1)
+        shares = np.diff(np.concatenate([[0.0], self.cdf(edges[1:-1]), [1.0]]))
+        densities = shares / np.diff(edges)
+        return {"values": densities.tolist(), "bins": edges[:-1].tolist()}
+
+
+class ReservoirSample:
+    """Uniform random sample without replacement of the rows of a matrix."""
+
+    def __init__(self, size: int = 10_000, seed: int | None = None) -> None:
+        self.size = size
+        self.n = 0
+        self.sample: np.ndarray | None = None
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, rows: np.ndarray) -> None:
+        chunk = ReservoirSample(self.size)
+        chunk._rng = self._rng
+        chunk.n = rows.shape[0]
+        if rows.shape[0] > self.size:
+            rows = rows[self._rng.choice(rows.shape[0], self.size, replace=False)]
+        chunk.sample = rows
+        self.merge(chunk)
+
+    def merge(self, other: "ReservoirSample") -> None:
+        if other.sample is None:
+            return
+        if self.sample is None:
+            self.n, self.sample = other.n, other.sample
+            return
+
+        size = min(self.size, self.n + other.n)
+        # the number of sampled rows coming from this sample follows the
+        # hypergeometric distribution
+        from_self = self._rng.hypergeometric(self.n, other.n, size)
+        self.sample = np.concatenate(
+            [
+                self.sample[
+                    self._rng.choice(self.sample.shape[0], from_self, replace=False)
+                ],
+                other.sample[
+                    self._rng.choice(
+                        other.sample.shape[0], size - from_self, replace=False
+                    )
+                ],
+            ]
+        )
+        self.n += other.n
@@ -0,0 +1,114 @@
+import logging
+import os
+import sqlite3
+import tempfile
+from io import BufferedReader
+from typing import TYPE_CHECKING, Dict, Iterable
+from urllib.parse import quote
+
+from data_copilot.execution_apps.helpers import harmonize_column_names
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Name of the SQLite database built from the dataset at upload time, stored next
+# to the raw file in the artifact version folder.
+SQLITE_FILE_NAME = "df.sqlite"
+SQLITE_TABLE_NAME = "df"
+
+# Number of rows parsed and inserted at once while building the database.
+INGEST_CHUNK_SIZE = int(os.environ.get("INGEST_CHUNK_SIZE", 50_000))
+
+
+def sqlite_affinity(dtype: str) -> str:
+    """Return the SQLite column type of a pandas dtype, which determines the
+    type affinity of the column.
+
+    Args:
+        dtype (str): The name of the pandas dtype.
+
+    Returns:
+        str: The SQLite column type.
+    """
+    dtype = dtype.lower()
+    if dtype.startswith(("int", "uint", "bool")):
+        return "INTEGER"
+    if dtype.startswith("float"):
+        return "REAL"
+    if dtype.startswith("datetime"):
+        return "TIMESTAMP"
+    return "TEXT"
+
+
+def build_sqlite_database(
+    chunks: Iterable["pd.DataFrame"], schema: Dict[str, str] | None = None
+) -> BufferedReader | None:
+    """Build a SQLite database with the table "df" from a stream of data frame
+    chunks. Only one chunk is held in memory at a time, so the dataset can be
+    larger than the available memory.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): The chunks of the dataset.
+        schema (Dict[str, str], optional): The dtypes by column, which determine
+            the types of the columns. Defaults to None, which infers them from
+            the first chunk.
+
+    Returns:
+        BufferedReader | None: The database file opened for reading, or None if
+            the dataset could not be written to SQLite.
+    """
+    column_types = None
+    if schema is not None:
+        column_types = {
+            column: sqlite_affinity(dtype)
+            for column, dtype in zip(
+                harmonize_column_names(list(schema)), schema.values()
+            )
+        }
+
+    fd, path = tempfile.mkstemp(suffix=".sqlite")
+    os.close(fd)
+    try:
+        connection = sqlite3.connect(path)
+        try:
+            # The file is only a build artifact until it was uploaded, there is
+            # nothing to recover after a crash.
+            connection.execute("PRAGMA journal_mode = OFF")
+            connection.execute("PRAGMA synchronous = OFF")
+            for chunk in chunks:
+                chunk.columns = harmonize_column_names(chunk.columns)
+                chunk.to_sql(
+                    SQLITE_TABLE_NAME,
+                    connection,
+                    if_exists="append",
+                    index=False,
+                    dtype=column_types,
+                )
+            connection.commit()
+        finally:
+            connection.close()
+        # On POSIX systems the open file stays readable after it was removed,
+        # which cleans up the temporary file once the caller closes it.
+        return open(path, "rb")
+    except (sqlite3.Error, ValueError, TypeError) as e:
+        logging.warning(f"Could not build the SQLite database of the dataset: {e}")
+        return None
+    finally:
+        os.remove(path)
+
+
+def connect_read_only(path: str) -> sqlite3.Connection:
+    """Open a prebuilt SQLite database read only. The database is flagged as
+    immutable, which lets SQLite skip all locking.
+
+    Args:
+        path (str): The local path of the database file.
+
+    Returns:
+        sqlite3.Connection: The connection.
+    """
+    return sqlite3.connect(
+        f"file:{quote(os.path.abspath(path))}?mode=ro&immutable=1",
+        uri=True,
+        check_same_thread=False,
+    )
@@ -0,0 +1,206 @@
+import datetime
+import math
+from typing import TYPE_CHECKING, Any, Dict, Sequence
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Number of most frequent values stored per column.
+TOP_K = 5
+# Quantiles stored for numeric columns.
+QUANTILES = (0.0, 0.05, 0.25, 0.5, 0.75, 0.95, 1.0)
+
+
+def to_json_value(value: Any) -> Any:
+    """Convert a value of a data frame to a JSON serializable value. Missing and
+    non-finite values become None, timestamps ISO 8601 strings.
+
+    Args:
+        value (Any): The value.
+
+    Returns:
+        Any: The JSON serializable value.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if value is None or value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+def column_statistics(
+    column: "pd.Series", top_k: int = TOP_K, quantiles: Sequence[float] = QUANTILES
+) -> Dict[str, Any]:
+    """Compute the statistics of a single column. The number of distinct values
+    is estimated with a HyperLogLog sketch, like in `StatisticsSketch`.
+
+    Args:
+        column (pd.Series): The column.
+        top_k (int, optional): Number of most frequent values. Defaults to TOP_K.
+        quantiles (Sequence[float], optional): The quantiles of numeric columns.
+            Defaults to QUANTILES.
+
+    Returns:
+        Dict[str, Any]: The JSON serializable statistics.
+    """
+    import pandas as pd
+
+    from data_copilot.execution_apps.sketches import HyperLogLog
+
+    values = column.dropna()
+    distinct = HyperLogLog()
+    distinct.update(values)
+    statistics = {
+        "count": int(values.shape[0]),
+        "null_count": int(column.shape[0] - values.shape[0]),
+        "distinct_count": min(distinct.count(), int(values.shape[0])),
+        "min": None,
+        "max": None,
+    }
+
+    try:
+        if not values.empty:
+            statistics["min"] = to_json_value(values.min())
+            statistics["max"] = to_json_value(values.max())
+    except TypeError:
+        # object columns with values which can not be compared
+        pass
+
+    top_values = values.value_counts(sort=True).head(top_k)
+    statistics["top_values"] = [
+        {"value": to_json_value(value), "count": int(count)}
+        for value, count in top_values.items()
+    ]
+
+    is_numeric = pd.api.types.is_numeric_dtype(column)
+    if is_numeric and not pd.api.types.is_bool_dtype(column):
+        quantile_values = values.quantile(list(quantiles)) if not values.empty else {}
+        statistics["quantiles"] = {
+            str(q): to_json_value(quantile_values.get(q)) for q in quantiles
+        }
+    return statistics
+
+
+def compute_statistics(data_frame: "pd.DataFrame") -> Dict[str, Dict[str, Any]]:
+    """Compute the statistics of all columns of a dataset: null count, number of
+    distinct values, min/max, the most frequent values and, for numeric
+    columns, quantiles.
+
+    Args:
+        data_frame (pd.DataFrame): The dataset.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The JSON serializable statistics by column.
+    """
+    return {
+        str(column): column_statistics(data_frame[column])
+        for column in data_frame.columns
+    }
+
+
+class StatisticsSketch:
+    """
+    Statistics of the columns of a dataset which is read in chunks, in the format
+    of `compute_statistics`. The counts, min and max are exact, the distinct
+    counts, the counts of the most frequent values and the quantiles are
+    estimated with the sketches of `data_copilot.execution_apps.sketches`.
+    """
+
+    def __init__(self, top_k: int = TOP_K, quantiles: Sequence[float] = QUANTILES):
+        self.top_k = top_k
+        self.quantiles = quantiles
+        self.columns: Dict[str, Dict[str, Any]] = {}
+
+    def _add_column(self, column: "pd.Series") -> Dict[str, Any]:
+        import pandas as pd
+
+        from data_copilot.execution_apps.sketches import (
+            HyperLogLog,
+            KLLSketch,
+            SpaceSaving,
+        )
+
+        is_numeric = pd.api.types.is_numeric_dtype(column)
+        return {
+            "count": 0,
+            "null_count": 0,
+            "min": None,
+            "max": None,
+            "comparable": True,
+            "distinct": HyperLogLog(),
+            "frequent": SpaceSaving(),
+            "quantiles": (
+                KLLSketch()
+                if is_numeric and not pd.api.types.is_bool_dtype(column)
+                else None
+            ),
+        }
+
+    def update(self, chunk: "pd.DataFrame") -> None:
+        """Add a chunk of the dataset.
+
+        Args:
+            chunk (pd.DataFrame): The chunk.
+        """
+        for name in chunk.columns:
+            column = chunk[name]
+            if name not in self.columns:
+                self.columns[name] = self._add_column(column)
+            state = self.columns[name]
+
+            values = column.dropna()
+            state["count"] += int(values.shape[0])
+            state["null_count"] += int(column.shape[0] - values.shape[0])
+            if state["comparable"] and not values.empty:
+                try:
+                    low, high = values.min(), values.max()
+                    if state["min"] is not None:
+                        low, high = min(state["min"], low), max(state["max"], high)
+                    state["min"], state["max"] = low, high
+                except TypeError:
+                    # object columns with values which can not be compared
+                    state["comparable"] = False
+                    state["min"], state["max"] = None, None
+
+            state["distinct"].update(values)
+            state["frequent"].update(values)
+            if state["quantiles"] is not None:
+                state["quantiles"].update(values.to_numpy(dtype="float64"))
+
+    def to_statistics(self) -> Dict[str, Dict[str, Any]]:
+        """Return the JSON serializable statistics by column.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: The statistics.
+        """
+        statistics = {}
+        for name, state in self.columns.items():
+            column_statistics = {
+                "count": state["count"],
+                "null_count": state["null_count"],
+                "distinct_count": min(state["distinct"].count(), state["count"]),
+                "min": to_json_value(state["min"]),
+                "max": to_json_value(state["max"]),
+                "top_values": [
+                    {"value": to_json_value(top["value"]), "count": top["count"]}
+                    for top in state["frequent"].top(self.top_k)
+                ],
+            }
+            if state["quantiles"] is not None:
+                column_statistics["quantiles"] = {
+                    str(q): to_json_value(value)
+                    for q, value in zip(
+                        self.quantiles, state["quantiles"].quantiles(self.quantiles)
+                    )
+                }
+            statistics[str(name)] = column_statistics
+        return statistics
@@ -0,0 +1,89 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+import redis
+
+from data_copilot.execution_apps.cache import LRUCache, RedisLRUCache
+
+
+class LRUCacheTest(TestCase):
+    def test_get_set(self):
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats.hits, 1)
+        self.assertEqual(cache.stats.misses, 1)
+        self.assertEqual(cache.stats.hit_rate, 0.5)
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(cache.stats.evictions, 1)
+
+    def test_size_budget(self):
+        cache = LRUCache(max_size=10, sizeof=len)
+        cache.set("a", "x" * 6)
+        cache.set("b", "x" * 4)
+        self.assertEqual(cache.size, 10)
+
+        cache.set("c", "x" * 5)
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.size, 9)
+
+        self.assertFalse(cache.set("d", "x" * 11))
+        self.assertNotIn("d", cache)
+
+    def test_ttl(self):
+        cache = LRUCache(max_size=2, ttl=10)
+        with patch("time.monotonic", return_value=0):
+            cache.set("a", 1)
+        with patch("time.monotonic", return_value=5):
+            self.assertEqual(cache.get("a"), 1)
+        with patch("time.monotonic", return_value=11):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.size, 0)
+
+
+class RedisLRUCacheTest(TestCase):
+    def setUp(self) -> None:
+        patcher = patch("redis.Redis.from_url")
+        self.client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.cache = RedisLRUCache("redis://", "test", max_entries=2, ttl=60)
+
+    def test_get(self):
+        self.client.get.return_value = b'["SQL", "q"]'
+        self.assertEqual(self.cache.get("a"), ["SQL", "q"])
+        self.assertEqual(self.client.zadd.call_args.args[0], "test:index")
+
+        self.client.get.return_value = None
+        self.assertIsNone(self.cache.get("b"))
+        self.client.zrem.assert_called_once_with("test:index", "b")
+        self.assertEqual((self.cache.stats.hits, self.cache.stats.misses), (1, 1))
+
+    def test_set_evicts_least_recently_used(self):
+        pipeline = self.client.pipeline.return_value
+        pipeline.execute.return_value = [True, 1, 3]
+        self.client.zpopmin.return_value = [(b"old", 1.0)]
+
+        self.cache.set("new", {"a": 1})
+
+        pipeline.set.assert_called_once_with("test:new", '{"a": 1}', ex=60)
+        self.client.zpopmin.assert_called_once_with("test:index", 1)
+        self.client.delete.assert_called_once_with("test:old")
+        self.assertEqual(self.cache.stats.evictions, 1)
+
+    def test_redis_errors_are_misses(self):
+        self.client.get.side_effect = redis.ConnectionError("down")
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(self.cache.get("a", "default"), "default")
+        self.assertEqual(self.cache.stats.misses, 1)
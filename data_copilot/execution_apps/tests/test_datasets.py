@@ -0,0 +1,99 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from data_copilot.execution_apps.datasets import compact_dataset
+from data_copilot.execution_apps.sqlite_database import (
+    build_sqlite_database,
+    connect_read_only,
+)
+
+
+class CompactDatasetTest(TestCase):
+    def test_compact_dtypes(self):
+        data_frame = pd.DataFrame(
+            {
+                "age": [31, 45, 27, 31],
+                "id": [1, 2, 3, 2**40],
+                "count": [1.0, np.nan, 3.0, 4.0],
+                "score": [1.5, 2.0, np.nan, 4.0],
+                "amount": [1.0, 2.0, 3.0, 4.0],
+                "city": ["Bern", "Zurich", "Bern", None],
+                "name": ["Anna", "Beat", "Carl", "Dora"],
+            }
+        )
+
+        compacted = compact_dataset(data_frame)
+
+        self.assertEqual(
+            {column: str(dtype) for column, dtype in compacted.dtypes.items()},
+            {
+                "age": "int32",
+                "id": "int64",
+                "count": "Int32",
+                "score": "float64",
+                "amount": "float64",
+                "city": "category",
+                "name": "object",
+            },
+        )
+        self.assertTrue(compacted["count"].isna().iloc[1])
+        self.assertEqual(compacted["id"].iloc[3], 2**40)
+
+
+class SQLiteDatabaseTest(TestCase):
+    def test_column_affinity_from_schema(self):
+        chunks = [
+            pd.DataFrame({"Zip Code": [np.nan, np.nan], "Price": [1.5, 2.0]}),
+            pd.DataFrame({"Zip Code": ["03000", "8000"], "Price": [3.0, 4.0]}),
+        ]
+
+        file = build_sqlite_database(chunks, {"Zip Code": "object", "Price": "float64"})
+
+        # the built file is removed already, it stays readable while it is open
+        with tempfile.TemporaryDirectory() as directory, file:
+            path = os.path.join(directory, "df.sqlite")
+            with open(path, "wb") as copy:
+                shutil.copyfileobj(file, copy)
+            connection = sqlite3.connect(path)
+            rows = connection.execute(
+                "SELECT zip_code, typeof(zip_code), typeof(price) FROM df "
+                "WHERE zip_code IS NOT NULL"
+            ).fetchall()
+            connection.close()
+
+        self.assertEqual(rows, [("03000", "text", "real"), ("8000", "text", "real")])
+
+    def test_build_from_chunks_and_connect_read_only(self):
+        chunks = (
+            pd.DataFrame({"Name": [f"n{i}", f"m{i}"], "Age": [i, i + 1]})
+            for i in range(3)
+        )
+
+        file = build_sqlite_database(chunks)
+
+        with tempfile.TemporaryDirectory() as directory, file:
+            path = os.path.join(directory, "df it's.sqlite")
+            with open(path, "wb") as copy:
+                shutil.copyfileobj(file, copy)
+            connection = connect_read_only(path)
+            try:
+                self.assertEqual(
+                    connection.execute("SELECT count(*), sum(age) FROM df").fetchone(),
+                    (6, 9),
+                )
+                with self.assertRaises(sqlite3.OperationalError):
+                    connection.execute("DELETE FROM df")
+            finally:
+                connection.close()
+
+    def test_build_failure(self):
+        chunks = [pd.DataFrame({"value": [{"a": 1}]})]
+
+        with self.assertLogs(level="WARNING"):
+            self.assertIsNone(build_sqlite_database(chunks))
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import uuid
+from unittest import TestCase
+from unittest.mock import patch
+
+import duckdb
+import pandas as pd
+
+from data_copilot.execution_apps.apps import duckdb_interpreter
+
+SCHEMA = {"First Name": "object", "Age": "int64"}
+
+
+class DuckDBInterpreterTest(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.uri = f"file://{self.directory.name}"
+        data_frame = pd.DataFrame({"First Name": ["Anna", "Beat"], "Age": [31, 45]})
+        data_frame.to_parquet(os.path.join(self.directory.name, "df.parquet"))
+        data_frame.to_csv(os.path.join(self.directory.name, "data.csv"), index=False)
+
+    def execute(self, query, file_config):
+        return duckdb_interpreter._execute_query(
+            query, file_config, uuid.uuid4(), self.uri
+        )
+
+    def test_view_over_parquet(self):
+        result = self.execute(
+            "SELECT first_name, age FROM df ORDER BY age DESC",
+            {
+                "file_name": "data.csv",
+                "file_type": "csv",
+                "file_schema": SCHEMA,
+                "columnar_file_name": "df.parquet",
+            },
+        )
+
+        self.assertEqual(result.preview["first_name"].tolist(), ["Beat", "Anna"])
+        self.assertEqual(result.total_rows, 2)
+
+    def test_view_over_csv(self):
+        # without the Parquet copy, the csv file is scanned
+        os.remove(os.path.join(self.directory.name, "df.parquet"))
+        result = self.execute(
+            "SELECT sum(age) AS total FROM df",
+            {"file_name": "data.csv", "file_type": "csv", "file_schema": SCHEMA},
+        )
+
+        self.assertEqual(result.preview["total"].tolist(), [76])
+
+    def test_connection_config(self):
+        temp_directory = os.path.join(self.directory.name, "spill")
+        connect = duckdb.connect
+        with patch.object(
+            duckdb_interpreter, "DUCKDB_MEMORY_LIMIT", "256MB"
+        ), patch.object(duckdb_interpreter, "DUCKDB_THREADS", "2"), patch.object(
+            duckdb_interpreter, "DUCKDB_TEMP_DIRECTORY", temp_directory
+        ), patch(
+            "duckdb.connect", side_effect=connect
+        ) as duckdb_connect:
+            result = self.execute(
+                "SELECT current_setting('threads') AS threads FROM df LIMIT 1",
+                {"file_schema": SCHEMA, "columnar_file_name": "df.parquet"},
+            )
+
+        self.assertEqual(
+            duckdb_connect.call_args.kwargs["config"],
+            {"memory_limit": "256MB", "temp_directory": temp_directory, "threads": 2},
+        )
+        self.assertTrue(os.path.isdir(temp_directory))
+        self.assertEqual(result.preview["threads"].tolist(), [2])
+
+    def test_failing_query_answers_with_error(self):
+        file_config = {"file_schema": SCHEMA, "columnar_file_name": "df.parquet"}
+        with patch(
+            "data_copilot.execution_apps.datasets.get_file_config",
+            return_value=file_config,
+        ), patch(
+            "data_copilot.execution_apps.apps.sql_interpreter.generate_sql_query",
+            return_value=("SQL", "SELECT missing_column FROM df"),
+        ), patch(
+            "data_copilot.execution_apps.result_cache.get_result_cache",
+            return_value=None,
+        ), self.assertLogs(
+            level="ERROR"
+        ):
+            message = duckdb_interpreter.DuckDBInterpreter.execute_message(
+                "q", uuid.uuid4(), uuid.uuid4(), uuid.uuid4(), self.uri, []
+            ).to_dict()
+
+        self.assertEqual(message["message_type"], "error")
+        self.assertIn("An error occured while executing", message["text_content"])
@@ -0,0 +1,68 @@
+import copy
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from data_copilot.execution_apps.helpers import (
+    format_column,
+    format_data,
+    stringify_numbers_in_list,
+    to_json,
+)
+
+
+class FormattingTest(TestCase):
+    def test_format_column_matches_stringify_number(self):
+        values = [0, 3, -2.0, 0.5, -0.5, 1e-7, 1e6, 1e6 + 0.5, 123.4565, 0.0005]
+        values += [9.99951e10, 1e20, 2.0**63, 5e-324, -1e-300, float("nan")]
+        values += [float("inf"), -float("inf"), True, False]
+        floats = [float(value) for value in values]
+
+        self.assertEqual(
+            format_column(values), stringify_numbers_in_list(copy.deepcopy(values))
+        )
+        self.assertEqual(
+            format_column(np.array(floats)), stringify_numbers_in_list(floats)
+        )
+
+        rng = np.random.default_rng(0)
+        random = rng.normal(size=10_000) * 10.0 ** rng.integers(-12, 12, 10_000)
+        self.assertEqual(
+            format_column(pd.Series(random)),
+            stringify_numbers_in_list(random.tolist()),
+        )
+
+    def test_format_data(self):
+        data = {
+            "table": pd.Series([1.25, 2.0]),
+            "text": ["a", None, 1.5],
+            "matrix": np.array([[1.0, 0.25], [0.25, 1.0]]),
+            "nested": {"value": 1e7},
+        }
+
+        self.assertEqual(
+            format_data(data),
+            {
+                "table": ["1.250", "2"],
+                "text": ["a", None, "1.500"],
+                "matrix": [["1", "0.250"], ["0.250", "1"]],
+                "nested": {"value": "10000000"},
+            },
+        )
+        # the data is not modified
+        self.assertEqual(data["nested"], {"value": 1e7})
+
+    def test_to_json(self):
+        data = {
+            "numbers": np.array([1.5, np.nan]),
+            "count": np.int64(3),
+            "days": pd.Series(pd.to_datetime(["2023-01-01", None])),
+            "day": pd.Timestamp("2023-01-02"),
+        }
+
+        self.assertEqual(
+            to_json(data),
+            '{"numbers":[1.5,null],"count":3,"days":["2023-01-01T00:00:00",null],'
+            '"day":"2023-01-02T00:00:00"}',
+        )
@@ -0,0 +1,99 @@
+import io
+from unittest import TestCase
+from unittest.mock import patch
+
+import pandas as pd
+
+from data_copilot.execution_apps import helpers, ingestion
+from data_copilot.execution_apps.statistics import StatisticsSketch
+
+
+class IngestionTest(TestCase):
+    def test_sniff_csv_options(self):
+        file = io.BytesIO('\ufeffname;city\n"Muller; Hans";Bern\n'.encode("utf-8"))
+
+        self.assertEqual(
+            ingestion.sniff_csv_options(file), {"sep": ";", "quotechar": '"'}
+        )
+        self.assertEqual(file.tell(), 0)
+
+    def test_infer_csv_schema_widens_types(self):
+        file = io.BytesIO(b"a,b,c\n1,1,x\n2,2,y\n3,3.5,z\n4,x,1\n")
+
+        with patch.object(ingestion, "INGEST_CHUNK_SIZE", 2):
+            schema, rows = ingestion.infer_csv_schema(
+                file, {"sep": ",", "quotechar": '"'}
+            )
+
+        self.assertEqual(rows, 4)
+        self.assertEqual(schema, {"a": "int64", "b": "object", "c": "object"})
+
+    def test_statistics_sketch(self):
+        data_frame = pd.DataFrame(
+            {"price": [1.0, 2.0, None, 4.0, 4.0], "city": list("ababa")}
+        )
+
+        sketch = StatisticsSketch()
+        sketch.update(data_frame.iloc[:2])
+        sketch.update(data_frame.iloc[2:])
+        statistics = sketch.to_statistics()
+
+        self.assertEqual(statistics["price"]["count"], 4)
+        self.assertEqual(statistics["price"]["null_count"], 1)
+        self.assertEqual(statistics["price"]["distinct_count"], 3)
+        self.assertEqual(statistics["price"]["min"], 1.0)
+        self.assertEqual(statistics["price"]["max"], 4.0)
+        self.assertEqual(
+            statistics["city"]["top_values"][0], {"value": "a", "count": 3}
+        )
+
+
+class ColumnarCopyTest(TestCase):
+    def test_csv_upload_writes_columnar_copy(self):
+        file = io.BytesIO(b"name,age,score\nAnna,31,1.5\nBeat,45,2.0\n")
+
+        file_config, files = ingestion._process_csv(file, False, lambda _: None)
+
+        self.assertEqual(file_config["columnar_file_name"], "df.parquet")
+        self.assertEqual([name for name, _ in files], ["df.parquet"])
+        data_frame = pd.read_parquet(files[0][1])
+        self.assertEqual(data_frame["age"].tolist(), [31, 45])
+        self.assertEqual(str(data_frame["score"].dtype), "float64")
+
+    def test_failed_sqlite_build_keeps_full_columnar_copy(self):
+        # the columns collide once their names are harmonized
+        rows = "".join(f"x{i},{i}\n" for i in range(25))
+        file = io.BytesIO(f"Name,name\n{rows}".encode())
+
+        with patch.object(ingestion, "INGEST_CHUNK_SIZE", 10), self.assertLogs(
+            level="WARNING"
+        ):
+            file_config, files = ingestion._process_csv(file, True, lambda _: None)
+
+        self.assertNotIn("sqlite_file_name", file_config)
+        self.assertEqual(file_config["rows"], 25)
+        self.assertEqual(file_config["statistics"]["name"]["count"], 25)
+        self.assertEqual(len(pd.read_parquet(dict(files)["df.parquet"])), 25)
+
+    def test_mixed_types_skip_columnar_copy(self):
+        data_frame = pd.DataFrame({"value": [1, "x", 2.5]})
+
+        with self.assertLogs(level="WARNING") as logs:
+            self.assertIsNone(ingestion.to_columnar(data_frame))
+
+        self.assertIn("columnar copy", logs.output[0])
+        self.assertEqual(ingestion._sidecar_files({}, None, None), [])
+
+    @patch("data_copilot.storage_handler.read_file")
+    @patch("data_copilot.storage_handler.exists", return_value=True)
+    def test_read_prefers_columnar_copy(self, exists, read_file):
+        columnar_file = ingestion.to_columnar(pd.DataFrame({"age": [31, 45]}))
+
+        with patch.object(helpers, "open_seekable", return_value=columnar_file):
+            data_frame = helpers.read_dataset_io(
+                "file:///v1/data.csv", "csv", columnar_uri="file:///v1/df.parquet"
+            )
+
+        exists.assert_called_once_with("file:///v1/df.parquet")
+        read_file.assert_not_called()
+        self.assertEqual(data_frame["age"].tolist(), [31, 45])
@@ -0,0 +1,55 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from data_copilot.execution_apps.apps import sql_interpreter
+from data_copilot.execution_apps.llm_cache import InMemoryLLMCache, llm_cache_key
+
+
+class LLMCacheTest(TestCase):
+    def test_key_collapses_whitespace_and_keeps_case(self):
+        columns = ["age", "name"]
+        self.assertEqual(
+            llm_cache_key("How old  is\nBob?", columns, "model"),
+            llm_cache_key("How old is Bob?", columns, "model"),
+        )
+        self.assertNotEqual(
+            llm_cache_key("how old is bob?", columns, "model"),
+            llm_cache_key("how old is bob?", ["age"], "model"),
+        )
+        # literals are compared case sensitively in SQL
+        self.assertNotEqual(
+            llm_cache_key("orders from 'Bern'", columns, "model"),
+            llm_cache_key("orders from 'bern'", columns, "model"),
+        )
+        self.assertNotEqual(
+            llm_cache_key("how old is bob?", columns, "model"),
+            llm_cache_key("how old is bob?", columns, "other_model"),
+        )
+
+    def test_generate_sql_query_is_cached(self):
+        cache = InMemoryLLMCache(max_entries=10, ttl=60)
+        with patch.object(
+            sql_interpreter, "_generate_sql_query", return_value=("SQL", "q", True)
+        ) as generate, patch(
+            "data_copilot.execution_apps.llm_cache.get_llm_cache", return_value=cache
+        ):
+            for prompt in ("Count rows", "Count  rows"):
+                self.assertEqual(
+                    sql_interpreter.generate_sql_query(prompt, ["A b"]), ("SQL", "q")
+                )
+
+        generate.assert_called_once_with("Count rows", ["a_b"], "SQLite")
+        self.assertEqual(cache.stats.hits, 1)
+        self.assertEqual(cache.stats.misses, 1)
+
+    def test_unparsed_responses_are_not_cached(self):
+        cache = InMemoryLLMCache(max_entries=10, ttl=60)
+        with patch.object(
+            sql_interpreter, "_generate_sql_query", return_value=("TEXT", "?", False)
+        ) as generate, patch(
+            "data_copilot.execution_apps.llm_cache.get_llm_cache", return_value=cache
+        ):
+            sql_interpreter.generate_sql_query("Count rows", ["a"])
+            sql_interpreter.generate_sql_query("Count rows", ["a"])
+
+        self.assertEqual(generate.call_count, 2)
@@ -0,0 +1,58 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import patch
+
+from data_copilot.execution_apps import notifications
+
+
+class NotificationsTest(TestCase):
+    @patch.object(notifications, "_client", None)
+    @patch.object(notifications, "NOTIFICATIONS_REDIS_URL", "redis://localhost")
+    @patch("redis.Redis.from_url")
+    def test_publish_message(self, from_url):
+        notifications.publish_message("chat", "message")
+
+        channel, payload = from_url.return_value.publish.call_args.args
+        self.assertEqual(channel, "data_copilot:chats:chat")
+        self.assertIn('"message_id": "message"', payload)
+
+    @patch.object(notifications, "NOTIFICATIONS_REDIS_URL", "memory://")
+    def test_publish_without_redis(self):
+        with patch("redis.Redis.from_url") as from_url:
+            notifications.publish_message("chat", "message")
+        from_url.assert_not_called()
+        self.assertIsNone(notifications.get_chat_listener())
+
+    def test_listener_wakes_up_subscribers_of_the_chat(self):
+        async def listen(self):
+            await asyncio.Event().wait()
+
+        async def run():
+            listener = notifications.ChatListener("redis://localhost")
+            with listener.subscribe("a") as a, listener.subscribe("b") as b:
+                listener._wake_up("a")
+                self.assertTrue(a.is_set())
+                self.assertFalse(b.is_set())
+                # after a reconnection, all subscribers reload their messages
+                listener._wake_up()
+                self.assertTrue(b.is_set())
+            self.assertEqual(listener._subscribers, {})
+            listener._task.cancel()
+
+        with patch.object(notifications.ChatListener, "_listen", listen):
+            asyncio.run(run())
+
+    @patch.object(notifications, "NOTIFICATIONS_RECONNECT_DELAY", 0)
+    @patch("redis.asyncio.Redis.from_url")
+    def test_listener_reconnects_after_unexpected_errors(self, from_url):
+        # the second connection stops the listener
+        from_url.side_effect = [ValueError("unexpected"), asyncio.CancelledError()]
+
+        async def run():
+            listener = notifications.ChatListener("redis://localhost")
+            await listener._listen()
+
+        with self.assertLogs(level="ERROR"):
+            with self.assertRaises(asyncio.CancelledError):
+                asyncio.run(run())
+        self.assertEqual(from_url.call_count, 2)
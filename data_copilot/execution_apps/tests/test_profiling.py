@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+import uuid
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from data_copilot.execution_apps.profiling import (
+    correlation_matrix,
+    get_stored_profile,
+    profile_dataset,
+)
+
+
+class ProfilingTest(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.data_frame = pd.DataFrame(
+            {
+                "price": rng.normal(size=200) + 1e6,
+                "amount": rng.integers(0, 10, 200).astype(float),
+                "constant": 1.0,
+                "city": rng.choice(["Bern", "Zurich"], 200),
+            }
+        )
+        self.data_frame.loc[::7, "amount"] = np.nan
+
+    def test_correlation_matches_pandas(self):
+        numeric = self.data_frame[["price", "amount", "constant"]]
+
+        np.testing.assert_allclose(
+            correlation_matrix(numeric.to_numpy()), numeric.corr().to_numpy()
+        )
+
+    def test_profile_dataset(self):
+        profile = profile_dataset(self.data_frame)
+
+        json.dumps(profile, allow_nan=False)
+        self.assertEqual(profile["rows"], 200)
+        self.assertEqual(
+            profile["correlation"]["columns"], ["price", "amount", "constant"]
+        )
+        self.assertEqual(profile["columns"]["amount"]["null_count"], 29)
+        self.assertEqual(len(profile["columns"]["amount"]["histogram"]["bins"]), 10)
+        self.assertNotIn("histogram", profile["columns"]["city"])
+        self.assertEqual(
+            sum(v["count"] for v in profile["columns"]["city"]["top_values"]), 200
+        )
+
+    def test_get_stored_profile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            uri = f"file://{directory}"
+            self.assertIsNone(get_stored_profile(uuid.uuid4(), uri))
+
+            with open(os.path.join(directory, "profile.json"), "w") as file:
+                json.dump({"rows": 200}, file)
+            artifact_version_id = uuid.uuid4()
+            self.assertEqual(
+                get_stored_profile(artifact_version_id, uri), {"rows": 200}
+            )
+
+            os.remove(os.path.join(directory, "profile.json"))
+            # served from the profile cache
+            self.assertEqual(
+                get_stored_profile(artifact_version_id, uri), {"rows": 200}
+            )
@@ -0,0 +1,161 @@
+import os
+import sqlite3
+import tempfile
+from unittest import TestCase
+
+from data_copilot.execution_apps.queries import (
+    QueryBudget,
+    QueryBudgetExceeded,
+    clean_query,
+    fetch_batches,
+    fetch_result,
+    limit_query,
+)
+from data_copilot.execution_apps.results import (
+    ResultWriter,
+    cleanup_results,
+    persist_result,
+    read_result_page,
+    result_exists,
+    result_uri,
+)
+
+
+class QueriesTest(TestCase):
+    def setUp(self) -> None:
+        self.connection = sqlite3.connect(":memory:")
+        self.connection.execute("CREATE TABLE df (a INTEGER)")
+        self.connection.executemany(
+            "INSERT INTO df VALUES (?)", [(i,) for i in range(250)]
+        )
+
+    def tearDown(self) -> None:
+        self.connection.close()
+
+    def test_clean_query(self):
+        self.assertEqual(clean_query("```\nSELECT * FROM df;\n```"), "SELECT * FROM df")
+
+    def test_limit_query(self):
+        query = limit_query("SELECT a FROM df ORDER BY a DESC", 10)
+        rows = self.connection.execute(query).fetchall()
+        self.assertEqual(rows, [(i,) for i in range(249, 239, -1)])
+
+        query = limit_query("WITH t AS (SELECT a FROM df) SELECT * FROM t", 5)
+        self.assertEqual(len(self.connection.execute(query).fetchall()), 5)
+
+    def test_limit_query_not_wrappable(self):
+        self.assertIsNone(limit_query("PRAGMA table_info(df)", 10))
+        self.assertIsNone(limit_query("SELECT 1; DROP TABLE df", 10))
+
+    def test_fetch_batches(self):
+        cursor = self.connection.execute("SELECT a FROM df")
+        batches = list(fetch_batches(cursor.fetchmany, limit=120, batch_size=50))
+        self.assertEqual([len(batch) for batch in batches], [50, 50, 20])
+
+        cursor = self.connection.execute("SELECT a FROM df")
+        batches = list(fetch_batches(cursor.fetchmany, batch_size=100))
+        self.assertEqual([len(batch) for batch in batches], [100, 100, 50])
+
+    def test_fetch_result(self):
+        cursor = self.connection.execute("SELECT a, a * 0.5 AS b FROM df")
+        result = fetch_result(cursor.fetchmany, ["a", "b"], preview_rows=100)
+        self.assertEqual(result.preview.shape, (100, 2))
+        self.assertEqual(result.total_rows, 250)
+        self.assertFalse(result.truncated)
+
+        with tempfile.TemporaryDirectory() as directory:
+            reference = persist_result(result, f"file://{directory}", "r1")
+            self.assertEqual(reference["total_rows"], 250)
+            page = read_result_page(result_uri(f"file://{directory}", "r1"), 240, 20)
+            self.assertTrue(os.path.exists(os.path.join(directory, "results")))
+
+        self.assertEqual(page["total_rows"], 250)
+        self.assertEqual(page["data"]["a"], [str(i) for i in range(240, 250)])
+        self.assertEqual(page["data"]["b"][:2], ["120", "120.500"])
+
+    def test_fetch_result_small_and_truncated(self):
+        cursor = self.connection.execute("SELECT a FROM df LIMIT 10")
+        result = fetch_result(cursor.fetchmany, ["a"], preview_rows=100)
+        self.assertEqual(len(result.preview), 10)
+        self.assertIsNone(result.file)
+
+        cursor = self.connection.execute("SELECT a FROM df")
+        result = fetch_result(cursor.fetchmany, ["a"], preview_rows=10, max_rows=200)
+        self.assertEqual(result.total_rows, 200)
+        self.assertTrue(result.truncated)
+        result.file.close()
+
+    def test_read_result_page_row_groups(self):
+        import pandas as pd
+
+        writer = ResultWriter(row_group_size=30)
+        for start in range(0, 100, 25):
+            writer.write(pd.DataFrame({"a": range(start, start + 25)}))
+        with tempfile.TemporaryDirectory() as directory:
+            uri = f"file://{directory}/result.parquet"
+            with writer.close() as file, open(uri[7:], "wb") as target:
+                target.write(file.read())
+            page = read_result_page(uri, 55, 10)
+            empty = read_result_page(uri, 100, 10)
+
+        self.assertEqual(page["data"]["a"], [str(i) for i in range(55, 65)])
+        self.assertEqual(empty["data"], {"a": []})
+        self.assertEqual(empty["total_rows"], 100)
+
+    def test_result_writer_keeps_column_types(self):
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = ResultWriter(row_group_size=2)
+        writer.write(pd.DataFrame({"a": [1, 2], "b": ["x", "y"], "c": [None, None]}))
+        writer.write(pd.DataFrame({"a": [3.0, None], "b": ["z", None], "c": [1, 2]}))
+        with writer.close() as file:
+            table = pq.read_table(file)
+
+        self.assertEqual(table.schema.field("a").type, pa.int64())
+        self.assertEqual(table.column("a").to_pylist(), [1, 2, 3, None])
+        self.assertEqual(table.column("b").to_pylist(), ["x", "y", "z", None])
+        self.assertEqual(table.column("c").to_pylist(), [None, None, "1", "2"])
+
+    def test_cleanup_results(self):
+        cursor = self.connection.execute("SELECT a FROM df")
+        result = fetch_result(cursor.fetchmany, ["a"], preview_rows=10)
+        with tempfile.TemporaryDirectory() as directory:
+            uri = f"file://{directory}"
+            reference = persist_result(result, uri, "r1")
+            self.assertEqual(cleanup_results(f"file://{directory}/missing"), 0)
+            self.assertEqual(cleanup_results(uri, max_age=3600), 0)
+            self.assertTrue(result_exists(uri, reference))
+
+            path = os.path.join(directory, "results", "r1.parquet")
+            os.utime(path, (0, 0))
+            self.assertEqual(cleanup_results(uri, max_age=3600), 1)
+            self.assertFalse(result_exists(uri, reference))
+            self.assertTrue(result_exists(uri, None))
+
+    def test_query_budget_instructions(self):
+        budget = QueryBudget(timeout=0, max_instructions=100_000)
+        with self.assertRaises(QueryBudgetExceeded):
+            with budget.enforce_sqlite(self.connection):
+                self.connection.execute(
+                    "SELECT count(*) FROM df a, df b, df c"
+                ).fetchall()
+
+        # the progress handler is removed after the context
+        self.connection.execute("SELECT count(*) FROM df a, df b, df c").fetchall()
+
+    def test_query_budget_timeout(self):
+        budget = QueryBudget(timeout=0.01)
+        with self.assertRaises(QueryBudgetExceeded):
+            with budget.enforce_sqlite(self.connection):
+                self.connection.execute(
+                    "SELECT count(*) FROM df a, df b, df c, df d"
+                ).fetchall()
+
+    def test_query_budget_not_exceeded(self):
+        budget = QueryBudget(timeout=10)
+        with budget.enforce_sqlite(self.connection):
+            rows = self.connection.execute("SELECT count(*) FROM df").fetchall()
+        self.assertEqual(rows, [(250,)])
+        self.assertIsNone(budget.exceeded)
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import time
+import uuid
+from unittest import TestCase
+from unittest.mock import patch
+
+import pandas as pd
+
+from data_copilot.execution_apps.apps import sql_interpreter
+from data_copilot.execution_apps.queries import QueryResult
+from data_copilot.execution_apps.result_cache import (
+    DiskResultCache,
+    normalize_query,
+    result_cache_key,
+)
+
+
+class ResultCacheTest(TestCase):
+    def test_normalize_query(self):
+        self.assertEqual(
+            normalize_query(
+                "SELECT  Name,\n count(*) FROM df WHERE city = 'New  York'"
+            ),
+            "select name, count(*) from df where city = 'New  York'",
+        )
+        self.assertEqual(
+            result_cache_key("v1", "SELECT a FROM df"),
+            result_cache_key("v1", "select a\nfrom df"),
+        )
+        self.assertNotEqual(
+            result_cache_key("v1", "SELECT a FROM df"),
+            result_cache_key("v2", "SELECT a FROM df"),
+        )
+        self.assertNotEqual(
+            result_cache_key("v1", "SELECT a FROM df WHERE b = 'X'"),
+            result_cache_key("v1", "SELECT a FROM df WHERE b = 'x'"),
+        )
+
+    def test_disk_cache_evicts_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = DiskResultCache(directory, max_bytes=120)
+            value = {"data": {"a": ["1" * 20]}, "result": None}
+            cache.set("first", value)
+            cache.set("second", value)
+            # mark the first entry as used later than the second one
+            os.utime(os.path.join(directory, "second.json"), (0, time.time() - 60))
+            self.assertEqual(cache.get("first"), value)
+            cache.set("third", value)
+
+            self.assertIsNone(cache.get("second"))
+            self.assertEqual(cache.get("third"), value)
+            self.assertEqual(cache.stats.to_dict()["evictions"], 1)
+            self.assertEqual(cache.stats.hits, 2)
+            self.assertEqual(cache.stats.misses, 1)
+
+    def test_disk_cache_only_scans_when_full(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = DiskResultCache(directory, max_bytes=120)
+            value = {"data": {"a": ["1" * 20]}, "result": None}
+            with patch("os.scandir", wraps=os.scandir) as scandir:
+                cache.set("first", value)
+                cache.set("second", value)
+                self.assertEqual(scandir.call_count, 1)
+                cache.set("third", value)
+                self.assertEqual(scandir.call_count, 2)
+
+            self.assertEqual(len(os.listdir(directory)), 2)
+            self.assertLessEqual(cache._size, 120)
+
+    def test_hit_skips_execution(self):
+        result = QueryResult(pd.DataFrame({"n": [3]}), 1, False, None)
+        with tempfile.TemporaryDirectory() as directory, patch.object(
+            sql_interpreter, "generate_sql_query", return_value=("SQL", "SELECT 1")
+        ), patch.object(
+            sql_interpreter, "_execute_query", return_value=result
+        ) as execute, patch(
+            "data_copilot.execution_apps.datasets.get_file_config", return_value={}
+        ), patch(
+            "data_copilot.execution_apps.result_cache.get_result_cache",
+            return_value=DiskResultCache(directory),
+        ):
+            artifact_version_id = uuid.uuid4()
+            messages = [
+                sql_interpreter.SQLInterpreter.execute_message(
+                    "q", uuid.uuid4(), uuid.uuid4(), artifact_version_id, "uri", []
+                ).to_dict()
+                for _ in range(2)
+            ]
+
+        execute.assert_called_once()
+        self.assertEqual(messages[0], messages[1])
+        self.assertIn('"n":["3"]', messages[1]["text_content"])
@@ -0,0 +1,94 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from data_copilot.execution_apps.routing import (
+    AffinityRouter,
+    HashRing,
+    WorkerHeartbeat,
+)
+
+
+class HashRingTest(TestCase):
+    def test_only_keys_of_a_leaving_node_move(self):
+        keys = [f"artifact-version-{i}" for i in range(1000)]
+        ring = HashRing(["celery@a", "celery@b", "celery@c"])
+        before = {key: ring.get(key) for key in keys}
+        self.assertEqual(set(before.values()), {"celery@a", "celery@b", "celery@c"})
+
+        ring = HashRing(["celery@a", "celery@c"])
+        after = {key: ring.get(key) for key in keys}
+        moved = [key for key in keys if before[key] != after[key]]
+        self.assertTrue(moved)
+        self.assertTrue(all(before[key] == "celery@b" for key in moved))
+
+    def test_empty_ring(self):
+        self.assertIsNone(HashRing([]).get("key"))
+
+
+class AffinityRouterTest(TestCase):
+    def setUp(self) -> None:
+        patcher = patch("redis.Redis.from_url")
+        self.client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.client.zrangebyscore.return_value = [b"celery@a", b"celery@b"]
+        # lengths of the priority queues, prefetched tasks
+        self.pipeline = self.client.pipeline.return_value
+        self.pipeline.execute.return_value = [0, 0, 0, 0, None]
+
+    def test_route_to_direct_queue(self):
+        router = AffinityRouter(max_queue_length=4)
+        route = router.route("artifact-version")
+        self.assertIn(route["queue"], ["celery@a.dq2", "celery@b.dq2"])
+        self.assertEqual(router.route("artifact-version"), route)
+        # the ring of live workers is reused until it expires
+        self.client.zrangebyscore.assert_called_once()
+
+    def test_saturated_worker_falls_back_to_shared_queue(self):
+        router = AffinityRouter(max_queue_length=4)
+        self.pipeline.execute.return_value = [1, 0, 0, 2, b"0"]
+        self.assertTrue(router.route("version"))
+        # waiting tasks of all priorities and prefetched tasks count
+        self.pipeline.execute.return_value = [1, 0, 0, 2, b"1"]
+        self.assertEqual(router.route("version"), {})
+
+        queue = self.pipeline.llen.call_args_list[-1].args[0]
+        self.assertTrue(queue.endswith(".dq2\x06\x169"))
+
+    def test_no_live_workers(self):
+        self.client.zrangebyscore.return_value = []
+        self.assertEqual(AffinityRouter().route("version"), {})
+
+
+class WorkerHeartbeatTest(TestCase):
+    def setUp(self) -> None:
+        patcher = patch("redis.Redis.from_url")
+        self.client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+    def test_tasks_of_gone_workers_move_to_the_shared_queue(self):
+        self.client.zrangebyscore.side_effect = [[b"celery@gone"], []]
+        self.client.lmove.side_effect = [b"t1", b"t2", None, b"t3", None, None, None]
+
+        moved = WorkerHeartbeat("celery@a").reroute_gone_workers()
+
+        self.assertEqual(moved, 3)
+        calls = [c.args for c in self.client.lmove.call_args_list]
+        self.assertEqual(calls[0], ("celery@gone.dq2", "celery", "LEFT", "RIGHT"))
+        self.assertEqual(calls[3][:2], ("celery@gone.dq2\x06\x163", "celery\x06\x163"))
+        self.client.zrem.assert_not_called()
+
+    def test_old_redis_server_disables_rerouting(self):
+        heartbeat = WorkerHeartbeat("celery@a")
+        self.client.info.return_value = {"redis_version": "6.0.16"}
+
+        with self.assertLogs(level="ERROR"):
+            heartbeat.check_server_version()
+        heartbeat.beat()
+
+        self.assertFalse(heartbeat.reroute)
+        self.client.zrangebyscore.assert_not_called()
+
+        heartbeat = WorkerHeartbeat("celery@b")
+        self.client.info.return_value = {"redis_version": "7.2.4"}
+        heartbeat.check_server_version()
+        self.assertTrue(heartbeat.reroute)
@@ -0,0 +1,104 @@
+import json
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from data_copilot.execution_apps.profiling import DatasetSketch
+from data_copilot.execution_apps.sketches import (
+    HyperLogLog,
+    KLLSketch,
+    ReservoirSample,
+    SpaceSaving,
+)
+
+
+class SketchesTest(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.values = pd.Series(rng.zipf(1.5, 200_000) % 50_000)
+        self.chunks = np.array_split(self.values.to_numpy(), 7)
+
+    def test_hyperloglog_merge(self):
+        merged = HyperLogLog()
+        for chunk in self.chunks:
+            sketch = HyperLogLog()
+            sketch.update(pd.Series(chunk))
+            merged.merge(sketch)
+
+        exact = self.values.nunique()
+        self.assertLess(abs(merged.count() - exact) / exact, 4 * merged.relative_error)
+
+    def test_space_saving_merge(self):
+        merged = SpaceSaving(capacity=100)
+        for chunk in self.chunks:
+            sketch = SpaceSaving(capacity=100)
+            sketch.update(pd.Series(chunk))
+            merged.merge(sketch)
+
+        exact = self.values.value_counts()
+        for top_value in merged.top(5):
+            count = exact[top_value["value"]]
+            self.assertGreaterEqual(top_value["count"], count)
+            self.assertLessEqual(top_value["count"] - top_value["error"], count)
+        self.assertEqual([v["value"] for v in merged.top(5)], exact.index[:5].tolist())
+
+    def test_kll_rank_error(self):
+        merged = KLLSketch(seed=0)
+        for chunk in self.chunks:
+            sketch = KLLSketch(seed=0)
+            sketch.update(chunk)
+            merged.merge(sketch)
+
+        q = [0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0]
+        sorted_values = np.sort(self.values.to_numpy())
+        for requested, quantile in zip(q, merged.quantiles(q)):
+            low = np.searchsorted(sorted_values, quantile, "left")
+            high = np.searchsorted(sorted_values, quantile, "right")
+            rank = np.clip(requested * len(sorted_values), low, high)
+            self.assertLessEqual(
+                abs(rank - requested * len(sorted_values)) / len(sorted_values),
+                merged.rank_error,
+            )
+        self.assertEqual(merged.n, len(sorted_values))
+
+    def test_reservoir_merge(self):
+        merged = ReservoirSample(size=1000, seed=0)
+        for chunk in self.chunks:
+            sketch = ReservoirSample(size=1000, seed=1)
+            sketch.update(chunk.reshape(-1, 1))
+            merged.merge(sketch)
+
+        self.assertEqual(merged.sample.shape, (1000, 1))
+        self.assertEqual(merged.n, len(self.values))
+
+    def test_dataset_sketch(self):
+        rng = np.random.default_rng(0)
+        x = rng.normal(size=50_000)
+        data_frame = pd.DataFrame(
+            {
+                "x": x,
+                "y": x + rng.normal(size=50_000),
+                "city": rng.choice(["Bern", "Zurich", "Basel"], 50_000),
+            }
+        )
+        data_frame.loc[::10, "y"] = np.nan
+
+        first, second = DatasetSketch(seed=0), DatasetSketch(seed=0)
+        first.update(data_frame.iloc[:20_000])
+        second.update(data_frame.iloc[20_000:])
+        first.merge(second)
+        profile = first.to_profile()
+
+        json.dumps(profile, allow_nan=False)
+        self.assertTrue(profile["approximate"])
+        self.assertEqual(profile["rows"], 50_000)
+        self.assertEqual(profile["columns"]["y"]["null_count"], 5000)
+        self.assertEqual(profile["columns"]["city"]["distinct_count"], 3)
+        self.assertEqual(len(profile["columns"]["x"]["histogram"]["bins"]), 10)
+        correlation = profile["correlation"]
+        self.assertEqual(correlation["columns"], ["x", "y"])
+        self.assertLess(
+            abs(correlation["values"][0][1] - data_frame["x"].corr(data_frame["y"])),
+            correlation["error"],
+        )
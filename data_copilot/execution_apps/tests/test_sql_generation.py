@@ -0,0 +1,101 @@
+import os
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from data_copilot.execution_apps.apps import sql_interpreter
+
+
+def _client(*responses):
+    client = MagicMock()
+    completions = []
+    for response in responses:
+        completion = MagicMock()
+        completion.choices[0].message.content = response
+        completions.append(completion)
+    client.chat.completions.create.side_effect = completions
+    return client
+
+
+class SQLGenerationTest(TestCase):
+    def test_parse_structured_response(self):
+        parse = sql_interpreter.parse_structured_response
+        self.assertEqual(
+            parse('```json\n{"answerable": true, "sql": "SELECT 1"}\n```'),
+            ("SQL", "SELECT 1"),
+        )
+        self.assertEqual(
+            parse('{"answerable": false, "explanation": "No prices"}'),
+            ("TEXT", "No prices"),
+        )
+        self.assertIsNone(parse('{"answerable": true, "explanation": "x"}'))
+        self.assertIsNone(parse("SELECT 1"))
+
+    def test_single_mode_uses_one_completion(self):
+        client = _client('{"answerable": true, "sql": "SELECT COUNT(*) FROM df"}')
+        with patch(
+            "data_copilot.execution_apps.llm_client.get_openai_client",
+            return_value=client,
+        ), patch.object(sql_interpreter, "SQL_GENERATION_MODE", "single"):
+            result = sql_interpreter._generate_sql_query("count", ["a"], "SQLite")
+
+        self.assertEqual(result, ("SQL", "SELECT COUNT(*) FROM df", True))
+        self.assertEqual(client.chat.completions.create.call_count, 1)
+
+    def test_single_mode_falls_back_to_two_steps(self):
+        client = _client("I can't", "yes", "SELECT 1")
+        with patch(
+            "data_copilot.execution_apps.llm_client.get_openai_client",
+            return_value=client,
+        ), patch.object(sql_interpreter, "SQL_GENERATION_MODE", "single"):
+            result = sql_interpreter._generate_sql_query("count", ["a"], "SQLite")
+
+        self.assertEqual(result, ("SQL", "SELECT 1", True))
+        self.assertEqual(client.chat.completions.create.call_count, 3)
+
+    def test_speculative_mode_counts_wasted_generations(self):
+        def create(model, messages, **kwargs):
+            completion = MagicMock()
+            if kwargs.get("max_tokens") == 1:
+                verdict = "yes" if "count" in messages[1]["content"] else "no"
+                completion.choices[0].message.content = verdict
+            elif "explain" in messages[1]["content"]:
+                completion.choices[0].message.content = "No weather data"
+            else:
+                completion.choices[0].message.content = "SELECT 1"
+            return completion
+
+        client = MagicMock()
+        client.chat.completions.create.side_effect = create
+        stats = sql_interpreter.SpeculationStatistics()
+        with patch(
+            "data_copilot.execution_apps.llm_client.get_openai_client",
+            return_value=client,
+        ), patch.object(
+            sql_interpreter, "SQL_GENERATION_MODE", "speculative"
+        ), patch.object(
+            sql_interpreter, "speculation_stats", stats
+        ):
+            self.assertEqual(
+                sql_interpreter._generate_sql_query("count", ["a"], "SQLite"),
+                ("SQL", "SELECT 1", True),
+            )
+            self.assertEqual(
+                sql_interpreter._generate_sql_query("weather", ["a"], "SQLite"),
+                ("TEXT", "No weather data", True),
+            )
+
+        self.assertEqual(
+            stats.to_dict(), {"speculations": 2, "wasted": 1, "waste_rate": 0.5}
+        )
+
+    def test_openai_client_is_shared(self):
+        from data_copilot.execution_apps import llm_client
+
+        with patch.object(llm_client, "_openai_client", None), patch.dict(
+            os.environ, {"OPENAI_API_KEY": "key"}
+        ):
+            client = llm_client.get_openai_client()
+            self.assertIs(llm_client.get_openai_client(), client)
+            self.assertEqual(client.timeout.connect, llm_client.LLM_CONNECT_TIMEOUT)
+            llm_client.close_openai_client()
+            self.assertIsNone(llm_client._openai_client)
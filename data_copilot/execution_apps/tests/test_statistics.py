@@ -0,0 +1,41 @@
+import json
+from unittest import TestCase
+
+import pandas as pd
+
+from data_copilot.execution_apps.statistics import compute_statistics
+
+
+class StatisticsTest(TestCase):
+    def test_compute_statistics(self):
+        data_frame = pd.DataFrame(
+            {
+                "price": [1.0, 2.0, None, 4.0, 4.0],
+                "city": ["Bern", "Zurich", "Bern", None, "Bern"],
+                "day": pd.to_datetime(
+                    ["2023-01-01", "2023-01-02", None, "2023-01-03", "2023-01-01"]
+                ),
+            }
+        )
+
+        statistics = compute_statistics(data_frame)
+
+        # the statistics are stored in the config.json
+        json.dumps(statistics, allow_nan=False)
+        self.assertEqual(statistics["price"]["null_count"], 1)
+        self.assertEqual(statistics["price"]["distinct_count"], 3)
+        self.assertEqual(statistics["price"]["quantiles"]["0.5"], 3.0)
+        self.assertEqual(
+            statistics["city"]["top_values"][0], {"value": "Bern", "count": 3}
+        )
+        self.assertNotIn("quantiles", statistics["city"])
+        self.assertEqual(statistics["day"]["min"], "2023-01-01T00:00:00")
+        self.assertEqual(statistics["day"]["max"], "2023-01-03T00:00:00")
+
+    def test_distinct_count_is_estimated(self):
+        data_frame = pd.DataFrame({"id": range(50_000), "group": [0, 1] * 25_000})
+
+        statistics = compute_statistics(data_frame)
+
+        self.assertAlmostEqual(statistics["id"]["distinct_count"], 50_000, delta=2000)
+        self.assertEqual(statistics["group"]["distinct_count"], 2)
@@ -0,0 +1,54 @@
+import uuid
+from unittest import TestCase
+from unittest.mock import patch
+
+from data_copilot.execution_apps.apps.duckdb_interpreter import DuckDBInterpreter
+from data_copilot.execution_apps.apps.sql_interpreter import SQLInterpreter
+
+
+@patch("data_copilot.execution_apps.profiling.get_profile")
+@patch("data_copilot.execution_apps.profiling.get_stored_profile")
+@patch("data_copilot.execution_apps.datasets.load_dataset")
+@patch("data_copilot.storage_handler.get_local_path")
+class WarmUpTest(TestCase):
+    def warm_up(self, app, file_config):
+        with patch(
+            "data_copilot.execution_apps.datasets.get_file_config",
+            return_value=file_config,
+        ):
+            app.warm_up(uuid.uuid4(), "file:///v1")
+
+    def test_sql_interpreter_fetches_database(
+        self, get_local_path, load_dataset, get_stored_profile, get_profile
+    ):
+        self.warm_up(SQLInterpreter, {"sqlite_file_name": "df.sqlite"})
+
+        get_local_path.assert_called_once_with("file:///v1/df.sqlite")
+        load_dataset.assert_not_called()
+        # profiling would load the whole dataset
+        get_profile.assert_not_called()
+        get_stored_profile.assert_called_once()
+
+    def test_sql_interpreter_loads_legacy_dataset(
+        self, get_local_path, load_dataset, get_stored_profile, get_profile
+    ):
+        self.warm_up(SQLInterpreter, {"file_name": "data.csv"})
+
+        get_local_path.assert_not_called()
+        load_dataset.assert_called_once()
+
+    def test_duckdb_interpreter_fetches_columnar_file(
+        self, get_local_path, load_dataset, get_stored_profile, get_profile
+    ):
+        self.warm_up(
+            DuckDBInterpreter,
+            {
+                "file_name": "data.csv",
+                "file_type": "csv",
+                "columnar_file_name": "df.parquet",
+            },
+        )
+
+        get_local_path.assert_called_once_with("file:///v1/df.parquet")
+        load_dataset.assert_not_called()
+        get_profile.assert_not_called()
@@ -5,8 +5,10 @@ from data_copilot.storage_handler.functions import (
     delete_file,
     exists,
     get_size,
+    get_modified_time,
     get_signed_download_url,
     get_signed_upload_url,
+    get_local_path,
 )
 
 __all__ = [
@@ -16,6 +18,8 @@ __all__ = [
     "delete_file",
     "exists",
     "get_size",
+    "get_modified_time",
     "get_signed_download_url",
     "get_signed_upload_url",
+    "get_local_path",
 ]
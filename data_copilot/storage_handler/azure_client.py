@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import datetime, timedelta
 from functools import wraps
 from io import BufferedIOBase
@@ -12,6 +13,10 @@ from azure.storage.filedatalake import (
 )
 
 from data_copilot.storage_handler.base import ClientABC
+from data_copilot.storage_handler.local_cache import (
+    DOWNLOAD_SUFFIX,
+    get_local_file_cache,
+)
 
 download_permissions = FileSasPermissions(read=True, list=True)
 upload_permissions = FileSasPermissions(
@@ -192,3 +197,40 @@ class AzureClient(ClientABC):
             raise FileNotFoundError(f"File {path} does not exist")
 
         return self.fs.get_file_client(path).get_file_properties().size
+
+    @path_processor
+    def get_modified_time(self, path: str) -> float:
+        """
+        Returns the time of the last modification of a file
+        """
+        if not self.exists(path):
+            raise FileNotFoundError(f"File {path} does not exist")
+
+        properties = self.fs.get_file_client(path).get_file_properties()
+        return properties.last_modified.timestamp()
+
+    @path_processor
+    def get_local_path(self, path: str) -> str:
+        """
+        Downloads the file to the local cache directory, if it was not downloaded
+        before, and returns the path of the local copy
+        """
+        cache = get_local_file_cache()
+        local_path = cache.path(self.account_name, self.container, path.strip("/"))
+        if cache.get(local_path):
+            return local_path
+
+        if not self.exists(path):
+            raise FileNotFoundError(f"File {path} does not exist")
+
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        # Download to a temporary file first, so concurrent readers never see a
+        # partially written copy.
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(local_path), suffix=DOWNLOAD_SUFFIX
+        )
+        with os.fdopen(fd, "wb") as file:
+            self.fs.get_file_client(path).download_file().readinto(file)
+        os.replace(tmp_path, local_path)
+        cache.add(local_path)
+        return local_path
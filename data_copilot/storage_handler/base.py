@@ -47,3 +47,17 @@ class ClientABC(ABC):
     @abstractmethod
     def get_size(self, path: str) -> str:
         pass
+
+    @abstractmethod
+    def get_modified_time(self, path: str) -> float:
+        """
+        Returns the time of the last modification of a file as POSIX timestamp
+        """
+        pass
+
+    @abstractmethod
+    def get_local_path(self, path: str) -> str:
+        """
+        Returns the path of a local copy of the file
+        """
+        pass
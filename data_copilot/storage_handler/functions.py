@@ -54,6 +54,11 @@ def get_size(client: ClientABC, uri, *args, **kwargs):
     return client.get_size(uri, *args, **kwargs)
 
 
+@_get_client
+def get_modified_time(client: ClientABC, uri, *args, **kwargs):
+    return client.get_modified_time(uri, *args, **kwargs)
+
+
 @_get_client
 def get_signed_download_url(client: ClientABC, uri, *args, **kwargs):
     return client.get_signed_download_url(uri, *args, **kwargs)
@@ -62,3 +67,8 @@ def get_signed_download_url(client: ClientABC, uri, *args, **kwargs):
 @_get_client
 def get_signed_upload_url(client: ClientABC, uri, *args, **kwargs):
     return client.get_signed_upload_url(uri, *args, **kwargs)
+
+
+@_get_client
+def get_local_path(client: ClientABC, uri, *args, **kwargs):
+    return client.get_local_path(uri, *args, **kwargs)
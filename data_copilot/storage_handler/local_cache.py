@@ -0,0 +1,123 @@
+import logging
+import os
+import tempfile
+import threading
+from typing import List, Tuple
+
+# Directory in which downloaded copies of remote files are kept.
+LOCAL_CACHE_DIR = os.environ.get(
+    "STORAGE_LOCAL_CACHE_DIR", os.path.join(tempfile.gettempdir(), "data_copilot")
+)
+# Size budget of the downloaded copies, the least recently used copies are
+# removed once they take more.
+LOCAL_CACHE_MAX_BYTES = int(
+    os.environ.get("STORAGE_LOCAL_CACHE_MAX_BYTES", 10 * 2**30)
+)
+
+# Suffix of the partially downloaded files, which are not cache entries yet.
+DOWNLOAD_SUFFIX = ".download"
+
+
+class LocalFileCache:
+    """
+    Size-bounded directory of local copies of remote files, shared by the
+    processes of a host. The modification time of a copy is its last use.
+
+    Every process tracks the size of the directory from one scan plus its own
+    downloads, and only lists the directory again to evict the least recently
+    used copies once the tracked size crosses `max_bytes`. Removing a copy
+    which is still open is safe, open files stay readable on POSIX systems.
+    """
+
+    def __init__(
+        self, directory: str = LOCAL_CACHE_DIR, max_bytes: int = LOCAL_CACHE_MAX_BYTES
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._size: int | None = None
+        self._lock = threading.Lock()
+
+    def path(self, *parts: str) -> str:
+        """Return the local path of a copy."""
+        return os.path.join(self.directory, *parts)
+
+    def get(self, path: str) -> bool:
+        """Mark a copy as used.
+
+        Args:
+            path (str): The local path of the copy.
+
+        Returns:
+            bool: Whether the copy exists.
+        """
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def add(self, path: str) -> None:
+        """Account for a new copy, and evict the least recently used copies if
+        the cache is full. The new copy itself is never evicted.
+
+        Args:
+            path (str): The local path of the copy.
+        """
+        with self._lock:
+            if self._size is None:
+                self._size = sum(entry[1] for entry in self._entries())
+            else:
+                self._size += os.path.getsize(path)
+            if self._size > self.max_bytes:
+                self._evict(keep=path)
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(DOWNLOAD_SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # removed by another process
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self, keep: str) -> None:
+        entries = self._entries()
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logging.warning(f"Could not remove the local copy {path}: {e}")
+                continue
+            size -= entry_size
+        self._size = size
+
+
+_local_file_cache: LocalFileCache | None = None
+
+
+def get_local_file_cache() -> LocalFileCache:
+    """Return the local file cache of the process.
+
+    Returns:
+        LocalFileCache: The cache.
+    """
+    global _local_file_cache
+
+    if _local_file_cache is None:
+        _local_file_cache = LocalFileCache()
+    return _local_file_cache
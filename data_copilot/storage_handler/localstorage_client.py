@@ -1,4 +1,5 @@
 import os
+import shutil
 from functools import wraps
 from io import BufferedIOBase, BufferedReader
 from pathlib import Path
@@ -59,7 +60,7 @@ class LocalStorageClient(ClientABC):
         elif hasattr(data, "write"):
             with open(path, "wb") as file:
                 data.seek(0)
-                file.write(data.read())
+                shutil.copyfileobj(data, file)
         else:
             raise Exception(f"Unsupported content/stream format {type(data)}")
 
@@ -112,3 +113,23 @@ class LocalStorageClient(ClientABC):
             raise FileNotFoundError(f"File {path} does not exist")
 
         return Path(path).stat().st_size
+
+    @path_processor
+    def get_modified_time(self, path: str) -> float:
+        """
+        Returns the time of the last modification of a file
+        """
+        if not self.exists(path):
+            raise FileNotFoundError(f"File {path} does not exist")
+
+        return Path(path).stat().st_mtime
+
+    @path_processor
+    def get_local_path(self, path: str) -> str:
+        """
+        Returns the path of the file in the local file system
+        """
+        if not self.exists(path):
+            raise FileNotFoundError(f"File {path} does not exist")
+
+        return path
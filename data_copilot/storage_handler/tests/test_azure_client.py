@@ -1,8 +1,10 @@
 import os
+import tempfile
 from unittest import TestCase
 from unittest import mock
 
 from data_copilot.storage_handler.azure_client import AzureClient, ACCOUNT_URL
+from data_copilot.storage_handler.local_cache import LocalFileCache
 
 
 def _get_mock_data_lake_service_client():
@@ -97,3 +99,46 @@ class AzureClientTest(TestCase):
         self.azure_client.fs.get_file_client().upload_data.assert_called_once_with(
             mock_data, overwrite=True
         )
+
+
+class AzureClientGetLocalPathTest(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.cache = LocalFileCache(self.directory.name, max_bytes=1000)
+        patcher = mock.patch(
+            "data_copilot.storage_handler.azure_client.get_local_file_cache",
+            return_value=self.cache,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.service_client = _get_mock_data_lake_service_client()
+        file_client = self.service_client.get_file_system_client.return_value
+        self.file_client = file_client.get_file_client.return_value
+        self.file_client.download_file.return_value = mock.Mock()
+        self.file_client.download_file.return_value.readinto.side_effect = (
+            lambda file: file.write(b"data")
+        )
+        with mock.patch(
+            "data_copilot.storage_handler.azure_client.DataLakeServiceClient",
+            return_value=self.service_client,
+        ):
+            self.azure_client = AzureClient(
+                uri=ACCOUNT_URL.format(account_name="account") + "/container",
+                credential="credential",
+            )
+
+    def test_downloads_once(self):
+        path = self.azure_client.get_local_path("v1/df.sqlite")
+        self.assertEqual(path, self.cache.path("account", "container", "v1/df.sqlite"))
+        with open(path, "rb") as file:
+            self.assertEqual(file.read(), b"data")
+
+        self.assertEqual(self.azure_client.get_local_path("v1/df.sqlite"), path)
+        self.file_client.download_file.assert_called_once()
+
+    def test_missing_file(self):
+        self.file_client.exists.return_value = False
+        with self.assertRaises(FileNotFoundError):
+            self.azure_client.get_local_path("v1/missing.sqlite")
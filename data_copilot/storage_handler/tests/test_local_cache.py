@@ -0,0 +1,48 @@
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+from data_copilot.storage_handler.local_cache import LocalFileCache
+
+
+class LocalFileCacheTest(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.cache = LocalFileCache(self.directory.name, max_bytes=250)
+
+    def download(self, name: str, age: float) -> str:
+        path = self.cache.path("account", "container", name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(b"x" * 100)
+        os.utime(path, (0, time.time() - age))
+        self.cache.add(path)
+        return path
+
+    def test_evicts_least_recently_used_copies(self):
+        first = self.download("first", age=30)
+        second = self.download("second", age=20)
+        self.assertTrue(self.cache.get(first))
+        third = self.download("third", age=10)
+
+        self.assertFalse(os.path.exists(second))
+        self.assertTrue(os.path.exists(first))
+        self.assertTrue(os.path.exists(third))
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertFalse(self.cache.get(second))
+
+    def test_new_copy_is_kept(self):
+        self.cache.max_bytes = 50
+        path = self.download("large", age=60)
+
+        self.assertTrue(os.path.exists(path))
+
+    def test_partial_downloads_are_ignored(self):
+        self.download("first", age=30)
+        with open(self.cache.path("account", "f.download"), "wb") as file:
+            file.write(b"x" * 1000)
+
+        self.download("second", age=20)
+        self.assertEqual(self.cache.evictions, 0)
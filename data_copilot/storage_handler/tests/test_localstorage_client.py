@@ -69,3 +69,15 @@ class LocalStorageClientTest(TestCase):
 
         with self.assertRaises(OSError):
             self.client.delete(self.temp_dir.name)
+
+
+class LocalStorageGetLocalPathTest(TestCase):
+    def test_get_local_path(self):
+        client = lc.LocalStorageClient()
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "df.sqlite"
+            path.write_bytes(b"data")
+
+            self.assertEqual(client.get_local_path(f"file://{path}"), str(path))
+            with self.assertRaises(FileNotFoundError):
+                client.get_local_path(f"file://{directory}/missing.sqlite")
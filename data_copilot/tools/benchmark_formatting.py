@@ -0,0 +1,91 @@
+"""Benchmark the vectorized formatting of component data against the recursive
+stringify functions.
+
+Usage:
+    python -m data_copilot.tools.benchmark_formatting --rows 100000 --columns 20
+"""
+import argparse
+import copy
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from data_copilot.execution_apps.helpers import (
+    format_data,
+    stringify_numbers_in_dict,
+)
+
+
+def create_result(rows: int, columns: int, seed: int = 0) -> pd.DataFrame:
+    """Create a query result with integer, float and text columns."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(columns):
+        match i % 4:
+            case 0:
+                data[f"int_{i}"] = rng.integers(-(10**6), 10**6, rows)
+            case 1:
+                data[f"float_{i}"] = rng.normal(size=rows) * 1000
+            case 2:
+                data[f"small_float_{i}"] = rng.normal(size=rows) * 1e-7
+            case 3:
+                data[f"text_{i}"] = rng.choice(["a", "b", "c"], rows).astype(object)
+    return pd.DataFrame(data)
+
+
+def benchmark(name: str, recursive, vectorized, repeat: int) -> None:
+    if recursive() != vectorized():
+        raise AssertionError(f"The formatted {name} data differs.")
+    recursive_time = min(timeit.repeat(recursive, number=1, repeat=repeat))
+    vectorized_time = min(timeit.repeat(vectorized, number=1, repeat=repeat))
+    print(
+        f"{name:<9} recursive: {recursive_time * 1000:9.1f} ms   "
+        f"vectorized: {vectorized_time * 1000:9.1f} ms   "
+        f"speedup: {recursive_time / vectorized_time:5.1f}x"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    result = create_result(args.rows, args.columns)
+    benchmark(
+        "table",
+        lambda: stringify_numbers_in_dict(result.to_dict("list")),
+        lambda: format_data(dict(result.items())),
+        args.repeat,
+    )
+
+    numeric = result.select_dtypes("number")
+    correlation = pd.concat([numeric] * 10, axis=1, ignore_index=True).corr()
+    heatmap = {
+        "columns": correlation.columns.tolist(),
+        "rows": correlation.index.tolist(),
+    }
+    benchmark(
+        "heatmap",
+        lambda: stringify_numbers_in_dict(
+            {**copy.deepcopy(heatmap), "values": correlation.values.tolist()}
+        ),
+        lambda: format_data({**heatmap, "values": correlation.to_numpy()}),
+        args.repeat,
+    )
+
+    values, bins = np.histogram(numeric.iloc[:, 1], bins=1000, density=True)
+    benchmark(
+        "histogram",
+        lambda: stringify_numbers_in_dict(
+            {"values": values.tolist(), "bins": bins.tolist()[:-1]}
+        ),
+        lambda: format_data({"values": values, "bins": bins[:-1]}),
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()